@@ -1,18 +1,64 @@
+from django import forms
 from django.contrib import admin
-from .models import Event, EventCategory
+from django.utils.text import slugify
+from .models import ApiToken, Event, EventCategory, EventRegistration
+
+
+class PrepopulatedSlugForm(forms.ModelForm):
+    """
+    Let the model allocate a unique slug when the prepopulated one is taken.
+
+    ``prepopulated_fields`` fills the slug from ``slug_source`` in the
+    browser, which fails unique validation for every repeated title. If the
+    submitted slug is exactly that generated value, it is cleared so
+    ``save()`` allocates the next free one; a hand-edited slug is still
+    validated as usual.
+    """
+
+    slug_source = None
+
+    def clean_slug(self):
+        slug = self.cleaned_data['slug']
+        source = self.cleaned_data.get(self.slug_source, '')
+        if (
+            self.instance._state.adding
+            and slug
+            and slug == slugify(source)
+            and self._meta.model._default_manager.filter(slug=slug).exists()
+        ):
+            return ''
+        return slug
+
+
+class EventCategoryAdminForm(PrepopulatedSlugForm):
+    slug_source = 'name'
+
+
+class EventAdminForm(PrepopulatedSlugForm):
+    slug_source = 'title'
 
 
 @admin.register(EventCategory)
 class EventCategoryAdmin(admin.ModelAdmin):
+    form = EventCategoryAdminForm
     list_display = ['name', 'slug', 'is_active', 'event_count', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
     ordering = ['name']
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.with_event_count()
+
+    @admin.display(description='Event count', ordering='event_count')
+    def event_count(self, obj):
+        return obj.event_count
+
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
+    form = EventAdminForm
     list_display = [
         'title', 'organizer', 'event_date', 'location',
         'capacity', 'current_attendees', 'status', 'is_published'
@@ -46,3 +92,39 @@ class EventAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         return queryset.select_related('organizer', 'category')
+
+    def save_model(self, request, obj, form, change):
+        """Save the event and promote the waitlist when capacity grows"""
+        super().save_model(request, obj, form, change)
+        if change and obj.capacity > form.initial.get('capacity', obj.capacity):
+            EventRegistration.objects.promote_waitlist(obj.pk, Event.objects.available_spots(obj.pk))
+
+
+@admin.register(EventRegistration)
+class EventRegistrationAdmin(admin.ModelAdmin):
+    list_display = ['event', 'user', 'status', 'waitlist_position', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['event__title', 'user__username', 'user__email']
+    raw_id_fields = ['event', 'user']
+    ordering = ['event', 'status', 'waitlist_position']
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('event', 'user')
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ['user', 'created_at', 'expires_at']
+    search_fields = ['user__username']
+    raw_id_fields = ['user']
+    readonly_fields = ['key', 'created_at']
+    ordering = ['-created_at']
+
+    def has_add_permission(self, request):
+        # Tokens are issued at login
+        return False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('user')
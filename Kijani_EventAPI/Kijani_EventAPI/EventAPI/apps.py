@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class EventapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'EventAPI'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from .search import repair_search_index
+
+        post_migrate.connect(repair_search_index, sender=self)
+
+        from . import signals  # noqa: F401
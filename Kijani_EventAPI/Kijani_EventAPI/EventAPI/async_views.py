@@ -0,0 +1,304 @@
+"""
+Async views for the event API
+
+Each read view serves GET/HEAD for one of the DRF views in ``views.py``
+with the async ORM (``aget``, ``acount``, ``aaggregate``, async iteration)
+and the async cache API, so a worker under ASGI keeps handling other
+requests while a query runs. The login and registration views serve POST
+and await the password hasher on its own executor (see ``hashing.py``). Everything else about the request (authentication,
+permissions, throttling, content negotiation, filtering, pagination,
+serializers, cache keys and ETags) is delegated to an instance of the DRF
+view, so both implementations return the same responses.
+
+Requests these views cannot serve without blocking are passed to the
+sync DRF view:
+
+* methods other than GET/HEAD (other writes, OPTIONS),
+* requests with an ``Authorization`` header (password hashing, token
+  lookups on a cache miss),
+* requests negotiated to a non-JSON renderer (the browsable API).
+
+Routes are switched over with the ``EVENTAPI_ASYNC_VIEWS`` setting (see
+``select_view()``).
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.http import Http404, HttpResponse
+from django.utils.decorators import classonlymethod
+from django.utils.http import http_date
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from . import cache, hashing, views
+from .conditional import ConditionalGetMixin, conditional_response, cached_conditional_response
+from .fast_serializers import FastListMixin
+from .instrumentation import timer
+
+
+def select_view(name, view_class, async_view_class):
+    """
+    Return the view function for the route ``name``.
+
+    The async view is used when ``name`` (or ``all``) is listed in
+    ``EVENTAPI_ASYNC_VIEWS``, the DRF view otherwise.
+    """
+    names = getattr(settings, 'EVENTAPI_ASYNC_VIEWS', [])
+    if name in names or 'all' in names:
+        return async_view_class.as_view()
+    return view_class.as_view()
+
+
+class AsyncAPIView(View):
+    """
+    Base class for async counterparts of DRF read views.
+
+    Subclasses set ``view_class`` and implement ``get_response()``.
+    """
+
+    view_class = None
+    sync_view = None
+    async_methods = ('GET', 'HEAD')
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        sync_view = sync_to_async(cls.view_class.as_view(), thread_sensitive=True)
+        view = super().as_view(sync_view=sync_view, **initkwargs)
+        # Writes are handed to DRF, which enforces CSRF for session auth itself
+        return csrf_exempt(view)
+
+    def uses_sync_view(self, request):
+        return (
+            request.method not in self.async_methods
+            or 'HTTP_AUTHORIZATION' in request.META
+        )
+
+    async def delegate(self, request, *args, **kwargs):
+        """Hand the request to the sync DRF view"""
+        return await self.sync_view(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.serve(request, self.get_cached_response, *args, **kwargs)
+
+    async def serve(self, request, handler, *args, **kwargs):
+        """Run ``handler(view, request)`` wrapped in the DRF view's request handling"""
+        if self.uses_sync_view(request):
+            return await self.delegate(request, *args, **kwargs)
+
+        # Resolve the session user now so DRF's SessionAuthentication does
+        # not trigger a blocking query
+        request.user = await request.auser()
+
+        view = self.view_class()
+        view.setup(request, *args, **kwargs)
+        view.request = drf_request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        view.format_kwarg = view.get_format_suffix(**kwargs)
+        view.response_cache_key = None
+        self.response_cache_key = None
+
+        try:
+            renderer, _ = view.perform_content_negotiation(drf_request)
+            if not isinstance(renderer, JSONRenderer):
+                return await self.delegate(request, *args, **kwargs)
+            # Throttles may make a network round trip; checked below instead
+            view.check_throttles = lambda request: None
+            view.initial(drf_request, *args, **kwargs)
+            await self.acheck_throttles(view, drf_request)
+            routing = getattr(view, 'read_routing', None)
+            if routing is not None:
+                # Choose the replica now so filters reading ``queryset.db``
+                # do not make the blocking pin and lag checks
+                await routing.aget_alias()
+            response = await handler(view, drf_request)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+
+        response = view.finalize_response(drf_request, response, *args, **kwargs)
+        if isinstance(response, Response):
+            response = await self.render(view, response)
+        return response
+
+    async def delete(self, request, *args, **kwargs):
+        return await self.delegate(request, *args, **kwargs)
+
+    async def acheck_throttles(self, view, request):
+        """Async ``APIView.check_throttles()``"""
+        durations = []
+        for throttle in view.get_throttles():
+            if hasattr(throttle, 'aallow_request'):
+                allowed = await throttle.aallow_request(request, view)
+            else:
+                allowed = throttle.allow_request(request, view)
+            if not allowed:
+                durations.append(throttle.wait())
+        if durations:
+            durations = [duration for duration in durations if duration is not None]
+            view.throttled(request, max(durations, default=None))
+
+    post = put = patch = options = delete
+
+    async def get_cached_response(self, view, request):
+        """Mirror ``CachedResponseMixin.get()`` and ``ConditionalGetMixin.get()``"""
+        if isinstance(view, cache.CachedResponseMixin) and cache.get_setting('ENABLED'):
+            key = await cache.abuild_key(request, view.get_cache_groups())
+            cached = await cache.get_cache().aget(key)
+            if cached is not None:
+                await cache.arecord('hits')
+                not_modified = cached_conditional_response(request._request, cached[3])
+                if not_modified is not None:
+                    return not_modified
+                return view.build_cached_response(cached)
+            await cache.arecord('misses')
+            self.response_cache_key = key
+
+        validators = None
+        if isinstance(view, ConditionalGetMixin):
+            validators = await view.aget_validators()
+            if validators is not None:
+                not_modified = conditional_response(request._request, *validators)
+                if not_modified is not None:
+                    return not_modified
+
+        response = await self.get_response(view, request)
+        if validators is not None and response.status_code == 200:
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    async def get_response(self, view, request):
+        raise NotImplementedError
+
+    async def render(self, view, response):
+        """Render a DRF response and store it in the response cache"""
+        with timer('serialize'):
+            response.render()
+        if self.response_cache_key and view.should_cache_response(response):
+            await cache.get_cache().aset(
+                self.response_cache_key,
+                view.get_cache_entry(response),
+                cache.get_setting('TIMEOUT')
+            )
+            response['X-Cache'] = 'MISS'
+        # A plain HttpResponse spares the handler a thread hop to render()
+        return HttpResponse(response.content, status=response.status_code, headers=response.headers)
+
+    async def aget_object(self, view):
+        """Async version of ``GenericAPIView.get_object()``"""
+        queryset = view.filter_queryset(view.get_queryset())
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        try:
+            instance = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            raise Http404('No %s matches the given query.' % queryset.model._meta.object_name)
+        view.check_object_permissions(view.request, instance)
+        return instance
+
+
+class AsyncListView(AsyncAPIView):
+    """Async ``list()`` for ``ListAPIView`` subclasses"""
+
+    async def get_response(self, view, request):
+        queryset = view.filter_queryset(view.get_queryset())
+        if isinstance(view, FastListMixin):
+            serializer = view.get_fast_serializer()
+            queryset = serializer.prepare(queryset)
+        else:
+            serializer = None
+
+        page = None
+        if view.paginator is not None:
+            page = await view.paginator.apaginate_queryset(queryset, request, view=view)
+        rows = page if page is not None else [row async for row in queryset]
+
+        with timer('serialize'):
+            if serializer is not None:
+                data = await serializer.aserialize(rows)
+            else:
+                data = view.get_serializer(rows, many=True).data
+
+        if page is not None:
+            return view.get_paginated_response(data)
+        return Response(data)
+
+
+class AsyncRetrieveView(AsyncAPIView):
+    """Async ``retrieve()`` for ``RetrieveAPIView`` subclasses"""
+
+    async def get_response(self, view, request):
+        instance = await self.aget_object(view)
+        return Response(view.get_serializer(instance).data)
+
+
+class AsyncEventListView(AsyncListView):
+    view_class = views.EventListCreateView
+
+
+class AsyncUpcomingEventsView(AsyncListView):
+    view_class = views.UpcomingEventsView
+
+
+class AsyncEventDetailView(AsyncRetrieveView):
+    view_class = views.EventDetailView
+
+
+class AsyncCategoryListView(AsyncListView):
+    view_class = views.CategoryListView
+
+
+class AsyncCategoryDetailView(AsyncRetrieveView):
+    view_class = views.CategoryDetailView
+
+    async def get_response(self, view, request):
+        instance = await self.aget_object(view)
+        data = view.get_serializer(instance).data
+        rows = [row async for row in view.get_upcoming_events(instance)]
+        data['upcoming_events'] = view.get_fast_serializer().serialize(
+            rows,
+            category_counts={instance.pk: instance.event_count}
+        )
+        return Response(data)
+
+
+class AsyncCredentialsView(AsyncAPIView):
+    """
+    Base class for async counterparts of the login and registration views.
+
+    Serves POST with ``get_response()``; responses are never cached.
+    """
+
+    async_methods = ('POST',)
+
+    async def post(self, request, *args, **kwargs):
+        return await self.serve(request, self.get_response, *args, **kwargs)
+
+
+class AsyncUserRegistrationView(AsyncCredentialsView):
+    view_class = views.UserRegistrationView
+
+    async def get_response(self, view, request):
+        serializer = view.get_serializer(data=request.data)
+        # The uniqueness checks query the database
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        password = await hashing.arun(make_password, serializer.validated_data['password'])
+        user = await sync_to_async(serializer.save)(password_hash=password)
+        return view.registered_response(user)
+
+
+class AsyncUserLoginView(AsyncCredentialsView):
+    view_class = views.UserLoginView
+
+    async def get_response(self, view, request):
+        serializer = view.get_serializer(data=request.data)
+        attrs = serializer.to_internal_value(request.data)
+        serializer.context['user'] = await hashing.arun(
+            authenticate, request=request, username=attrs['username'], password=attrs['password']
+        )
+        serializer.is_valid(raise_exception=True)
+        return await sync_to_async(view.login_response)(serializer.validated_data['user'])
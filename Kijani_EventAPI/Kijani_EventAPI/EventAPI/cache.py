@@ -0,0 +1,222 @@
+"""
+Response cache for public read endpoints
+
+Responses are stored under a key derived from the path, the normalized
+query string, the auth state, the negotiated media type and the current
+version of every cache group the view depends on. Writes bump group
+versions instead of deleting keys, so an edit only orphans the entries
+that depended on it and the backend ages them out.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .conditional import cached_conditional_response
+
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 60,
+    'KEY_PREFIX': 'eventapi',
+    'ENABLED': True,
+}
+
+EVENTS_GROUP = 'events'
+CATEGORIES_GROUP = 'categories'
+
+
+def event_group(slug):
+    return f'event:{slug}'
+
+
+def get_setting(name):
+    return getattr(settings, 'EVENTAPI_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[get_setting('ALIAS')]
+
+
+def version_key(group):
+    return f"{get_setting('KEY_PREFIX')}:version:{group}"
+
+
+def stats_key(name):
+    return f"{get_setting('KEY_PREFIX')}:stats:{name}"
+
+
+def get_versions(groups):
+    """
+    Return the current version of each group.
+
+    Missing versions are seeded with a nanosecond timestamp rather than a
+    fixed start value, so a version key evicted by the backend can never
+    roll back to a number that old entries were stored under.
+    """
+    cache = get_cache()
+    keys = {group: version_key(group) for group in groups}
+    found = cache.get_many(list(keys.values()))
+    versions = []
+    for group, key in keys.items():
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+        versions.append(f'{group}={found[key]}')
+    return versions
+
+
+async def aget_versions(groups):
+    """Async version of ``get_versions()``"""
+    cache = get_cache()
+    keys = {group: version_key(group) for group in groups}
+    found = await cache.aget_many(list(keys.values()))
+    versions = []
+    for group, key in keys.items():
+        if key not in found:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            found[key] = await cache.aget(key)
+        versions.append(f'{group}={found[key]}')
+    return versions
+
+
+def bump(*groups):
+    """Invalidate every cached response depending on ``groups``"""
+    cache = get_cache()
+    for group in groups:
+        key = version_key(group)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_event(slug, categories=False):
+    """Invalidate responses showing the event ``slug``"""
+    groups = [EVENTS_GROUP, event_group(slug)]
+    if categories:
+        groups.append(CATEGORIES_GROUP)
+    bump(*groups)
+
+
+def record(outcome):
+    cache = get_cache()
+    key = stats_key(outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+async def arecord(outcome):
+    cache = get_cache()
+    key = stats_key(outcome)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+
+
+def get_stats():
+    """Return hit/miss counters for the response cache"""
+    cache = get_cache()
+    found = cache.get_many([stats_key('hits'), stats_key('misses')])
+    hits = found.get(stats_key('hits'), 0)
+    misses = found.get(stats_key('misses'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0.0,
+    }
+
+
+def build_key(request, groups):
+    """Build the cache key for a DRF request"""
+    return make_key(request, get_versions(groups))
+
+
+async def abuild_key(request, groups):
+    """Async version of ``build_key()``"""
+    return make_key(request, await aget_versions(groups))
+
+
+def make_key(request, versions):
+    query = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+    user = request.user
+    auth_state = f'user:{user.pk}' if user and user.is_authenticated else 'anon'
+    raw = '|'.join([
+        request.path,
+        repr(query),
+        auth_state,
+        request.accepted_media_type or '',
+        *versions,
+    ])
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    return f"{get_setting('KEY_PREFIX')}:response:{digest}"
+
+
+class CachedResponseMixin:
+    """
+    Serve GET responses from the response cache.
+
+    Views declare the cache groups they depend on through ``cache_groups``
+    or ``get_cache_groups()``. The lookup runs after authentication,
+    permission checks and content negotiation.
+    """
+
+    cache_groups = (EVENTS_GROUP,)
+    cached_headers = ('ETag', 'Last-Modified', 'Vary', 'Allow')
+
+    def get_cache_groups(self):
+        return self.cache_groups
+
+    def get(self, request, *args, **kwargs):
+        self.response_cache_key = None
+        if get_setting('ENABLED'):
+            key = build_key(request, self.get_cache_groups())
+            cached = get_cache().get(key)
+            if cached is not None:
+                record('hits')
+                not_modified = cached_conditional_response(request._request, cached[3])
+                if not_modified is not None:
+                    return not_modified
+                return self.build_cached_response(cached)
+            record('misses')
+            self.response_cache_key = key
+        return super().get(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, 'response_cache_key', None)
+        if key and hasattr(response, 'render') and self.should_cache_response(response):
+            response.render()
+            get_cache().set(key, self.get_cache_entry(response), get_setting('TIMEOUT'))
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def should_cache_response(self, response):
+        return response.status_code == 200
+
+    def get_cache_entry(self, response):
+        headers = {
+            name: response[name] for name in self.cached_headers if response.has_header(name)
+        }
+        return (response.status_code, response.content, response['Content-Type'], headers)
+
+    def build_cached_response(self, cached):
+        status_code, content, content_type, headers = cached
+        response = HttpResponse(content, content_type=content_type, status=status_code)
+        for name, value in headers.items():
+            response[name] = value
+        response['X-Cache'] = 'HIT'
+        return response
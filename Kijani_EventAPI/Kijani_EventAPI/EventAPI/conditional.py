@@ -0,0 +1,192 @@
+"""
+Conditional GET support (ETag / Last-Modified) driven by Event.updated_at,
+the event dates already passed and the related categories' updated_at
+
+Validators are computed with a cheap query before the view fetches and
+serializes anything, so a matching ``If-None-Match`` or
+``If-Modified-Since`` is answered with ``304 Not Modified`` straight away.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def make_etag(*parts, weak=False):
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def conditional_response(request, etag, last_modified):
+    """
+    Return a 304 (or 412) response if the request preconditions allow it.
+
+    ``last_modified`` is a POSIX timestamp or None.
+    """
+    headers = HttpResponse()
+    if etag:
+        headers['ETag'] = etag
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+        response=headers
+    )
+    return None if response is headers else response
+
+
+def cached_conditional_response(request, cached_headers):
+    """Answer a conditional request from the validators of a cached response"""
+    etag = cached_headers.get('ETag')
+    last_modified = cached_headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return None
+    return conditional_response(
+        request,
+        etag,
+        parse_http_date_safe(last_modified) if last_modified else None
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Add ETag/Last-Modified validators to GET responses.
+
+    Subclasses implement ``get_validators()`` returning ``(etag,
+    last_modified_timestamp)`` or None when the resource does not exist,
+    and ``aget_validators()`` for the async views.
+    """
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    async def aget_validators(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is not None:
+            not_modified = conditional_response(request._request, *validators)
+            if not_modified is not None:
+                return not_modified
+
+        response = super().get(request, *args, **kwargs)
+        if validators is not None and response.status_code == 200:
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_validator_scope(self):
+        """Request attributes that change the representation"""
+        request = self.request
+        user = request.user
+        return (
+            request.accepted_media_type,
+            f'user:{user.pk}' if user and user.is_authenticated else 'anon',
+        )
+
+
+class DetailConditionalGetMixin(ConditionalGetMixin):
+    """
+    Strong ETag derived from everything the representation depends on.
+
+    That is the event's id and updated_at, the latest of its dates already
+    passed (status, ``is_past`` and ``can_register`` change as they pass),
+    its category's updated_at and its organizer's name and email.
+    """
+
+    validator_fields = (
+        'id', 'updated_at', 'event_date', 'end_date', 'registration_deadline',
+        'category_id', 'category__updated_at', 'organizer__username', 'organizer__email',
+    )
+
+    def get_validator_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.get_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).order_by().values_list(*self.validator_fields)
+
+    def get_validators(self):
+        return self.build_validators(self.get_validator_queryset().first(), timezone.now())
+
+    async def aget_validators(self):
+        return self.build_validators(await self.get_validator_queryset().afirst(), timezone.now())
+
+    def build_validators(self, row, now):
+        if row is None:
+            return None
+        pk, updated_at, *dates, category_id, category_updated_at, username, email = row
+        passed = max((date for date in dates if date and date <= now), default=None)
+        etag = make_etag(
+            pk, updated_at.isoformat(), passed.isoformat() if passed else '',
+            category_id, category_updated_at.isoformat() if category_updated_at else '',
+            username, email, *self.get_validator_scope()
+        )
+        last_modified = max(date for date in (updated_at, passed, category_updated_at) if date)
+        return etag, int(last_modified.timestamp())
+
+
+class ListConditionalGetMixin(ConditionalGetMixin):
+    """
+    Weak ETag derived from aggregates over the filtered rows.
+
+    MAX(updated_at) and COUNT catch edits, additions and removals; the
+    latest event, end and registration dates already passed catch rows
+    whose status changed with time; the categories' MAX(updated_at) and
+    COUNT catch renamed categories and changed event counts.
+    """
+
+    validator_dates = ('last_modified', 'started', 'ended', 'closed', 'categories_modified')
+
+    def get_validator_queryset(self):
+        return self.filter_queryset(self.get_queryset()).order_by()
+
+    def get_validator_aggregates(self, now):
+        return {
+            'last_modified': Max('updated_at'),
+            'total': Count('id'),
+            'started': Max('event_date', filter=Q(event_date__lte=now)),
+            'ended': Max('end_date', filter=Q(end_date__lte=now)),
+            'closed': Max('registration_deadline', filter=Q(registration_deadline__lte=now)),
+            'categories_modified': Max('category__updated_at'),
+            'categorized': Count('category'),
+        }
+
+    def get_validators(self):
+        now = timezone.now()
+        return self.build_validators(
+            self.get_validator_queryset().aggregate(**self.get_validator_aggregates(now))
+        )
+
+    async def aget_validators(self):
+        now = timezone.now()
+        return self.build_validators(
+            await self.get_validator_queryset().aaggregate(**self.get_validator_aggregates(now))
+        )
+
+    def build_validators(self, summary):
+        dates = [summary[name] for name in self.validator_dates]
+        query = sorted(
+            (name, value)
+            for name, values in self.request.query_params.lists()
+            for value in values
+        )
+        etag = make_etag(
+            self.request.path,
+            query,
+            *(date.isoformat() if date else '' for date in dates),
+            summary['total'],
+            summary['categorized'],
+            *self.get_validator_scope(),
+            weak=True
+        )
+        dates = [date for date in dates if date]
+        return etag, int(max(dates).timestamp()) if dates else None
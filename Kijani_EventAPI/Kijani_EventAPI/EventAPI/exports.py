@@ -0,0 +1,168 @@
+"""
+Streaming CSV and NDJSON export of events
+
+Rows are read with ``.values()`` through ``QuerySet.iterator()`` (a
+server-side cursor on PostgreSQL) and encoded one database chunk at a
+time into a ``StreamingHttpResponse``, so memory stays flat however many
+events match. Under ASGI the response streams from an async generator
+over ``aiterator()``, since Django would otherwise buffer a sync
+iterator in full before sending it.
+"""
+
+import csv
+import io
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from .fast_serializers import datetime_getter, decimal_getter
+from .renderers import FastJSONRenderer
+
+
+class CSVExportRenderer(BaseRenderer):
+    """Encode export rows as CSV with a header line"""
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not data:
+            return b''
+        return self.encode_header(list(data[0])) + self.encode_rows(data)
+
+    def encode_header(self, fields):
+        return self.encode_lines([fields])
+
+    def encode_rows(self, rows):
+        """Encode dicts sharing one key order"""
+        return self.encode_lines(row.values() for row in rows)
+
+    def encode_lines(self, lines):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(lines)
+        return buffer.getvalue().encode(self.charset)
+
+
+class NDJSONExportRenderer(BaseRenderer):
+    """Encode export rows as newline-delimited JSON objects"""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def __init__(self):
+        self.json_renderer = FastJSONRenderer()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return self.encode_rows(data or [])
+
+    def encode_header(self, fields):
+        return b''
+
+    def encode_rows(self, rows):
+        render = self.json_renderer.render
+        return b''.join(render(row) + b'\n' for row in rows)
+
+
+class EventExporter:
+    """
+    Stream a filtered Event queryset in the format of ``renderer``.
+
+    ``fields`` maps export columns to ``.values()`` columns; datetimes and
+    decimals are formatted like the API serializers.
+    """
+
+    fields = (
+        ('id', 'id'),
+        ('title', 'title'),
+        ('slug', 'slug'),
+        ('description', 'description'),
+        ('event_date', 'event_date'),
+        ('end_date', 'end_date'),
+        ('registration_deadline', 'registration_deadline'),
+        ('location', 'location'),
+        ('latitude', 'latitude'),
+        ('longitude', 'longitude'),
+        ('organizer', 'organizer__username'),
+        ('category', 'category__slug'),
+        ('capacity', 'capacity'),
+        ('current_attendees', 'current_attendees'),
+        ('price', 'price'),
+        ('is_free', 'is_free'),
+        ('status', 'live_status'),
+        ('is_published', 'is_published'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    )
+    chunk_size = 2000
+
+    def __init__(self, renderer, chunk_size=None):
+        self.renderer = renderer
+        self.chunk_size = chunk_size or self.chunk_size
+
+    def get_plan(self):
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        formatters = {
+            'event_date': datetime_getter('event_date', tz),
+            'end_date': datetime_getter('end_date', tz),
+            'registration_deadline': datetime_getter('registration_deadline', tz),
+            'created_at': datetime_getter('created_at', tz),
+            'updated_at': datetime_getter('updated_at', tz),
+            'latitude': decimal_getter('latitude', 9, 6),
+            'longitude': decimal_getter('longitude', 9, 6),
+            'price': decimal_getter('price', 10, 2),
+        }
+        return [(key, formatters.get(column) or itemgetter(column)) for key, column in self.fields]
+
+    def prepare(self, queryset):
+        """Return the rows to export, in primary key order"""
+        return (
+            queryset.prefetch_related(None)
+            .with_live_status()
+            .order_by('pk')
+            .values(*[column for _, column in self.fields])
+        )
+
+    def encode(self, plan, rows):
+        return self.renderer.encode_rows([{key: get(row) for key, get in plan} for row in rows])
+
+    def iter_content(self, queryset):
+        plan = self.get_plan()
+        yield self.renderer.encode_header([key for key, _ in plan])
+        chunk = []
+        for row in self.prepare(queryset).iterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                yield self.encode(plan, chunk)
+                chunk = []
+        if chunk:
+            yield self.encode(plan, chunk)
+
+    async def aiter_content(self, queryset):
+        plan = self.get_plan()
+        yield self.renderer.encode_header([key for key, _ in plan])
+        chunk = []
+        async for row in self.prepare(queryset).aiterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                yield self.encode(plan, chunk)
+                chunk = []
+        if chunk:
+            yield self.encode(plan, chunk)
+
+    def get_response(self, request, queryset, filename='events'):
+        if isinstance(request, ASGIRequest):
+            content = self.aiter_content(queryset)
+        else:
+            content = self.iter_content(queryset)
+        content_type = self.renderer.media_type
+        if self.renderer.charset:
+            content_type = f'{content_type}; charset={self.renderer.charset}'
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{self.renderer.format}"'
+        return response
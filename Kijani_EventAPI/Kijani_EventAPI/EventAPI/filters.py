@@ -3,10 +3,36 @@ Filters for Event queries
 """
 
 import django_filters
+from django import forms
 from django.db import models
+from .geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, filter_nearby
 from .models import Event
 
 
+class PointField(forms.Field):
+    """Form field parsing a ``lat,lng`` pair"""
+
+    default_error_messages = {
+        'invalid': 'Enter a location as "latitude,longitude".',
+        'out_of_range': 'Latitude must be within [-90, 90] and longitude within [-180, 180].',
+    }
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in value.split(','))
+        except ValueError:
+            raise forms.ValidationError(self.error_messages['invalid'], code='invalid')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise forms.ValidationError(self.error_messages['out_of_range'], code='out_of_range')
+        return latitude, longitude
+
+
+class PointFilter(django_filters.Filter):
+    field_class = PointField
+
+
 class EventFilter(django_filters.FilterSet):
     """Custom filter for Event model"""
 
@@ -18,6 +44,8 @@ class EventFilter(django_filters.FilterSet):
     status = django_filters.CharFilter(field_name='status')
     organizer = django_filters.NumberFilter(field_name='organizer__id')
     has_spots = django_filters.BooleanFilter(method='filter_has_spots')
+    near = PointFilter(method='filter_near')
+    radius_km = django_filters.NumberFilter(method='filter_radius', min_value=0, max_value=MAX_RADIUS_KM)
 
     class Meta:
         model = Event
@@ -35,4 +63,15 @@ class EventFilter(django_filters.FilterSet):
             return queryset.filter(current_attendees__lt=models.F('capacity'))
         return queryset
 
+    def filter_near(self, queryset, name, value):
+        radius_km = self.form.cleaned_data.get('radius_km')
+        if radius_km is None:
+            radius_km = DEFAULT_RADIUS_KM
+        latitude, longitude = value
+        return filter_nearby(queryset, latitude, longitude, float(radius_km))
+
+    def filter_radius(self, queryset, name, value):
+        # Consumed by filter_near
+        return queryset
+
 
@@ -0,0 +1,69 @@
+"""
+Geospatial helpers for "events near me" queries
+
+Radius queries run in two steps: an indexed bounding-box prefilter on
+``(latitude, longitude)`` followed by an exact haversine refinement over
+the few rows left inside the box.
+"""
+
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return a Q object matching the box enclosing the search circle.
+
+    Longitude ranges crossing the antimeridian are split in two, and the
+    longitude bound is dropped when the circle reaches a pole.
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = latitude - delta_lat
+    max_lat = latitude + delta_lat
+    query = Q(latitude__gte=max(min_lat, -90), latitude__lte=min(max_lat, 90))
+
+    if min_lat <= -90 or max_lat >= 90:
+        return query & Q(longitude__isnull=False)
+
+    delta_lng = math.degrees(
+        math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude))))
+    )
+    min_lng = longitude - delta_lng
+    max_lng = longitude + delta_lng
+    if min_lng < -180:
+        return query & (Q(longitude__gte=min_lng + 360) | Q(longitude__lte=max_lng))
+    if max_lng > 180:
+        return query & (Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360))
+    return query & Q(longitude__gte=min_lng, longitude__lte=max_lng)
+
+
+def haversine_distance(latitude, longitude):
+    """Database expression for the great-circle distance in kilometres"""
+    lat = Radians(Cast(F('latitude'), FloatField()))
+    lng = Radians(Cast(F('longitude'), FloatField()))
+    origin_lat = math.radians(latitude)
+    origin_lng = math.radians(longitude)
+
+    a = (
+        Power(Sin((lat - Value(origin_lat)) / 2), 2)
+        + Value(math.cos(origin_lat)) * Cos(lat) * Power(Sin((lng - Value(origin_lng)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), Value(1.0)))
+
+
+def filter_nearby(queryset, latitude, longitude, radius_km=DEFAULT_RADIUS_KM):
+    """Restrict ``queryset`` to events within ``radius_km``, nearest first"""
+    return queryset.filter(
+        bounding_box(latitude, longitude, radius_km)
+    ).annotate(
+        distance_km=haversine_distance(latitude, longitude)
+    ).filter(
+        distance_km__lte=radius_km
+    ).order_by('distance_km', 'event_date')
@@ -0,0 +1,146 @@
+"""
+Password hashing off the request workers
+
+Hashing a password takes hundreds of milliseconds of CPU by design, so a
+burst of sign-ups or logins run on the request workers leaves no worker
+for anything else. Here the hasher runs on a small dedicated thread pool
+(the hashers release the GIL) with its own concurrency limit,
+``MAX_WORKERS``. Async views await the result without holding up the event
+loop; sync views block only their own worker. Hashes wait for a thread
+in a queue of at most ``MAX_QUEUE``, for at most ``QUEUE_TIMEOUT``
+seconds; beyond either limit the request fails fast with a 503 and a
+``Retry-After`` header rather than piling up.
+
+Credentials are checked by running ``django.contrib.auth.authenticate()``
+on the executor, for logins and for HTTP Basic authentication
+(``BasicAuthentication``), so the authentication backends and their
+checks stay Django's own.
+
+The hasher itself is picked with ``PASSWORD_HASHERS`` (see the hasher
+profiles in settings); ``PBKDF2_ITERATIONS`` tunes the cost of
+``PBKDF2PasswordHasher``.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.db import close_old_connections
+from rest_framework import authentication, exceptions, status
+
+from .instrumentation import timer
+
+
+DEFAULTS = {
+    'MAX_WORKERS': max(1, (os.cpu_count() or 2) // 2),
+    'MAX_QUEUE': 100,
+    'QUEUE_TIMEOUT': 5.0,
+    'PBKDF2_ITERATIONS': None,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'EVENTAPI_HASHING', {}).get(name, DEFAULTS[name])
+
+
+class HashingBusy(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ins in progress, try again shortly.'
+    default_code = 'hashing_busy'
+
+    def __init__(self, wait):
+        super().__init__()
+        # Sent as Retry-After by DRF's exception handler
+        self.wait = wait
+
+
+class HashingExecutor:
+    """Thread pool with a bounded, time-limited queue"""
+
+    def __init__(self, max_workers, max_queue, queue_timeout):
+        self.pool = ThreadPoolExecutor(max_workers, thread_name_prefix='password-hasher')
+        self.capacity = max_workers + max_queue
+        self.queue_timeout = queue_timeout
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """Schedule ``func(*args, **kwargs)``; raise ``HashingBusy`` when the queue is full"""
+        with self.lock:
+            if self.pending >= self.capacity:
+                raise HashingBusy(self.retry_after())
+            self.pending += 1
+        deadline = time.monotonic() + self.queue_timeout
+
+        def run():
+            try:
+                # Skip work whose caller has been told to retry
+                if time.monotonic() > deadline:
+                    raise HashingBusy(self.retry_after())
+                return func(*args, **kwargs)
+            finally:
+                # Work such as authenticate() queries from the pool threads,
+                # which never see the request_finished signal
+                close_old_connections()
+                with self.lock:
+                    self.pending -= 1
+
+        try:
+            return self.pool.submit(run)
+        except RuntimeError:
+            with self.lock:
+                self.pending -= 1
+            raise
+
+    def retry_after(self):
+        return max(1, round(self.queue_timeout))
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the executor for the current settings"""
+    config = (get_setting('MAX_WORKERS'), get_setting('MAX_QUEUE'), get_setting('QUEUE_TIMEOUT'))
+    executor = _executors.get(config)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.setdefault(config, HashingExecutor(*config))
+    return executor
+
+
+def call(func, *args, **kwargs):
+    """
+    Run ``func(*args, **kwargs)`` on the hashing executor and wait for the result.
+
+    ``call(authenticate, request=request, username=..., password=...)``
+    checks credentials with the configured authentication backends.
+    """
+    with timer('hash'):
+        return get_executor().submit(func, *args, **kwargs).result()
+
+
+async def arun(func, *args, **kwargs):
+    """Async version of ``call()``"""
+    with timer('hash'):
+        return await asyncio.wrap_future(get_executor().submit(func, *args, **kwargs))
+
+
+class BasicAuthentication(authentication.BasicAuthentication):
+    """DRF's HTTP Basic authentication with the credentials checked by ``call()``"""
+
+    def authenticate_credentials(self, userid, password, request=None):
+        return call(super().authenticate_credentials, userid, password, request)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """Django's PBKDF2 hasher, with ``PBKDF2_ITERATIONS`` iterations when set"""
+
+    @property
+    def iterations(self):
+        return get_setting('PBKDF2_ITERATIONS') or hashers.PBKDF2PasswordHasher.iterations
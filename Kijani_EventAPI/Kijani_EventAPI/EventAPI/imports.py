@@ -0,0 +1,175 @@
+"""
+Batched import of events from CSV or NDJSON (JSON lines) files
+
+Files are read as a stream and imported one chunk of rows at a time.
+Organizers and categories are resolved through in-memory maps: all
+active categories are loaded once, and usernames are looked up per chunk
+only when they have not been seen before. Valid rows get their slugs
+allocated for the whole chunk with one range query and are written with
+``bulk_create`` inside one transaction per chunk; invalid rows are
+reported and skipped.
+
+The columns are those of the export endpoint, so an export can be
+imported again. ``import_events`` saves the number of consumed rows to a
+checkpoint file after each committed chunk; a crash between a commit and
+the checkpoint write repeats that one chunk on resume.
+"""
+
+import csv
+import json
+import os
+from collections import deque
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework.exceptions import ValidationError
+
+from . import cache
+from .models import Event, EventCategory
+from .serializers import EventImportSerializer
+from .slugs import bulk_create_with_slugs
+
+
+def read_csv(file):
+    """Yield CSV rows as dicts, leaving out empty cells so they fall back to defaults"""
+    for row in csv.DictReader(file):
+        yield {key: value for key, value in row.items() if key is not None and value != ''}
+
+
+def read_ndjson(file):
+    """Yield one object per non-blank line; malformed lines are yielded as text to fail validation"""
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+def load_checkpoint(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path, state):
+    """Replace the checkpoint atomically, so an interruption never leaves it half written"""
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(state, file)
+    os.replace(temporary, path)
+
+
+class EventImporter:
+    """
+    Import rows (dicts) of event data in chunks.
+
+    ``run()`` yields a summary after each chunk is committed. With
+    ``dry_run`` rows are only validated.
+    """
+
+    serializer_class = EventImportSerializer
+    chunk_size = 1000
+    batch_size = 500
+
+    def __init__(self, chunk_size=None, batch_size=None, organizer=None, dry_run=False):
+        self.chunk_size = chunk_size or self.chunk_size
+        self.batch_size = batch_size or self.batch_size
+        self.default_organizer = organizer
+        self.dry_run = dry_run
+        self.organizers = {}
+        self.unknown_organizers = set()
+        self.categories = None
+        self.serializer = None
+
+    def load_categories(self):
+        return {category.slug: category for category in EventCategory.objects.filter(is_active=True)}
+
+    def load_organizers(self, rows):
+        """Add the organizers referenced by ``rows`` that are not in the map yet"""
+        usernames = {
+            row.get('organizer') for row in rows
+            if isinstance(row, dict) and isinstance(row.get('organizer'), str)
+        }
+        usernames -= self.organizers.keys() | self.unknown_organizers
+        if usernames:
+            found = get_user_model().objects.filter(username__in=usernames).in_bulk(field_name='username')
+            self.organizers.update(found)
+            self.unknown_organizers |= usernames - found.keys()
+
+    def get_serializer(self):
+        # One serializer for every row, so its fields are only built once
+        if self.serializer is None:
+            self.serializer = self.serializer_class(context={
+                'organizers': self.organizers,
+                'categories': self.categories,
+            })
+        return self.serializer
+
+    def prepare_row(self, row):
+        if isinstance(row, dict) and self.default_organizer and not row.get('organizer'):
+            row['organizer'] = self.default_organizer
+        return row
+
+    def import_chunk(self, rows, first_row):
+        """
+        Validate ``rows`` and write the valid ones.
+
+        Returns the new events and a dict of validation errors keyed by
+        row number.
+        """
+        rows = [self.prepare_row(row) for row in rows]
+        self.load_organizers(rows)
+        serializer = self.get_serializer()
+        now = timezone.now()
+        events, bases, errors = [], [], {}
+        for number, row in enumerate(rows, first_row):
+            serializer.initial_data = row
+            try:
+                data = serializer.run_validation(row)
+            except ValidationError as exc:
+                errors[number] = exc.detail
+                continue
+            base = data.pop('slug', '')
+            event = Event(**data)
+            event.update_status(now)
+            events.append(event)
+            bases.append(base or slugify(event.title))
+
+        if events and not self.dry_run:
+            bulk_create_with_slugs(Event.objects.all(), events, bases, batch_size=self.batch_size)
+            EventCategory.objects.touch()
+            cache.bump(cache.EVENTS_GROUP, cache.CATEGORIES_GROUP)
+        return events, errors
+
+    def run(self, rows, skip=0):
+        """Import ``rows`` after the first ``skip``, yielding a summary per chunk"""
+        rows = iter(rows)
+        deque(islice(rows, skip), maxlen=0)
+        if self.categories is None:
+            self.categories = self.load_categories()
+        last_row = skip
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            events, errors = self.import_chunk(chunk, last_row + 1)
+            last_row += len(chunk)
+            yield {
+                'last_row': last_row,
+                'rows': len(chunk),
+                'imported': len(events),
+                'errors': errors,
+            }
@@ -0,0 +1,183 @@
+"""
+Per-request performance instrumentation
+
+``InstrumentationMiddleware`` measures every request: total time, the
+number and duration of SQL queries on every database alias (through
+``connection.execute_wrapper``), serialization time and response size.
+The figures are sent back in a ``Server-Timing`` header, which browser
+dev tools display next to the request, and logged as one JSON line per
+request on the ``EventAPI.performance`` logger, keyed by the resolved
+view name. Requests over ``QUERY_BUDGET`` queries or
+``LATENCY_BUDGET_MS`` are logged at WARNING with ``over_budget`` set.
+
+Serialization time covers the fast serializers and response rendering;
+other code can time its own phases with ``timer()``. Queries run while a
+streaming response is consumed happen after the request is measured and
+are not counted.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'QUERY_BUDGET': 20,
+    'LATENCY_BUDGET_MS': 500,
+}
+
+logger = logging.getLogger('EventAPI.performance')
+
+current_metrics = contextvars.ContextVar('eventapi_request_metrics', default=None)
+
+
+def get_setting(name):
+    return getattr(settings, 'EVENTAPI_INSTRUMENTATION', {}).get(name, DEFAULTS[name])
+
+
+class RequestMetrics:
+    """Timings of one request; also the execute wrapper counting its queries"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.phases = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def install(self):
+        """Count the queries of this thread's connections, on every alias"""
+        self.wrappers = contextlib.ExitStack()
+        for alias in connections:
+            self.wrappers.enter_context(connections[alias].execute_wrapper(self))
+
+    def uninstall(self):
+        self.wrappers.close()
+
+
+@contextlib.contextmanager
+def timer(name):
+    """Add the time spent in the block to phase ``name`` of the current request"""
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(name, time.perf_counter() - started)
+
+
+def server_timing(metrics, total):
+    entries = [f'db;dur={metrics.sql_time * 1000:.2f};desc="{metrics.queries} queries"']
+    entries.extend(f'{name};dur={seconds * 1000:.2f}' for name, seconds in metrics.phases.items())
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+
+class InstrumentationMiddleware:
+    """Measure each request; put it first in ``MIDDLEWARE`` so it times the whole stack"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not get_setting('ENABLED'):
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        metrics.install()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.uninstall()
+            current_metrics.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        if not get_setting('ENABLED'):
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        # Connections are per thread: wrap those of the thread that runs
+        # this request's sync code and ORM calls. Removing the wrappers
+        # needs no second hop, as that thread is done with the request.
+        await sync_to_async(metrics.install)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.uninstall()
+            current_metrics.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        """Time the rendering of DRF (and template) responses"""
+        metrics = current_metrics.get()
+        if metrics is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                metrics.add('serialize', time.perf_counter() - started)
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        if get_setting('SERVER_TIMING'):
+            timing = server_timing(metrics, total)
+            if response.has_header('Server-Timing'):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response['Server-Timing'] = timing
+
+        over_budget = []
+        if metrics.queries > get_setting('QUERY_BUDGET'):
+            over_budget.append('queries')
+        if total * 1000 > get_setting('LATENCY_BUDGET_MS'):
+            over_budget.append('latency')
+        level = logging.WARNING if over_budget else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'queries': metrics.queries,
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            **{f'{name}_ms': round(seconds * 1000, 2) for name, seconds in metrics.phases.items()},
+            'bytes': None if response.streaming else len(response.content),
+            'over_budget': over_budget,
+        }
+        logger.log(level, json.dumps(record), extra={'metrics': record})
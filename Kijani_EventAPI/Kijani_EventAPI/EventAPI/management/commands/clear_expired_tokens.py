@@ -0,0 +1,27 @@
+"""
+Delete expired API tokens
+
+Every login adds an ``ApiToken`` row and expired tokens are only rejected,
+not removed, so this command is meant to run periodically from cron, like
+Django's ``clearsessions``.
+"""
+
+from django.core.management.base import BaseCommand
+
+from EventAPI.models import ApiToken, ApiTokenQuerySet
+
+
+class Command(BaseCommand):
+    help = 'Delete expired API tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ApiTokenQuerySet.EXPIRED_BATCH_SIZE,
+            help='Tokens deleted per statement'
+        )
+
+    def handle(self, *args, **options):
+        deleted = ApiToken.objects.delete_expired(batch_size=options['batch_size'])
+        self.stdout.write(f'Deleted {deleted} expired tokens')
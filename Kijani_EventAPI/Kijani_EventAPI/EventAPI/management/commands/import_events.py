@@ -0,0 +1,134 @@
+"""
+Import events from a CSV or NDJSON (JSON lines) file
+
+Takes the columns of ``/api/v1/events/export/``; ``id``, ``status`` and
+the timestamps are ignored, and a free ``slug`` is kept. Progress is
+checkpointed after every committed chunk, so running the same command
+again after an interruption resumes where it stopped.
+"""
+
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from EventAPI.imports import READERS, EventImporter, load_checkpoint, save_checkpoint
+
+
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+
+class Command(BaseCommand):
+    help = 'Import events from a CSV or NDJSON file in batched, resumable chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='File format (default: from the file extension)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EventImporter.chunk_size,
+            help='Rows validated and committed together'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EventImporter.batch_size,
+            help='Rows per INSERT statement'
+        )
+        parser.add_argument('--organizer', help='Username used for rows without an organizer')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: PATH.checkpoint)')
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore an existing checkpoint and import from the first row'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row without writing anything'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or self.guess_format(path)
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+        dry_run = options['dry_run']
+        try:
+            size = os.path.getsize(path)
+        except OSError as exc:
+            raise CommandError(exc)
+
+        state = {'size': size, 'rows': 0, 'imported': 0, 'invalid': 0, 'complete': False}
+        if not dry_run and not options['restart']:
+            state = self.resume(checkpoint_path, state)
+            if state['complete']:
+                self.stdout.write(f'{path} was already imported; use --restart to import it again.')
+                return
+
+        importer = EventImporter(
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            organizer=options['organizer'],
+            dry_run=dry_run
+        )
+        processed = imported = invalid = 0
+        started = time.perf_counter()
+        with open(path, newline='', encoding='utf-8') as file:
+            try:
+                for chunk in importer.run(READERS[file_format](file), skip=state['rows']):
+                    for number, detail in chunk['errors'].items():
+                        self.stderr.write(f'row {number}: {json.dumps(detail)}')
+                    processed += chunk['rows']
+                    imported += chunk['imported']
+                    invalid += len(chunk['errors'])
+                    if not dry_run:
+                        state['rows'] = chunk['last_row']
+                        state['imported'] += chunk['imported']
+                        state['invalid'] += len(chunk['errors'])
+                        save_checkpoint(checkpoint_path, state)
+                    if options['verbosity'] >= 2:
+                        self.stdout.write(
+                            f"rows {chunk['last_row'] - chunk['rows'] + 1}-{chunk['last_row']}: "
+                            f"{chunk['imported']} valid, {len(chunk['errors'])} invalid"
+                        )
+            except KeyboardInterrupt:
+                raise CommandError(f"Interrupted after row {state['rows']}; run again to resume.")
+
+        if not dry_run:
+            state['complete'] = True
+            save_checkpoint(checkpoint_path, state)
+        elapsed = time.perf_counter() - started
+        verb = 'Validated' if dry_run else 'Imported'
+        self.stdout.write(
+            f'{verb} {imported} events, {invalid} invalid rows skipped; '
+            f'{processed} rows in {elapsed:.2f}s ({processed / elapsed if elapsed else 0:.0f} rows/s)'
+        )
+
+    def guess_format(self, path):
+        file_format = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if file_format is None:
+            raise CommandError(f'Cannot tell the format of {path}; pass --format.')
+        return file_format
+
+    def resume(self, checkpoint_path, state):
+        """Return the saved progress for this file, if any"""
+        saved = load_checkpoint(checkpoint_path)
+        if saved is None:
+            return state
+        if saved.get('size') != state['size']:
+            raise CommandError(
+                f'The file changed since {checkpoint_path} was written; use --restart to import it from the start.'
+            )
+        if not saved['complete']:
+            self.stdout.write(f"Resuming after row {saved['rows']}")
+        return saved
@@ -0,0 +1,66 @@
+"""
+Generate synthetic events for performance work
+
+Creates ``--events`` events with realistic distributions of dates,
+categories, organizers, locations and attendance (see
+``EventAPI.seeding``). The same ``--seed`` always generates the same
+events relative to the current time; seeding again needs another seed,
+as the slugs are numbered per seed.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from EventAPI.seeding import BATCH_SIZE, seed_events
+
+
+class Command(BaseCommand):
+    help = 'Generate millions of synthetic events, organizers and categories in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=100000, help='Number of events to create')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument('--organizers', type=int, help='Number of organizers (default: one per 50 events)')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Rows written per transaction'
+        )
+        parser.add_argument(
+            '--keep-indexes',
+            action='store_true',
+            help='Maintain the indexes row by row instead of rebuilding them; faster for a few rows '
+                 'added to a large table'
+        )
+
+    def handle(self, *args, **options):
+        count = options['events']
+        verbosity = options['verbosity']
+        started = time.perf_counter()
+
+        def progress(written):
+            if verbosity >= 2:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'{written} events ({written / elapsed:.0f} rows/s)')
+
+        try:
+            written = seed_events(
+                count,
+                seed=options['seed'],
+                organizers=options['organizers'],
+                batch_size=options['batch_size'],
+                defer_indexes=not options['keep_indexes'],
+                progress=progress
+            )
+        except IntegrityError:
+            raise CommandError(f"Events for seed {options['seed']} already exist; pass another --seed.")
+        except KeyboardInterrupt:
+            raise CommandError('Interrupted; the batches written so far were kept.')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Created {written} events in {elapsed:.2f}s ({written / elapsed if elapsed else 0:.0f} rows/s)'
+        )
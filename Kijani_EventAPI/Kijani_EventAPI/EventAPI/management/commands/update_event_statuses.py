@@ -0,0 +1,50 @@
+"""
+Move event statuses forward (upcoming -> ongoing -> completed)
+
+``Event.save()`` only recomputes ``status`` when a row is written, so this
+command is meant to run periodically, either from cron or as a
+long-running worker with ``--interval``.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from EventAPI import cache
+from EventAPI.models import Event, EventQuerySet
+
+
+class Command(BaseCommand):
+    help = 'Transition event statuses whose dates have passed using batched UPDATEs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EventQuerySet.STATUS_BATCH_SIZE,
+            help='Rows per UPDATE statement'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep running, transitioning statuses every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                self.run_once(options['batch_size'])
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def run_once(self, batch_size):
+        started = time.perf_counter()
+        counts = Event.objects.transition_statuses(batch_size=batch_size)
+        if any(counts.values()):
+            cache.bump(cache.EVENTS_GROUP, cache.CATEGORIES_GROUP)
+        summary = ', '.join(f'{name}: {count}' for name, count in counts.items())
+        self.stdout.write(f'{summary} ({time.perf_counter() - started:.2f}s)')
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventAPI', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRegistration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('confirmed', 'Confirmed'), ('waitlisted', 'Waitlisted'), ('cancelled', 'Cancelled')], default='confirmed', max_length=20)),
+                ('waitlist_position', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registrations', to='EventAPI.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_registrations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Event Registration',
+                'verbose_name_plural': 'Event Registrations',
+                'db_table': 'event_registrations',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['event', 'status', 'waitlist_position'], name='event_regis_event_i_680646_idx'), models.Index(fields=['user', 'status'], name='event_regis_user_id_d6b1a1_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'cancelled'), _negated=True), fields=('event', 'user'), name='unique_active_registration'), models.UniqueConstraint(fields=('event', 'waitlist_position'), name='unique_waitlist_position')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventAPI', '0003_event_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='events_status_8890b6_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='event',
+            name='events_organiz_1c7a2e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='event',
+            name='events_categor_fd16be_idx',
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['organizer', 'event_date'], name='events_organiz_8ac0f9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'event_date'], name='events_categor_f86b23_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['status', 'event_date'], name='events_published_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('current_attendees__lt', models.F('capacity'))), fields=['event_date'], name='events_has_spots_idx'),
+        ),
+    ]
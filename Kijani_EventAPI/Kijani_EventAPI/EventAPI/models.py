@@ -1,9 +1,32 @@
-from django.db import models
+from functools import partial
+
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.utils.text import slugify
 from django.utils import timezone
 
+from .slugs import save_with_unique_slug
+
+
+class EventCategoryQuerySet(models.QuerySet):
+    """QuerySet for event categories"""
+
+    def with_event_count(self):
+        """Annotate the published event count in the same query"""
+        return self.annotate(
+            event_count=models.Count('events', filter=models.Q(events__is_published=True))
+        )
+
+    def touch(self):
+        """
+        Move ``updated_at`` forward without saving the rows.
+
+        Called when event writes change the published event counts, which
+        are part of every category representation.
+        """
+        return self.update(updated_at=timezone.now())
+
 
 class EventCategory(models.Model):
     """Event categories for classification"""
@@ -14,6 +37,9 @@ class EventCategory(models.Model):
     icon = models.CharField(max_length=50, blank=True, null=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EventCategoryQuerySet.as_manager()
 
     class Meta:
         db_table = 'event_categories'
@@ -29,14 +55,158 @@ class EventCategory(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_slug(self, slugify(self.name), partial(super().save, *args, **kwargs))
 
     @property
     def event_count(self):
-        """Return count of active events in this category"""
-        return self.events.filter(is_published=True).count()
+        """
+        Return count of published events in this category.
+
+        Uses the value annotated by ``with_event_count()`` when present and
+        only falls back to a COUNT query for unannotated instances.
+        """
+        if '_event_count' not in self.__dict__:
+            self._event_count = self.events.filter(is_published=True).count()
+        return self._event_count
+
+    @event_count.setter
+    def event_count(self, value):
+        self._event_count = value
+
+
+def live_status_expression(now):
+    """SQL equivalent of ``Event.compute_status(now)``"""
+    return models.Case(
+        models.When(status='cancelled', then=models.Value('cancelled')),
+        models.When(event_date__gt=now, then=models.Value('upcoming')),
+        models.When(end_date__lt=now, then=models.Value('completed')),
+        default=models.Value('ongoing'),
+        output_field=models.CharField(),
+    )
+
+
+class EventQuerySet(models.QuerySet):
+    """QuerySet with atomic seat accounting helpers"""
+
+    STATUS_BATCH_SIZE = 10000
+
+    def with_related(self):
+        """
+        Load organizer and category for serialization.
+
+        Categories are prefetched with their event count annotated, so a
+        page of events costs a constant number of queries.
+        """
+        return self.select_related('organizer').prefetch_related(
+            models.Prefetch('category', queryset=EventCategory.objects.with_event_count())
+        )
+
+    def reserve_seats(self, event_id, seats=1):
+        """
+        Atomically reserve ``seats`` seats on an event.
+
+        Runs a single conditional UPDATE that only matches while enough
+        seats remain, so concurrent callers can never push
+        ``current_attendees`` past ``capacity``. Returns True on success.
+        """
+        if seats < 1:
+            raise ValueError("seats must be at least 1")
+        updated = self.filter(
+            pk=event_id,
+            current_attendees__lte=models.F('capacity') - seats,
+        ).update(
+            current_attendees=models.F('current_attendees') + seats,
+            updated_at=timezone.now()
+        )
+        return updated == 1
+
+    def release_seats(self, event_id, seats=1):
+        """
+        Atomically release ``seats`` previously reserved seats.
+
+        The UPDATE only matches while at least ``seats`` are held, so the
+        counter never goes negative. Returns True on success.
+        """
+        if seats < 1:
+            raise ValueError("seats must be at least 1")
+        updated = self.filter(
+            pk=event_id,
+            current_attendees__gte=seats,
+        ).update(
+            current_attendees=models.F('current_attendees') - seats,
+            updated_at=timezone.now()
+        )
+        return updated == 1
+
+    def available_spots(self, event_id):
+        """Return the number of free seats on an event"""
+        free = self.filter(pk=event_id).values_list(
+            models.F('capacity') - models.F('current_attendees'), flat=True
+        ).first()
+        return max(0, free or 0)
+
+    def with_live_status(self, now=None):
+        """
+        Annotate ``live_status``, the status implied by the dates at ``now``.
+
+        Exact even for rows ``transition_statuses()`` has not reached yet.
+        """
+        return self.annotate(live_status=live_status_expression(now or timezone.now()))
+
+    def status_transitions(self, now):
+        """Return ``(name, condition, new status)`` for each stale status"""
+        return [
+            (
+                'started',
+                models.Q(status='upcoming', event_date__lte=now),
+                models.Case(
+                    models.When(end_date__lt=now, then=models.Value('completed')),
+                    default=models.Value('ongoing'),
+                ),
+            ),
+            (
+                'ended',
+                models.Q(status='ongoing', end_date__lt=now),
+                models.Value('completed'),
+            ),
+            (
+                'rescheduled',
+                models.Q(status__in=['ongoing', 'completed'], event_date__gt=now),
+                models.Value('upcoming'),
+            ),
+        ]
+
+    def transition_statuses(self, now=None, batch_size=None):
+        """
+        Bring ``status`` in line with the event dates using set-based UPDATEs.
+
+        Each transition runs ``UPDATE ... WHERE id IN (SELECT id ... LIMIT
+        batch_size)`` until a batch comes back short. Every condition
+        starts with a status equality followed by an event_date range or an
+        end_date filter on the few ongoing rows, so the (status, event_date)
+        index finds exactly the stale rows. A table of any size takes
+        ``rows // batch_size + 1`` statements per transition, and no single
+        statement holds the write lock for long. Returns the number of rows
+        moved per transition.
+        """
+        now = now or timezone.now()
+        batch_size = batch_size or self.STATUS_BATCH_SIZE
+        counts = {}
+        for name, condition, new_status in self.status_transitions(now):
+            counts[name] = 0
+            while True:
+                batch = self.filter(condition).order_by().values('pk')[:batch_size]
+                updated = self.model.objects.filter(pk__in=models.Subquery(batch)).update(
+                    status=new_status,
+                    updated_at=now
+                )
+                counts[name] += updated
+                if updated < batch_size:
+                    break
+        return counts
 
 
 class Event(models.Model):
@@ -106,8 +276,7 @@ class Event(models.Model):
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
-        default='upcoming',
-        db_index=True
+        default='upcoming'
     )
     is_published = models.BooleanField(default=True, db_index=True)
 
@@ -118,6 +287,8 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         db_table = 'events'
         ordering = ['-event_date']
@@ -125,9 +296,20 @@ class Event(models.Model):
         verbose_name_plural = 'Events'
         indexes = [
             models.Index(fields=['event_date', 'is_published']),
-            models.Index(fields=['status']),
-            models.Index(fields=['organizer']),
-            models.Index(fields=['category']),
+            models.Index(fields=['organizer', 'event_date']),
+            models.Index(fields=['category', 'event_date']),
+            models.Index(fields=['latitude', 'longitude']),
+            models.Index(fields=['status', 'event_date'], name='events_status_date_idx'),
+            models.Index(
+                fields=['status', 'event_date'],
+                condition=models.Q(is_published=True),
+                name='events_published_status_idx'
+            ),
+            models.Index(
+                fields=['event_date'],
+                condition=models.Q(current_attendees__lt=models.F('capacity')),
+                name='events_has_spots_idx'
+            ),
         ]
         constraints = [
             models.CheckConstraint(
@@ -149,26 +331,41 @@ class Event(models.Model):
 
     def save(self, *args, **kwargs):
         """Generate slug and update status"""
-        if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Event.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-
-        # Auto-update status based on dates
-        now = timezone.now()
-        if self.status != 'cancelled':
-            if self.event_date > now:
-                self.status = 'upcoming'
-            elif self.end_date and self.end_date < now:
-                self.status = 'completed'
-            elif self.event_date <= now and (not self.end_date or self.end_date >= now):
-                self.status = 'ongoing'
-
-        super().save(*args, **kwargs)
+        self.update_status()
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_slug(self, slugify(self.title), partial(super().save, *args, **kwargs))
+
+    def compute_status(self, now=None):
+        """Return the status implied by the event dates"""
+        now = now or timezone.now()
+        if self.status == 'cancelled':
+            return 'cancelled'
+        if self.event_date > now:
+            return 'upcoming'
+        if self.end_date and self.end_date < now:
+            return 'completed'
+        return 'ongoing'
+
+    def update_status(self, now=None):
+        """Auto-update status based on dates"""
+        self.status = self.compute_status(now)
+
+    @property
+    def live_status(self):
+        """
+        Return the current status even if ``status`` is stale.
+
+        Uses the value annotated by ``with_live_status()`` when present.
+        """
+        if '_live_status' not in self.__dict__:
+            self._live_status = self.compute_status()
+        return self._live_status
+
+    @live_status.setter
+    def live_status(self, value):
+        self._live_status = value
 
     @property
     def is_full(self):
@@ -200,13 +397,258 @@ class Event(models.Model):
             return False
         return True
 
+    def reserve_seats(self, seats=1):
+        """
+        Reserve seats without a read-modify-write round trip.
+
+        Issues exactly one query. On success the in-memory counter is
+        advanced by ``seats``; call ``refresh_from_db()`` if the exact
+        value written by concurrent reservations is needed.
+        """
+        reserved = Event.objects.reserve_seats(self.pk, seats)
+        if reserved:
+            self.current_attendees += seats
+        return reserved
+
+    def release_seats(self, seats=1):
+        """Release previously reserved seats in a single query"""
+        released = Event.objects.release_seats(self.pk, seats)
+        if released:
+            self.current_attendees = max(0, self.current_attendees - seats)
+        return released
+
     def increment_attendees(self):
-        """Increment attendee count"""
-        self.current_attendees += 1
-        self.save(update_fields=['current_attendees'])
+        """Increment attendee count if a seat is free"""
+        return self.reserve_seats(1)
 
     def decrement_attendees(self):
         """Decrement attendee count"""
-        if self.current_attendees > 0:
-            self.current_attendees -= 1
-            self.save(update_fields=['current_attendees'])
+        return self.release_seats(1)
+
+
+class DuplicateRegistration(IntegrityError):
+    """The user already holds an active registration for the event"""
+
+
+class EventRegistrationQuerySet(models.QuerySet):
+    """QuerySet implementing registration and waitlist queue operations"""
+
+    WAITLIST_APPEND_ATTEMPTS = 3
+
+    def waitlist(self, event_id):
+        """Waitlisted registrations for an event in queue order"""
+        return self.filter(
+            event_id=event_id,
+            status='waitlisted'
+        ).order_by('waitlist_position')
+
+    def register(self, event, user):
+        """
+        Register ``user`` for ``event``.
+
+        Takes a seat when one is free, otherwise appends the user to the
+        end of the waitlist if the event allows it. Returns the new
+        registration, or None when the event is full without a waitlist.
+        Raises ``DuplicateRegistration`` (releasing the seat) when a
+        concurrent request registered the same user first.
+        """
+        with transaction.atomic():
+            if Event.objects.reserve_seats(event.pk):
+                return self.create_registration(event, user, status='confirmed')
+            if not event.allow_waitlist:
+                return None
+            for attempt in range(self.WAITLIST_APPEND_ATTEMPTS):
+                last_position = self.filter(
+                    event_id=event.pk,
+                    waitlist_position__isnull=False
+                ).aggregate(last=models.Max('waitlist_position'))['last'] or 0
+                try:
+                    return self.create_registration(
+                        event,
+                        user,
+                        status='waitlisted',
+                        waitlist_position=last_position + 1
+                    )
+                except DuplicateRegistration:
+                    raise
+                except IntegrityError:
+                    # Another writer took the same queue slot; re-read the tail.
+                    if attempt == self.WAITLIST_APPEND_ATTEMPTS - 1:
+                        raise
+
+    def create_registration(self, event, user, **fields):
+        """Insert a registration, telling a duplicate apart from other constraint failures"""
+        try:
+            with transaction.atomic():
+                return self.create(event=event, user=user, **fields)
+        except IntegrityError:
+            if self.filter(event_id=event.pk, user=user).exclude(status='cancelled').exists():
+                raise DuplicateRegistration(f'{user} is already registered for {event}')
+            raise
+
+    def cancel(self, registration):
+        """
+        Cancel a registration.
+
+        A confirmed seat is handed straight to the head of the waitlist
+        (one indexed lookup plus one conditional update); the seat is only
+        released when nobody is waiting.
+        """
+        with transaction.atomic():
+            # Decide from the row rather than the instance, which a
+            # concurrent promotion may have confirmed since it was loaded.
+            now = timezone.now()
+            was_confirmed = self.filter(pk=registration.pk, status='confirmed').update(
+                status='cancelled',
+                waitlist_position=None,
+                updated_at=now
+            )
+            if not was_confirmed:
+                self.filter(pk=registration.pk, status='waitlisted').update(
+                    status='cancelled',
+                    waitlist_position=None,
+                    updated_at=now
+                )
+            registration.status = 'cancelled'
+            registration.waitlist_position = None
+            if not was_confirmed:
+                return None
+
+            next_in_line = self.waitlist(registration.event_id).first()
+            if next_in_line and self.filter(
+                pk=next_in_line.pk,
+                status='waitlisted'
+            ).update(status='confirmed', waitlist_position=None, updated_at=timezone.now()):
+                return next_in_line
+            Event.objects.release_seats(registration.event_id)
+            return None
+
+    def promote_waitlist(self, event_id, seats):
+        """
+        Promote up to ``seats`` waitlisted registrations in queue order.
+
+        Seats are reserved up front and the promotion itself is a single
+        batched UPDATE. When concurrent registrations took some of the
+        seats, the ones still free are used. Returns the number of
+        registrations promoted.
+        """
+        with transaction.atomic():
+            count = min(seats, self.waitlist(event_id).count())
+            while count > 0 and not Event.objects.reserve_seats(event_id, count):
+                count = min(count - 1, Event.objects.available_spots(event_id))
+            if count < 1:
+                return 0
+            head = self.waitlist(event_id).values('pk')[:count]
+            promoted = self.filter(pk__in=models.Subquery(head)).update(
+                status='confirmed',
+                waitlist_position=None,
+                updated_at=timezone.now()
+            )
+            if promoted < count:
+                Event.objects.release_seats(event_id, count - promoted)
+            return promoted
+
+
+class EventRegistration(models.Model):
+    """Attendee registration or waitlist entry for an event"""
+
+    STATUS_CHOICES = [
+        ('confirmed', 'Confirmed'),
+        ('waitlisted', 'Waitlisted'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='registrations'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='event_registrations'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='confirmed'
+    )
+    waitlist_position = models.PositiveIntegerField(blank=True, null=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EventRegistrationQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'event_registrations'
+        ordering = ['created_at']
+        verbose_name = 'Event Registration'
+        verbose_name_plural = 'Event Registrations'
+        indexes = [
+            models.Index(fields=['event', 'status', 'waitlist_position']),
+            models.Index(fields=['user', 'status']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'user'],
+                condition=~models.Q(status='cancelled'),
+                name='unique_active_registration'
+            ),
+            models.UniqueConstraint(
+                fields=['event', 'waitlist_position'],
+                name='unique_waitlist_position'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.event} ({self.status})"
+
+
+class ApiTokenQuerySet(models.QuerySet):
+    """QuerySet for API tokens"""
+
+    EXPIRED_BATCH_SIZE = 1000
+
+    def expired(self, now=None):
+        return self.filter(expires_at__lte=now or timezone.now())
+
+    def delete_expired(self, now=None, batch_size=EXPIRED_BATCH_SIZE):
+        """Delete expired tokens ``batch_size`` at a time; return how many were deleted"""
+        now = now or timezone.now()
+        deleted = 0
+        while True:
+            batch = list(self.expired(now).values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            deleted += self.filter(pk__in=batch).delete()[0]
+
+
+class ApiToken(models.Model):
+    """
+    Bearer token issued at login.
+
+    The token sent by clients is signed (see ``tokens.py``); this row only
+    records that it is still valid, so deleting it revokes the token.
+    """
+
+    key = models.CharField(max_length=32, unique=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='api_tokens'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = ApiTokenQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'api_tokens'
+        ordering = ['-created_at']
+        verbose_name = 'API Token'
+        verbose_name_plural = 'API Tokens'
+
+    def __str__(self):
+        return f"{self.user} ({self.key[:6]}...)"
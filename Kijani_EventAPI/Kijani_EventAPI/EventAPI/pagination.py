@@ -2,8 +2,16 @@
 Custom pagination classes
 """
 
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from collections.abc import Mapping
+from datetime import datetime
+
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
@@ -13,6 +21,26 @@ class CustomPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of ``paginate_queryset()``"""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return [item async for item in self.page.object_list]
+
     def get_paginated_response(self, data):
         return Response({
             'count': self.page.paginator.count,
@@ -22,3 +50,201 @@ class CustomPagination(PageNumberPagination):
         })
 
 
+class EventCursorPagination(BasePagination):
+    """
+    Keyset pagination over ``(event_date, id)``.
+
+    Pages are fetched with a range predicate on the ordering key instead of
+    OFFSET, so every page costs the same no matter how deep it is. The total
+    count is skipped unless ``include_count=true`` is passed. Querysets
+    already ordered by something else, such as search relevance or
+    distance, are refused with a 400 rather than silently re-sorted.
+    """
+
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'include_count'
+    invalid_cursor_message = 'Invalid cursor'
+    invalid_ordering_message = 'Cursor pagination follows the event date; it cannot be used with results ordered by {ordering}.'
+    ordering_fields = ('event_date', 'id', 'pk')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare_page(queryset, request)
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.count = self.page_queryset.count()
+        return self.finish_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of ``paginate_queryset()``"""
+        queryset = self.prepare_page(queryset, request)
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.count = await self.page_queryset.acount()
+        return self.finish_page([item async for item in queryset])
+
+    def prepare_page(self, queryset, request):
+        """Return the (unevaluated) queryset for the requested page"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        self.count = None
+        self.page_queryset = queryset
+        self.check_ordering(queryset)
+
+        self.reverse = self.cursor is not None and self.cursor[2]
+        if self.reverse:
+            queryset = queryset.order_by('event_date', 'id')
+        else:
+            queryset = queryset.order_by('-event_date', '-id')
+
+        if self.cursor is not None:
+            event_date, pk, _ = self.cursor
+            if self.reverse:
+                queryset = queryset.filter(event_date__gte=event_date).exclude(
+                    event_date=event_date, id__lte=pk
+                )
+            else:
+                queryset = queryset.filter(event_date__lte=event_date).exclude(
+                    event_date=event_date, id__gte=pk
+                )
+
+        return queryset[:self.page_size + 1]
+
+    def check_ordering(self, queryset):
+        """Refuse a queryset ordered by anything but the keyset fields"""
+        ordering = queryset.query.order_by
+        others = [
+            str(field) for field in ordering
+            if not isinstance(field, str) or field.lstrip('-') not in self.ordering_fields
+        ]
+        if others:
+            raise ValidationError({
+                self.cursor_query_param: self.invalid_ordering_message.format(ordering=', '.join(others))
+            })
+
+    def finish_page(self, results):
+        """Trim the look-ahead row and record the page state"""
+        has_following = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_paginated_response(self, data):
+        payload = {}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload.update({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.build_link(self.page[0], reverse=True)
+
+    def build_link(self, item, reverse):
+        event_date, pk = self.get_position(item)
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(event_date, pk, reverse)
+        )
+
+    @staticmethod
+    def get_position(item):
+        """Return the ordering key of a model instance or a values() row"""
+        if isinstance(item, Mapping):
+            return item['event_date'], item['id']
+        return item.event_date, item.id
+
+    @staticmethod
+    def encode_cursor(event_date, pk, reverse):
+        payload = json.dumps([event_date.isoformat(), pk, int(reverse)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            event_date, pk, reverse = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            return datetime.fromisoformat(event_date), int(pk), bool(reverse)
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class EventListPagination(CustomPagination):
+    """
+    Page-number pagination with an opt-in keyset mode.
+
+    Passing ``cursor`` (or ``pagination=cursor`` for the first page)
+    switches to ``EventCursorPagination``.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_class = EventCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.uses_cursor(request):
+            self.cursor_paginator = self.cursor_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.uses_cursor(request):
+            self.cursor_paginator = self.cursor_class()
+            return await self.cursor_paginator.apaginate_queryset(queryset, request, view)
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def uses_cursor(self, request):
+        params = request.query_params
+        return (
+            self.cursor_class.cursor_query_param in params
+            or params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_previous_link()
+        return super().get_previous_link()
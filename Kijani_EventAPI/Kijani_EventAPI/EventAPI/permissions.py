@@ -30,3 +30,10 @@ class IsOrganizer(permissions.BasePermission):
         return bool(user and user.is_authenticated and getattr(user, 'is_staff', False))
 
 
+class IsRegistrantOrOrganizer(permissions.BasePermission):
+    """Permission to allow only the registrant or the event organizer"""
+
+    def has_object_permission(self, request, view, obj):
+        return obj.user == request.user or obj.event.organizer == request.user
+
+
@@ -0,0 +1,85 @@
+"""
+JSON renderer and parser backed by orjson
+
+``orjson`` encodes datetimes, UUIDs and nested dicts/lists natively and
+returns bytes directly, skipping the stdlib encoder and the extra
+``str.encode()`` copy. Anything it cannot encode (Decimal, lazy
+translation strings, querysets, ...) is handed to DRF's own encoder, so
+the output matches ``rest_framework.renderers.JSONRenderer`` byte for
+byte (except that NaN/Infinity floats become null instead of raising).
+For options orjson does not support (indents other than 2,
+``COMPACT_JSON = False``, ``UNICODE_JSON = False``) both classes fall back
+to the stdlib implementation. orjson is in ``requirements.txt``; an
+install without it still works, on the slower stdlib path.
+"""
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Drop-in replacement for ``JSONRenderer`` using orjson when available"""
+
+    backend = orjson
+
+    def __init__(self):
+        self.default = self.encoder_class().default
+
+    def get_options(self, indent):
+        """Return orjson options for ``indent``, or None to use the stdlib"""
+        if self.backend is None or self.ensure_ascii or not self.compact:
+            return None
+        options = self.backend.OPT_UTC_Z | self.backend.OPT_NON_STR_KEYS
+        if indent == 2:
+            return options | self.backend.OPT_INDENT_2
+        return options if indent is None else None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        options = self.get_options(indent)
+        if options is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = self.backend.dumps(data, default=self.default, option=options)
+        except TypeError:
+            # e.g. integers wider than 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict JavaScript subset, like JSONRenderer
+        if b'\xe2\x80' in ret:
+            for raw, escaped in LINE_SEPARATORS:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """Drop-in replacement for ``JSONParser`` using orjson when available"""
+
+    renderer_class = FastJSONRenderer
+    backend = orjson
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if self.backend is None or not self.strict or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return self.backend.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
@@ -0,0 +1,240 @@
+"""
+Read-replica routing for the public read endpoints
+
+Views using ``ReplicaReadMixin`` send the queries of safe requests to a
+replica listed in ``EVENTAPI_REPLICAS['ALIASES']``; every other query,
+and all writes, go to ``default``. A replica is skipped while it lags
+more than ``MAX_LAG`` seconds behind the primary or cannot be reached.
+After a user writes, ``PrimaryPinningMiddleware`` pins that user to the
+primary for ``PIN_SECONDS`` so they read their own writes.
+
+Lag is measured at most every ``LAG_CHECK_INTERVAL`` seconds per replica
+and process: from the WAL replay position on PostgreSQL, otherwise by
+comparing the newest ``Event.updated_at`` on both databases.
+"""
+
+import contextvars
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+
+from . import cache
+
+
+DEFAULTS = {
+    'ALIASES': [],
+    'MAX_LAG': 5,
+    'PIN_SECONDS': 10,
+    'LAG_CHECK_INTERVAL': 2,
+}
+
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+current_routing = contextvars.ContextVar('eventapi_read_routing', default=None)
+
+lag_checks = {}
+lag_checks_lock = threading.Lock()
+
+
+def get_setting(name):
+    return getattr(settings, 'EVENTAPI_REPLICAS', {}).get(name, DEFAULTS[name])
+
+
+def pin_key(user):
+    return f"{cache.get_setting('KEY_PREFIX')}:pin:user:{user.pk}"
+
+
+def pin_to_primary(user):
+    """Send ``user``'s reads to the primary for ``PIN_SECONDS``"""
+    cache.get_cache().set(pin_key(user), 1, get_setting('PIN_SECONDS'))
+
+
+def is_pinned(user):
+    if not (user and user.is_authenticated):
+        return False
+    return cache.get_cache().get(pin_key(user)) is not None
+
+
+def measure_lag(alias):
+    """Return how many seconds the replica ``alias`` is behind the primary"""
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+
+    from .models import Event
+
+    newest = Event.objects.using(DEFAULT_DB_ALIAS).aggregate(newest=Max('updated_at'))['newest']
+    replicated = Event.objects.using(alias).aggregate(newest=Max('updated_at'))['newest']
+    if newest is None or (replicated is not None and replicated >= newest):
+        return 0.0
+    if replicated is None:
+        return (timezone.now() - newest).total_seconds()
+    return (newest - replicated).total_seconds()
+
+
+def replica_lag(alias):
+    """
+    Return the (recently measured) lag of ``alias`` in seconds.
+
+    Returns None when the replica cannot be queried.
+    """
+    now = time.monotonic()
+    checked = lag_checks.get(alias)
+    if checked is not None and now - checked[0] < get_setting('LAG_CHECK_INTERVAL'):
+        return checked[1]
+    try:
+        lag = measure_lag(alias)
+    except DatabaseError:
+        lag = None
+    with lag_checks_lock:
+        lag_checks[alias] = (now, lag)
+    return lag
+
+
+def choose_replica(user):
+    """Return ``(alias, lag)`` of a usable replica for ``user``, or ``(None, None)``"""
+    aliases = list(get_setting('ALIASES'))
+    if not aliases or is_pinned(user):
+        return None, None
+    random.shuffle(aliases)
+    for alias in aliases:
+        lag = replica_lag(alias)
+        if lag is not None and lag <= get_setting('MAX_LAG'):
+            return alias, lag
+    return None, None
+
+
+class ReadRouting:
+    """
+    Replica choice for one request.
+
+    The choice is made on the first routed query, so requests answered
+    without touching the database never check pins or lag.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.alias = None
+        self.lag = None
+        self.resolved = False
+
+    def get_alias(self):
+        if not self.resolved:
+            self.alias, self.lag = choose_replica(self.user)
+            self.resolved = True
+        return self.alias
+
+    async def aget_alias(self):
+        """
+        Async version of ``get_alias()``.
+
+        Checking pins and lag blocks, so it runs in a thread; without
+        replicas there is nothing to check and no thread hop to pay for.
+        """
+        if not self.resolved and get_setting('ALIASES'):
+            return await sync_to_async(self.get_alias)()
+        return self.get_alias()
+
+
+class ReplicaRouter:
+    """Route reads made under ``ReplicaReadMixin`` to a replica"""
+
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        if routing is None:
+            return None
+        return routing.get_alias()
+
+    def db_for_write(self, model, **hints):
+        # Never follow an instance back to the replica it was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        return db not in get_setting('ALIASES')
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests from a read replica.
+
+    Routing starts after authentication, so the pin of the requesting
+    user is known. Responses read from a lagging replica are not stored
+    in the response cache.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self.read_routing = None
+        self.read_routing_token = None
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            self.read_routing = ReadRouting(request.user)
+            self.read_routing_token = current_routing.set(self.read_routing)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'read_routing_token', None)
+        if token is not None:
+            current_routing.reset(token)
+            self.read_routing_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def should_cache_response(self, response):
+        routing = getattr(self, 'read_routing', None)
+        if routing is not None and routing.lag:
+            return False
+        return super().should_cache_response(response)
+
+
+class PrimaryPinningMiddleware:
+    """Pin users to the primary after a successful write"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.is_write(request, response):
+            self.pin(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.is_write(request, response):
+            await sync_to_async(self.pin)(request)
+        return response
+
+    def is_write(self, request, response):
+        return (
+            bool(get_setting('ALIASES'))
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        )
+
+    def pin(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user)
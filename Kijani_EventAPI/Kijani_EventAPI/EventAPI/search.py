@@ -0,0 +1,172 @@
+"""
+Full-text search for events
+
+SQLite uses an external-content FTS5 table kept in sync by triggers;
+PostgreSQL uses a GIN index over a weighted tsvector expression. Other
+backends fall back to DRF's ``icontains`` search.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+
+FTS_TABLE = 'events_fts'
+EVENTS_TABLE = 'events'
+SEARCH_COLUMNS = ('title', 'description', 'location')
+
+# bm25() weights for title, description and location
+SQLITE_RANK_SQL = f'bm25({FTS_TABLE}, 10.0, 1.0, 5.0)'
+
+SQLITE_SEARCH_INDEX_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, location,
+        content='{EVENTS_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {EVENTS_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {EVENTS_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF title, description, location ON {EVENTS_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+]
+
+SQLITE_TRIGGERS = (f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au')
+
+POSTGRES_VECTOR_SQL = (
+    f"(setweight(to_tsvector('simple', coalesce({EVENTS_TABLE}.title, '')), 'A') || "
+    f"setweight(to_tsvector('simple', coalesce({EVENTS_TABLE}.location, '')), 'B') || "
+    f"setweight(to_tsvector('simple', coalesce({EVENTS_TABLE}.description, '')), 'C'))"
+)
+
+POSTGRES_SEARCH_INDEX_SQL = [
+    f"CREATE INDEX IF NOT EXISTS events_search_vector_idx "
+    f"ON {EVENTS_TABLE} USING GIN ({POSTGRES_VECTOR_SQL})",
+]
+
+
+def install_search_index(connection):
+    """Create the vendor-specific search index and backfill it"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for statement in SQLITE_SEARCH_INDEX_SQL:
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            for statement in POSTGRES_SEARCH_INDEX_SQL:
+                cursor.execute(statement)
+
+
+def uninstall_search_index(connection):
+    """Drop the vendor-specific search index"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS events_search_vector_idx')
+
+
+def repair_search_index(sender, using='default', **kwargs):
+    """
+    post_migrate handler restoring the SQLite sync triggers.
+
+    SQLite migrations that alter the events table rebuild it, which drops
+    any triggers attached to it; reinstall them and resync the index.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name IN (%s, %s, %s, %s)",
+            [FTS_TABLE, *SQLITE_TRIGGERS]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+    if FTS_TABLE in existing and existing != {FTS_TABLE, *SQLITE_TRIGGERS}:
+        install_search_index(connection)
+
+
+def sqlite_match_expression(terms):
+    """Build an FTS5 MATCH expression with every token prefix-matched"""
+    tokens = [token for term in terms for token in re.findall(r'\w+', term)]
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def postgres_tsquery(terms):
+    """Build a to_tsquery() expression with every token prefix-matched"""
+    tokens = [token for term in terms for token in re.findall(r'\w+', term)]
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+class EventSearchFilter(filters.SearchFilter):
+    """
+    Ranked full-text search over event title, description and location.
+
+    Drop-in replacement for ``SearchFilter``: reads the same ``search``
+    parameter, matches every word as a prefix and orders results by
+    relevance. Falls back to ``SearchFilter`` on unsupported backends.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        vendor = connections[queryset.db].vendor
+        if vendor == 'sqlite':
+            return self.filter_sqlite(queryset, terms)
+        if vendor == 'postgresql':
+            return self.filter_postgres(queryset, terms)
+        return super().filter_queryset(request, queryset, view)
+
+    def filter_sqlite(self, queryset, terms):
+        expression = sqlite_match_expression(terms)
+        if not expression:
+            return queryset.none()
+        # bm25() is only defined within a MATCH query, hence the correlated subquery
+        rank = RawSQL(
+            f'SELECT {SQLITE_RANK_SQL} FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {EVENTS_TABLE}.id',
+            [expression],
+            output_field=FloatField(),
+        )
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression])
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by('search_rank')
+
+    def filter_postgres(self, queryset, terms):
+        expression = postgres_tsquery(terms)
+        if not expression:
+            return queryset.none()
+        rank = RawSQL(
+            f"ts_rank({POSTGRES_VECTOR_SQL}, to_tsquery('simple', %s))",
+            [expression],
+            output_field=FloatField(),
+        )
+        matches = RawSQL(
+            f"SELECT id FROM {EVENTS_TABLE} WHERE {POSTGRES_VECTOR_SQL} @@ to_tsquery('simple', %s)",
+            [expression],
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by('-search_rank')
@@ -0,0 +1,324 @@
+"""
+Synthetic events for performance work
+
+``EventGenerator`` produces a deterministic stream of events for a given
+seed (dates are relative to now), with the shapes that matter to query
+plans and caches:
+
+* dates are skewed around now, most of them within a few weeks and a
+  long tail up to a couple of years either way, more of them ahead;
+* a few categories and a few organizers hold most of the events
+  (Zipf-like weights);
+* coordinates are clustered around cities, weighted by size;
+* capacities are log-normal and fill up more for past events.
+
+Organizers and categories are created with ``bulk_create``. Events are
+the bulk of the rows: Django's ``bulk_create`` spends most of its time
+preparing each field of each object, so they are written with
+``executemany`` on a plain INSERT of values that are adapted once per
+row, one transaction per batch. On SQLite the secondary indexes and the
+full-text sync trigger are dropped during the load and rebuilt at the
+end, which is several times cheaper than maintaining them row by row.
+"""
+
+import math
+import random
+from bisect import bisect
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import cache
+from .models import Event, EventCategory
+from .search import EVENTS_TABLE, FTS_TABLE
+
+
+ORGANIZER_PREFIX = 'seed-organizer-'
+BATCH_SIZE = 10000
+
+# Name, latitude, longitude, relative size
+CITIES = [
+    ('Nairobi', -1.2864, 36.8172, 30),
+    ('Lagos', 6.5244, 3.3792, 16),
+    ('Cairo', 30.0444, 31.2357, 14),
+    ('Johannesburg', -26.2041, 28.0473, 12),
+    ('Kampala', 0.3476, 32.5825, 10),
+    ('Dar es Salaam', -6.7924, 39.2083, 10),
+    ('Mombasa', -4.0435, 39.6682, 8),
+    ('Addis Ababa', 9.0300, 38.7400, 8),
+    ('Cape Town', -33.9249, 18.4241, 8),
+    ('Accra', 5.6037, -0.1870, 7),
+    ('Kigali', -1.9441, 30.0619, 6),
+    ('Kisumu', -0.0917, 34.7680, 4),
+    ('Nakuru', -0.3031, 36.0800, 3),
+    ('Eldoret', 0.5143, 35.2698, 2),
+    ('Arusha', -3.3869, 36.6830, 2),
+]
+
+# Most popular first; name, icon and the topics of its events
+CATEGORIES = [
+    ('Technology', 'laptop', ['Python', 'Cloud', 'Data', 'Security', 'Mobile', 'AI', 'Web']),
+    ('Music', 'music', ['Jazz', 'Afrobeat', 'Gospel', 'Benga', 'Hip Hop', 'Classical']),
+    ('Business', 'briefcase', ['Startup', 'Fintech', 'Marketing', 'Leadership', 'Investors']),
+    ('Sports', 'trophy', ['Marathon', 'Football', 'Rugby', 'Cycling', 'Basketball']),
+    ('Food & Drink', 'utensils', ['Street Food', 'Coffee', 'Wine', 'Vegan', 'Barbecue']),
+    ('Arts', 'palette', ['Painting', 'Photography', 'Theatre', 'Poetry', 'Film']),
+    ('Education', 'book', ['Mathematics', 'Writing', 'Languages', 'Science', 'Careers']),
+    ('Health', 'heart', ['Yoga', 'Nutrition', 'Mental Health', 'Fitness']),
+    ('Community', 'users', ['Volunteering', 'Clean-up', 'Charity', 'Neighbourhood']),
+    ('Environment', 'leaf', ['Climate', 'Tree Planting', 'Recycling', 'Wildlife']),
+    ('Fashion', 'shirt', ['Design', 'Textiles', 'Runway']),
+    ('Gaming', 'gamepad', ['Esports', 'Board Games', 'Game Jam']),
+]
+
+FORMATS = ['Meetup', 'Conference', 'Workshop', 'Festival', 'Summit', 'Night', 'Bootcamp', 'Expo', 'Forum']
+VENUES = ['Convention Centre', 'City Hall', 'Innovation Hub', 'University Hall', 'Arena', 'Park', 'Hotel']
+START_HOURS = [9, 10, 14, 17, 18, 19]
+DURATIONS = [2, 3, 3, 4, 8, 48]
+
+# Fields written for every row, in the order of the generated tuples
+FIELDS = [
+    'title', 'slug', 'description', 'event_date', 'end_date', 'registration_deadline', 'location',
+    'latitude', 'longitude', 'organizer', 'category', 'capacity', 'current_attendees',
+    'allow_waitlist', 'price', 'is_free', 'status', 'is_published', 'created_at', 'updated_at',
+]
+
+
+def zipf_weights(count, exponent):
+    """Cumulative weights of ``count`` ranks, the first the most popular"""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def seed_categories():
+    """Create the categories that do not exist yet; return them, most popular first"""
+    existing = EventCategory.objects.in_bulk([name for name, _, _ in CATEGORIES], field_name='name')
+    EventCategory.objects.bulk_create([
+        EventCategory(name=name, slug=slugify(name), icon=icon)
+        for name, icon, _ in CATEGORIES
+        if name not in existing
+    ])
+    categories = EventCategory.objects.in_bulk([name for name, _, _ in CATEGORIES], field_name='name')
+    return [categories[name] for name, _, _ in CATEGORIES]
+
+
+def seed_organizers(count, batch_size):
+    """Create ``count`` organizers (or reuse them) and return their ids in rank order"""
+    User = get_user_model()
+    usernames = [f'{ORGANIZER_PREFIX}{i}' for i in range(count)]
+    existing = set(User.objects.filter(username__startswith=ORGANIZER_PREFIX).values_list('username', flat=True))
+    password = make_password(None)
+    User.objects.bulk_create(
+        [
+            User(username=username, email=f'{username}@example.com', password=password)
+            for username in usernames
+            if username not in existing
+        ],
+        batch_size=batch_size
+    )
+    ids = dict(User.objects.filter(username__startswith=ORGANIZER_PREFIX).values_list('username', 'pk'))
+    return [ids[username] for username in usernames]
+
+
+class EventGenerator:
+    """Deterministic stream of event rows (tuples ordered as ``FIELDS``) for one seed"""
+
+    def __init__(self, seed, organizer_ids, categories, now=None, connection=None):
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.now = now or timezone.now()
+        self.today = self.now.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.connection = connection or default_connection
+        self.slots = {}
+        self.organizer_ids = organizer_ids
+        self.organizer_weights = zipf_weights(len(organizer_ids), 0.8)
+        self.categories = [
+            (category.pk, category.name, topics, [slugify(topic) for topic in topics])
+            for category, (_, _, topics) in zip(categories, CATEGORIES)
+        ]
+        self.category_weights = zipf_weights(len(self.categories), 0.9)
+        self.city_weights = list(accumulate(size for _, _, _, size in CITIES))
+        self.city_slugs = [slugify(name) for name, _, _, _ in CITIES]
+        self.format_slugs = [slugify(name) for name in FORMATS]
+
+    def pick(self, cumulative):
+        return bisect(cumulative, self.random.random() * cumulative[-1])
+
+    def slot(self, day, hour):
+        """
+        Adapted dates and status of events starting ``day`` days from today.
+
+        Events start on the hour and last one of ``DURATIONS``, so there
+        are few distinct slots; each is computed once. Returns the start,
+        the deadline and ``(end, status)`` per duration.
+        """
+        key = (day, hour)
+        if key not in self.slots:
+            adapt = self.connection.ops.adapt_datetimefield_value
+            event_date = self.today + timedelta(days=day, hours=hour)
+            ends = []
+            for hours in DURATIONS:
+                end_date = event_date + timedelta(hours=hours)
+                if event_date > self.now:
+                    status = 'upcoming'
+                elif end_date < self.now:
+                    status = 'completed'
+                else:
+                    status = 'ongoing'
+                ends.append((adapt(end_date), status))
+            self.slots[key] = (adapt(event_date), adapt(event_date - timedelta(days=1)), ends)
+        return self.slots[key]
+
+    def rows(self, count, start=0):
+        """Yield ``count`` rows; slugs are numbered from ``start``"""
+        rng = self.random
+        created = self.connection.ops.adapt_datetimefield_value(self.now)
+        for number in range(start, start + count):
+            # Two thirds ahead, exponential tails with a mean of six weeks
+            day = int(min(rng.expovariate(1 / 42), 730))
+            if rng.random() < 0.35:
+                day = -day - 1
+            event_date, deadline, ends = self.slot(day, START_HOURS[int(rng.random() * len(START_HOURS))])
+            end_date, status = ends[int(rng.random() * len(DURATIONS))]
+            if rng.random() < 0.6:
+                deadline = None
+            # Past events mostly filled up, upcoming ones are still selling
+            fill = rng.random() ** (2.5 if status == 'upcoming' else 0.35)
+            if rng.random() < 0.03:
+                status = 'cancelled'
+
+            category_id, category_name, topics, topic_slugs = self.categories[self.pick(self.category_weights)]
+            topic = int(rng.random() * len(topics))
+            city = self.pick(self.city_weights)
+            city_name, latitude, longitude, _ = CITIES[city]
+            kind = int(rng.random() * len(FORMATS))
+
+            capacity = max(10, int(rng.lognormvariate(4.5, 0.9)))
+            is_free = rng.random() < 0.55
+
+            yield (
+                f'{city_name} {topics[topic]} {FORMATS[kind]}',
+                f'{self.city_slugs[city]}-{topic_slugs[topic]}-{self.format_slugs[kind]}-{self.seed}-{number}',
+                f'A {FORMATS[kind].lower()} about {topics[topic]} for the {category_name} community in {city_name}.',
+                event_date,
+                end_date,
+                deadline,
+                f'{VENUES[int(rng.random() * len(VENUES))]}, {city_name}',
+                # Most events within ~10 km of the city centre
+                round(latitude + rng.gauss(0, 0.05), 6),
+                round(longitude + rng.gauss(0, 0.05), 6),
+                self.organizer_ids[self.pick(self.organizer_weights)],
+                category_id,
+                capacity,
+                int(capacity * fill),
+                rng.random() < 0.2,
+                0 if is_free else math.ceil(rng.lognormvariate(6.5, 0.8) / 50) * 50,
+                is_free,
+                status,
+                rng.random() < 0.95,
+                created,
+                created,
+            )
+
+
+class EventWriter:
+    """Write generated rows with one INSERT statement run through ``executemany`` per batch"""
+
+    def __init__(self, connection=None):
+        self.connection = connection or default_connection
+        quote = self.connection.ops.quote_name
+        fields = [Event._meta.get_field(name) for name in FIELDS]
+        # Columns the generator does not fill take their default
+        others = [
+            field for field in Event._meta.concrete_fields
+            if field not in fields and not field.primary_key
+        ]
+        self.defaults = tuple(field.get_db_prep_save(field.get_default(), self.connection) for field in others)
+        columns = [field.column for field in fields + others]
+        self.sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(Event._meta.db_table),
+            ', '.join(quote(column) for column in columns),
+            ', '.join(['%s'] * len(columns)),
+        )
+        self.after_id = None
+        self.deferred_indexes = []
+
+    def write(self, rows):
+        if self.defaults:
+            rows = [row + self.defaults for row in rows]
+        with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+            cursor.executemany(self.sql, rows)
+
+    def defer_indexes(self):
+        """
+        On SQLite, stop maintaining the secondary and full-text indexes row by row.
+
+        Inserting in random key order into a dozen B-trees costs several
+        times more than the rows themselves; ``restore_indexes()`` builds
+        them again in one sorted pass each.
+        """
+        if self.connection.vendor != 'sqlite':
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {EVENTS_TABLE}')
+            self.after_id = cursor.fetchone()[0]
+            # Automatic indexes (UNIQUE constraints) have no SQL and stay
+            cursor.execute(
+                "SELECT name, sql FROM sqlite_master "
+                "WHERE (type = 'index' AND tbl_name = %s AND sql IS NOT NULL) "
+                "OR (type = 'trigger' AND name = %s)",
+                [EVENTS_TABLE, f'{FTS_TABLE}_ai']
+            )
+            self.deferred_indexes = cursor.fetchall()
+            for name, _ in self.deferred_indexes:
+                kind = 'TRIGGER' if name == f'{FTS_TABLE}_ai' else 'INDEX'
+                cursor.execute(f'DROP {kind} {self.connection.ops.quote_name(name)}')
+
+    def restore_indexes(self):
+        """Recreate the deferred indexes and index the new rows for search"""
+        if not self.deferred_indexes:
+            return
+        with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+            for name, sql in self.deferred_indexes:
+                if name == f'{FTS_TABLE}_ai':
+                    cursor.execute(
+                        f'INSERT INTO {FTS_TABLE}(rowid, title, description, location) '
+                        f'SELECT id, title, description, location FROM {EVENTS_TABLE} WHERE id > %s',
+                        [self.after_id]
+                    )
+                cursor.execute(sql)
+        self.deferred_indexes = []
+
+
+def seed_events(count, seed=0, organizers=None, batch_size=BATCH_SIZE, defer_indexes=True, progress=None):
+    """
+    Create ``count`` events with their organizers and categories.
+
+    ``organizers`` defaults to one per 50 events. Rebuilding the indexes
+    costs time in proportion to the whole table, so pass
+    ``defer_indexes=False`` to add a few rows to a large one. ``progress``
+    is called with the number of events written after each batch.
+    Returns the number of events written.
+    """
+    organizer_ids = seed_organizers(organizers or max(1, count // 50), batch_size)
+    generator = EventGenerator(seed, organizer_ids, seed_categories())
+    writer = EventWriter()
+    if defer_indexes:
+        writer.defer_indexes()
+    written = 0
+    try:
+        while written < count:
+            size = min(batch_size, count - written)
+            writer.write(list(generator.rows(size, written)))
+            written += size
+            if progress:
+                progress(written)
+    finally:
+        writer.restore_indexes()
+        EventCategory.objects.touch()
+        cache.bump(cache.EVENTS_GROUP, cache.CATEGORIES_GROUP)
+    return written
@@ -2,10 +2,12 @@
 Serializers for Event management
 """
 
-from django.contrib.auth import get_user_model
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
 from rest_framework import serializers
 from django.utils import timezone
-from .models import Event, EventCategory
+from . import hashing
+from .models import DuplicateRegistration, Event, EventCategory, EventRegistration
 
 
 User = get_user_model()
@@ -37,6 +39,7 @@ class EventListSerializer(serializers.ModelSerializer):
     category = EventCategorySerializer(read_only=True)
     is_full = serializers.BooleanField(read_only=True)
     available_spots = serializers.IntegerField(read_only=True)
+    status = serializers.CharField(source='live_status', read_only=True)
 
     class Meta:
         model = Event
@@ -49,6 +52,19 @@ class EventListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'slug', 'created_at', 'current_attendees']
 
 
+class NearbyEventSerializer(EventListSerializer):
+    """Serializer for events returned by a radius search"""
+
+    distance_km = serializers.SerializerMethodField()
+
+    class Meta(EventListSerializer.Meta):
+        fields = EventListSerializer.Meta.fields + ['latitude', 'longitude', 'distance_km']
+
+    def get_distance_km(self, obj):
+        """Distance from the search origin rounded to metres"""
+        return round(obj.distance_km, 3)
+
+
 class EventDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for single event"""
 
@@ -59,6 +75,7 @@ class EventDetailSerializer(serializers.ModelSerializer):
     is_past = serializers.BooleanField(read_only=True)
     is_upcoming = serializers.BooleanField(read_only=True)
     can_register = serializers.SerializerMethodField()
+    status = serializers.CharField(source='live_status', read_only=True)
 
     class Meta:
         model = Event
@@ -100,22 +117,6 @@ class EventCreateUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Event date must be in the future.")
         return value
 
-    def validate_end_date(self, value):
-        """Validate that end date is after event date"""
-        if value:
-            event_date = self.initial_data.get('event_date')
-            if event_date and value < timezone.datetime.fromisoformat(event_date.replace('Z', '+00:00')):
-                raise serializers.ValidationError("End date must be after event date.")
-        return value
-
-    def validate_registration_deadline(self, value):
-        """Validate that registration deadline is before event date"""
-        if value:
-            event_date = self.initial_data.get('event_date')
-            if event_date and value > timezone.datetime.fromisoformat(event_date.replace('Z', '+00:00')):
-                raise serializers.ValidationError("Registration deadline must be before event date.")
-        return value
-
     def validate_capacity(self, value):
         """Validate capacity is positive"""
         if value < 1:
@@ -131,6 +132,19 @@ class EventCreateUpdateSerializer(serializers.ModelSerializer):
                     'capacity': f'Cannot reduce capacity below current attendees ({self.instance.current_attendees}).'
                 })
 
+        # Compared with the parsed event date, so a malformed one is only
+        # reported by its own field
+        event_date = attrs.get('event_date')
+        if event_date:
+            if attrs.get('end_date') and attrs['end_date'] < event_date:
+                raise serializers.ValidationError({
+                    'end_date': 'End date must be after event date.'
+                })
+            if attrs.get('registration_deadline') and attrs['registration_deadline'] > event_date:
+                raise serializers.ValidationError({
+                    'registration_deadline': 'Registration deadline must be before event date.'
+                })
+
         price = attrs.get('price', 0)
         is_free = attrs.get('is_free', True)
         if not is_free and price == 0:
@@ -145,6 +159,138 @@ class EventCreateUpdateSerializer(serializers.ModelSerializer):
         validated_data['organizer'] = self.context['request'].user
         return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        """Update event and promote the waitlist when capacity grows"""
+        previous_capacity = instance.capacity
+        instance = super().update(instance, validated_data)
+        if instance.capacity > previous_capacity:
+            instance.refresh_from_db(fields=['current_attendees'])
+            if EventRegistration.objects.promote_waitlist(instance.pk, instance.available_spots):
+                instance.refresh_from_db(fields=['current_attendees'])
+        return instance
+
+
+class PreloadedCategoryField(serializers.PrimaryKeyRelatedField):
+    """Resolve categories from ``context['categories']`` instead of one query per item"""
+
+    def to_internal_value(self, data):
+        categories = self.context.get('categories')
+        if categories is None:
+            return super().to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            return categories[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class EventBulkItemSerializer(EventCreateUpdateSerializer):
+    """Validates one item of a bulk request; saving is done by the view"""
+
+    category = PreloadedCategoryField(
+        queryset=EventCategory.objects.filter(is_active=True),
+        required=False,
+        allow_null=True
+    )
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """Resolve ``slug_field`` values from ``context[context_key]`` instead of one query per item"""
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        lookup = self.context.get(self.context_key)
+        if lookup is None:
+            return super().to_internal_value(data)
+        if not isinstance(data, str):
+            self.fail('invalid')
+        try:
+            return lookup[data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+
+
+class EventImportSerializer(EventCreateUpdateSerializer):
+    """
+    Validates one row of an ``import_events`` file; saving is done by the importer.
+
+    Organizers are given by username and categories by slug. Past dates
+    are accepted so exported events can be imported again.
+    """
+
+    organizer = PreloadedSlugRelatedField(
+        'organizers',
+        slug_field='username',
+        queryset=User.objects.all()
+    )
+    category = PreloadedSlugRelatedField(
+        'categories',
+        slug_field='slug',
+        queryset=EventCategory.objects.filter(is_active=True),
+        required=False,
+        allow_null=True
+    )
+    # Declared so the unique check is left to slug allocation
+    slug = serializers.SlugField(max_length=250, required=False, allow_blank=True)
+
+    class Meta(EventCreateUpdateSerializer.Meta):
+        fields = EventCreateUpdateSerializer.Meta.fields + [
+            'slug', 'organizer', 'current_attendees', 'is_published'
+        ]
+
+    def validate_event_date(self, value):
+        return value
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs.get('current_attendees', 0) > attrs['capacity']:
+            raise serializers.ValidationError({
+                'current_attendees': 'Cannot exceed capacity.'
+            })
+        return attrs
+
+
+class EventRegistrationSerializer(serializers.ModelSerializer):
+    """Serializer for event registrations and waitlist entries"""
+
+    user = OrganizerSerializer(read_only=True)
+    event = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+
+    class Meta:
+        model = EventRegistration
+        fields = ['id', 'event', 'user', 'status', 'waitlist_position', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+    def validate(self, attrs):
+        """Check the event is open and the user is not already registered"""
+        event = self.context['event']
+        user = self.context['request'].user
+        if not event.can_register():
+            raise serializers.ValidationError('Registration is closed for this event.')
+        if event.registrations.filter(user=user).exclude(status='cancelled').exists():
+            raise serializers.ValidationError('You are already registered for this event.')
+        return attrs
+
+    def create(self, validated_data):
+        """Take a seat or join the waitlist"""
+        try:
+            registration = EventRegistration.objects.register(
+                self.context['event'],
+                self.context['request'].user
+            )
+        except DuplicateRegistration:
+            # A concurrent request got past validate() first
+            raise serializers.ValidationError('You are already registered for this event.')
+        if registration is None:
+            raise serializers.ValidationError('This event is full.')
+        return registration
+
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serializer for user registration"""
@@ -183,16 +329,20 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        """Create user with hashed password"""
+        """Create user with hashed password; pass ``password_hash`` to save() if already hashed"""
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password'],
+        password = validated_data.pop('password_hash', None)
+        if password is None:
+            password = hashing.call(make_password, validated_data['password'])
+        user = User(
+            username=User.normalize_username(validated_data['username']),
+            email=User.objects.normalize_email(validated_data['email']),
+            password=password,
             first_name=validated_data.get('first_name', ''),
             last_name=validated_data.get('last_name', ''),
             is_staff=True  # Set to staff by default so they can create events
         )
+        user.save()
         return user
 
 
@@ -204,13 +354,17 @@ class UserLoginSerializer(serializers.Serializer):
 
     def validate(self, attrs):
         """Validate credentials"""
-        from django.contrib.auth import authenticate
-
         username = attrs.get('username')
         password = attrs.get('password')
 
         if username and password:
-            user = authenticate(username=username, password=password)
+            if 'user' in self.context:
+                # Checked by the view already (see AsyncUserLoginView)
+                user = self.context['user']
+            else:
+                user = hashing.call(
+                    authenticate, request=self.context.get('request'), username=username, password=password
+                )
 
             if not user:
                 raise serializers.ValidationError('Invalid username or password.')
@@ -0,0 +1,86 @@
+"""
+Signal receivers keeping derived state in sync with Event writes, and
+cached token users in sync with their tokens and users
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import cache, tokens
+from .models import ApiToken, Event, EventCategory
+
+
+def category_state(instance):
+    """
+    Return the fields that feed category event counts.
+
+    Returns None when either field is deferred, since reading it would
+    trigger a query per instance.
+    """
+    loaded = instance.__dict__
+    if 'category_id' in loaded and 'is_published' in loaded:
+        return loaded['category_id'], loaded['is_published']
+    return None
+
+
+@receiver(post_init, sender=Event)
+def remember_category_state(sender, instance, **kwargs):
+    instance._category_state = category_state(instance)
+
+
+def touch_categories(*states):
+    """
+    Move ``updated_at`` of the categories whose published count changed.
+
+    Category counts are nested in event representations, so conditional
+    GET validators follow them through ``EventCategory.updated_at``. A
+    deferred state (None) may have changed any category.
+    """
+    if None in states:
+        EventCategory.objects.touch()
+        return
+    published = [category_id for category_id, is_published in states if is_published]
+    if published:
+        EventCategory.objects.filter(pk__in=published).touch()
+
+
+@receiver(post_save, sender=Event)
+def invalidate_event_on_save(sender, instance, created, **kwargs):
+    state = category_state(instance)
+    counts_changed = created or state is None or state != instance._category_state
+    if counts_changed:
+        touch_categories(state, instance._category_state)
+    cache.invalidate_event(instance.slug, categories=counts_changed)
+    instance._category_state = state
+
+
+@receiver(post_delete, sender=Event)
+def invalidate_event_on_delete(sender, instance, **kwargs):
+    touch_categories(category_state(instance))
+    cache.invalidate_event(instance.slug, categories=True)
+
+
+@receiver(post_save, sender=EventCategory)
+@receiver(post_delete, sender=EventCategory)
+def invalidate_category(sender, instance, **kwargs):
+    # Categories are nested in every event representation
+    cache.bump(cache.CATEGORIES_GROUP, cache.EVENTS_GROUP)
+
+
+@receiver(post_delete, sender=ApiToken)
+def forget_revoked_token(sender, instance, **kwargs):
+    tokens.forget_tokens([instance.key])
+
+
+# User fields whose change must reach requests made with cached tokens
+TOKEN_USER_FIELDS = frozenset(tokens.USER_FIELDS) | {'password', 'username'}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_user_tokens(sender, instance, created, update_fields, **kwargs):
+    # Cached users would keep a stale is_active flag, or stale permissions.
+    # Saves of other fields, like last_login at every login, keep them.
+    if created or (update_fields is not None and TOKEN_USER_FIELDS.isdisjoint(update_fields)):
+        return
+    tokens.forget_tokens(list(instance.api_tokens.values_list('key', flat=True)))
@@ -0,0 +1,127 @@
+"""
+Unique slug allocation for Event and EventCategory
+
+Slugs are ``base``, then ``base-1``, ``base-2``, ... The numbered forms of
+``base`` all sort between ``base-`` and ``base.`` (``.`` follows ``-`` in
+ASCII), so the slugs that can collide with a base are found with an
+indexed range query instead of one existence check per candidate.
+
+Allocation and insert are not atomic: a concurrent writer can take the
+same slug first, so callers retry on IntegrityError.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Length
+
+
+LOOKUP_CHUNK_SIZE = 200
+SAVE_ATTEMPTS = 10
+CANDIDATE_CHUNK_SIZE = 20
+
+
+def suffix_range(base, field='slug'):
+    """Match every slug starting with ``base-``"""
+    return Q(**{f'{field}__gt': f'{base}-', f'{field}__lt': f'{base}.'})
+
+
+def slug_range(base, field='slug'):
+    """Match ``base`` and every slug numbered from it"""
+    return Q(**{field: base}) | suffix_range(base, field)
+
+
+def taken_slugs(queryset, bases, field='slug'):
+    """Return the existing slugs in ``queryset`` that could collide with ``bases``"""
+    bases = sorted(set(bases))
+    taken = set()
+    for start in range(0, len(bases), LOOKUP_CHUNK_SIZE):
+        condition = Q()
+        for base in bases[start:start + LOOKUP_CHUNK_SIZE]:
+            condition |= slug_range(base, field)
+        taken.update(queryset.filter(condition).order_by().values_list(field, flat=True))
+    return taken
+
+
+def allocate_slugs(queryset, bases, field='slug'):
+    """
+    Return one unused slug per entry of ``bases``, in order.
+
+    Repeated bases within the batch get consecutive suffixes.
+    """
+    taken = taken_slugs(queryset, bases, field)
+    counters = {}
+    slugs = []
+    for base in bases:
+        slug = base
+        counter = counters.get(base, 1)
+        while slug in taken:
+            slug = f'{base}-{counter}'
+            counter += 1
+        counters[base] = counter
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def next_slug(queryset, base, field='slug'):
+    """
+    Return ``base`` if unused, otherwise the slug after its highest numbered form.
+
+    Runs a single query over the index range of ``base`` and its
+    digit-suffixed forms, longest (i.e. highest numbered) first. The first
+    row with an all-digit suffix decides, so usually one row is read.
+    """
+    candidates = (
+        queryset.filter(
+            Q(**{field: base})
+            | Q(**{f'{field}__gte': f'{base}-0', f'{field}__lt': f'{base}-:'})
+        )
+        .order_by(Length(field).desc(), f'-{field}')
+        .values_list(field, flat=True)
+    )
+    prefix = f'{base}-'
+    base_taken = False
+    for slug in candidates.iterator(chunk_size=CANDIDATE_CHUNK_SIZE):
+        suffix = slug[len(prefix):]
+        if slug.startswith(prefix) and suffix.isdigit() and suffix.isascii():
+            return f'{prefix}{int(suffix) + 1}'
+        base_taken = base_taken or slug == base
+    return f'{prefix}1' if base_taken else base
+
+
+def save_with_unique_slug(instance, base, save, field='slug'):
+    """
+    Assign the next free slug for ``base`` to ``instance`` and call ``save()``.
+
+    If a concurrent writer claims the slug first, the insert fails with an
+    IntegrityError and a fresh slug is allocated. Other integrity errors
+    are re-raised.
+    """
+    queryset = type(instance)._default_manager.all()
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        slug = next_slug(queryset, base, field)
+        setattr(instance, field, slug)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            clashed = queryset.filter(**{field: slug}).exclude(pk=instance.pk).exists()
+            if attempt == SAVE_ATTEMPTS or not clashed:
+                raise
+
+
+def bulk_create_with_slugs(queryset, objs, bases, batch_size=None, field='slug'):
+    """``bulk_create()`` objects whose slugs are allocated from ``bases``"""
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        for obj, slug in zip(objs, allocate_slugs(queryset, bases, field)):
+            setattr(obj, field, slug)
+        try:
+            with transaction.atomic():
+                return queryset.bulk_create(objs, batch_size=batch_size)
+        except IntegrityError:
+            for obj in objs:
+                obj.pk = None
+                obj._state.adding = True
+            slugs = [getattr(obj, field) for obj in objs]
+            if attempt == SAVE_ATTEMPTS or not queryset.filter(**{f'{field}__in': slugs}).exists():
+                raise
@@ -1,3 +1,2188 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import datetime
+import decimal
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+import zoneinfo
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as default_cache, caches
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, OperationalError, connection, connections, models
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from . import async_views
+from .exports import EventExporter
+from . import hashing, imports, instrumentation, seeding, throttling, tokens
+from .fast_serializers import EventListFastSerializer, NearbyEventFastSerializer
+from .filters import EventFilter
+from .geo import filter_nearby
+from . import cache, routers
+from .models import ApiToken, DuplicateRegistration, Event, EventCategory, EventRegistration
+from .renderers import FastJSONParser, FastJSONRenderer
+from .search import EventSearchFilter
+from .slugs import next_slug
+from .serializers import EventListSerializer, EventRegistrationSerializer, NearbyEventSerializer
+
+
+User = get_user_model()
+
+
+class AsyncURLConf:
+    """The API routes served by the async views"""
+
+    urlpatterns = [
+        path('api/v1/events/', include(([
+            path('', async_views.AsyncEventListView.as_view(), name='event-list-create'),
+            path('upcoming/', async_views.AsyncUpcomingEventsView.as_view(), name='upcoming-events'),
+            path('<slug:slug>/', async_views.AsyncEventDetailView.as_view(), name='event-detail'),
+        ], 'events'))),
+        path('api/v1/categories/', include(([
+            path('', async_views.AsyncCategoryListView.as_view(), name='category-list'),
+            path('<slug:slug>/', async_views.AsyncCategoryDetailView.as_view(), name='category-detail'),
+        ], 'categories'))),
+        path('api/v1/auth/register/', async_views.AsyncUserRegistrationView.as_view(), name='user-register'),
+        path('api/v1/auth/login/', async_views.AsyncUserLoginView.as_view(), name='user-login'),
+    ]
+
+
+def redis_cache_settings():
+    """
+    A Redis cache to test against: the server at ``REDIS_URL`` if it
+    answers, else fakeredis (Lua scripts need lupa), else None.
+    """
+    try:
+        import redis
+    except ImportError:
+        return None
+    url = os.environ.get('REDIS_URL')
+    if url:
+        try:
+            redis.Redis.from_url(url, socket_connect_timeout=0.5).ping()
+            return {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url}
+        except redis.RedisError:
+            pass
+    try:
+        import fakeredis
+        import lupa  # noqa: F401
+    except ImportError:
+        return None
+    return {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://fakeredis:6379/0',
+        'OPTIONS': {'connection_class': fakeredis.FakeConnection},
+    }
+
+
+REDIS_CACHE = redis_cache_settings()
+
+
+class EventAPITestCase(APITestCase):
+    """
+    API test case starting every test from an empty response cache.
+
+    The password hashing threads authenticate with the test's connection, as
+    Django's live server thread does, so they see the test transaction.
+    """
+
+    def setUp(self):
+        super().setUp()
+        default_cache.clear()
+        connection.inc_thread_sharing()
+        self.addCleanup(connection.dec_thread_sharing)
+        test_connection = connections['default']
+        submit = hashing.HashingExecutor.submit
+
+        def submit_sharing_connection(executor, func, *args, **kwargs):
+            def run(*args, **kwargs):
+                connections['default'] = test_connection
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    del connections['default']
+            return submit(executor, run, *args, **kwargs)
+
+        patcher = mock.patch.object(hashing.HashingExecutor, 'submit', submit_sharing_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+def make_event(organizer, **kwargs):
+    """Create a published upcoming event with sensible defaults"""
+    defaults = {
+        'title': 'Community Meetup',
+        'description': 'A test event',
+        'event_date': timezone.now() + timedelta(days=7),
+        'location': 'Nairobi',
+        'capacity': 10,
+    }
+    defaults.update(kwargs)
+    return Event.objects.create(organizer=organizer, **defaults)
+
+
+class SeatReservationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345')
+
+    def test_reserve_is_single_query(self):
+        event = make_event(self.organizer, capacity=3)
+        with self.assertNumQueries(1):
+            self.assertTrue(event.reserve_seats())
+        with self.assertNumQueries(1):
+            self.assertTrue(Event.objects.reserve_seats(event.pk, 2))
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 3)
+
+    def test_reserve_never_oversells(self):
+        event = make_event(self.organizer, capacity=5)
+        results = [Event.objects.reserve_seats(event.pk) for _ in range(8)]
+        self.assertEqual(results.count(True), 5)
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 5)
+        self.assertFalse(event.increment_attendees())
+
+    def test_bulk_reserve_is_all_or_nothing(self):
+        event = make_event(self.organizer, capacity=5, current_attendees=3)
+        self.assertFalse(Event.objects.reserve_seats(event.pk, 3))
+        self.assertTrue(Event.objects.reserve_seats(event.pk, 2))
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 5)
+
+    def test_release_never_goes_negative(self):
+        event = make_event(self.organizer, capacity=5, current_attendees=1)
+        self.assertFalse(event.release_seats(2))
+        self.assertTrue(event.decrement_attendees())
+        self.assertFalse(event.decrement_attendees())
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 0)
+
+
+class ConcurrentSeatReservationTests(TransactionTestCase):
+
+    def test_concurrent_reservations_do_not_oversell(self):
+        organizer = User.objects.create_user('organizer', password='pass12345')
+        event = make_event(organizer, capacity=250)
+
+        def reserve(_):
+            try:
+                return Event.objects.reserve_seats(event.pk)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(reserve, range(2000)))
+
+        event.refresh_from_db()
+        self.assertEqual(results.count(True), 250)
+        self.assertEqual(event.current_attendees, 250)
+
+
+class WaitlistTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345')
+        cls.users = [User.objects.create_user(f'user{i}', password='pass12345') for i in range(5)]
+
+    def test_full_event_queues_in_order(self):
+        event = make_event(self.organizer, capacity=2, allow_waitlist=True)
+        registrations = [EventRegistration.objects.register(event, user) for user in self.users]
+        self.assertEqual([r.status for r in registrations[:2]], ['confirmed', 'confirmed'])
+        self.assertEqual([r.waitlist_position for r in registrations[2:]], [1, 2, 3])
+
+    def test_full_event_without_waitlist_rejects(self):
+        event = make_event(self.organizer, capacity=1)
+        self.assertIsNotNone(EventRegistration.objects.register(event, self.users[0]))
+        self.assertIsNone(EventRegistration.objects.register(event, self.users[1]))
+
+    def test_cancellation_promotes_head_of_waitlist(self):
+        event = make_event(self.organizer, capacity=1, allow_waitlist=True)
+        first = EventRegistration.objects.register(event, self.users[0])
+        second = EventRegistration.objects.register(event, self.users[1])
+        EventRegistration.objects.register(event, self.users[2])
+
+        promoted = EventRegistration.objects.cancel(first)
+
+        self.assertEqual(promoted.pk, second.pk)
+        second.refresh_from_db()
+        event.refresh_from_db()
+        self.assertEqual(second.status, 'confirmed')
+        self.assertIsNone(second.waitlist_position)
+        self.assertEqual(event.current_attendees, 1)
+
+    def test_cancellation_without_waitlist_releases_seat(self):
+        event = make_event(self.organizer, capacity=1)
+        registration = EventRegistration.objects.register(event, self.users[0])
+        self.assertIsNone(EventRegistration.objects.cancel(registration))
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 0)
+
+    def test_cancelling_a_stale_instance_hands_over_the_seat(self):
+        event = make_event(self.organizer, capacity=1, allow_waitlist=True)
+        first = EventRegistration.objects.register(event, self.users[0])
+        second = EventRegistration.objects.register(event, self.users[1])
+        third = EventRegistration.objects.register(event, self.users[2])
+        stale = EventRegistration.objects.get(pk=second.pk)
+        EventRegistration.objects.cancel(first)  # promotes ``second`` behind the stale copy
+
+        promoted = EventRegistration.objects.cancel(stale)
+
+        self.assertEqual(promoted.pk, third.pk)
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 1)
+        self.assertEqual(EventRegistration.objects.filter(status='confirmed').get().pk, third.pk)
+
+    def test_duplicate_registration_is_reported_without_taking_a_seat(self):
+        event = make_event(self.organizer, capacity=2, allow_waitlist=True)
+        EventRegistration.objects.register(event, self.users[0])
+        with self.assertRaises(DuplicateRegistration):
+            EventRegistration.objects.register(event, self.users[0])
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 1)
+
+        EventRegistration.objects.register(event, self.users[1])
+        EventRegistration.objects.register(event, self.users[2])
+        # A waitlisted duplicate is not retried as a queue slot clash
+        with CaptureQueriesContext(connection) as queries, self.assertRaises(DuplicateRegistration):
+            EventRegistration.objects.register(event, self.users[2])
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_promote_waitlist_is_one_batched_update(self):
+        event = make_event(self.organizer, capacity=1, allow_waitlist=True)
+        for user in self.users:
+            EventRegistration.objects.register(event, user)
+        Event.objects.filter(pk=event.pk).update(capacity=4)
+
+        with CaptureQueriesContext(connection) as queries:
+            promoted = EventRegistration.objects.promote_waitlist(event.pk, 3)
+
+        self.assertEqual(promoted, 3)
+        registration_updates = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "event_registrations"')
+        ]
+        self.assertEqual(len(registration_updates), 1)
+        statuses = list(EventRegistration.objects.order_by('pk').values_list('status', flat=True))
+        self.assertEqual(statuses, ['confirmed'] * 4 + ['waitlisted'])
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 4)
+
+    def test_promote_waitlist_uses_the_seats_still_free(self):
+        event = make_event(self.organizer, capacity=1, allow_waitlist=True)
+        for user in self.users[:4]:
+            EventRegistration.objects.register(event, user)
+        # Two seats added, one of them already taken by someone else
+        Event.objects.filter(pk=event.pk).update(capacity=3, current_attendees=2)
+
+        self.assertEqual(EventRegistration.objects.promote_waitlist(event.pk, 2), 1)
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 3)
+        self.assertEqual(EventRegistration.objects.waitlist(event.pk).count(), 2)
+
+    def test_raising_capacity_in_the_admin_promotes_waitlist(self):
+        event = make_event(self.organizer, capacity=1, allow_waitlist=True)
+        for user in self.users[:3]:
+            EventRegistration.objects.register(event, user)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass12345'))
+        event_date = timezone.localtime(event.event_date)
+        response = self.client.post(reverse('admin:EventAPI_event_change', args=[event.pk]), {
+            'title': event.title,
+            'description': event.description,
+            'organizer': self.organizer.pk,
+            'event_date_0': event_date.strftime('%Y-%m-%d'),
+            'event_date_1': event_date.strftime('%H:%M:%S'),
+            'location': event.location,
+            'capacity': 2,
+            'price': '0',
+            'is_free': 'on',
+            'status': event.status,
+            'is_published': 'on',
+            'allow_waitlist': 'on',
+        })
+        self.assertEqual(response.status_code, 302, getattr(response, 'context', None) and
+                         response.context['adminform'].form.errors)
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 2)
+        self.assertEqual(EventRegistration.objects.waitlist(event.pk).count(), 1)
+
+
+class RegistrationEndpointTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345', is_staff=True)
+        cls.attendee = User.objects.create_user('attendee', password='pass12345')
+        cls.other = User.objects.create_user('other', password='pass12345')
+
+    def test_register_join_waitlist_and_cancel(self):
+        event = make_event(self.organizer, capacity=1, allow_waitlist=True)
+        url = reverse('events:registration-list-create', kwargs={'slug': event.slug})
+
+        self.client.force_authenticate(self.attendee)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'confirmed')
+        self.assertEqual(self.client.post(url).status_code, 400)
+
+        self.client.force_authenticate(self.other)
+        response = self.client.post(url)
+        self.assertEqual(response.data['status'], 'waitlisted')
+        self.assertEqual(response.data['waitlist_position'], 1)
+
+        self.client.force_authenticate(self.attendee)
+        registration_id = EventRegistration.objects.get(user=self.attendee).pk
+        detail_url = reverse(
+            'events:registration-detail',
+            kwargs={'slug': event.slug, 'pk': registration_id}
+        )
+        self.assertEqual(self.client.delete(detail_url).status_code, 204)
+        self.assertEqual(EventRegistration.objects.get(user=self.other).status, 'confirmed')
+
+    def test_concurrent_duplicate_registration_is_a_400(self):
+        event = make_event(self.organizer, capacity=5)
+        EventRegistration.objects.register(event, self.attendee)
+        url = reverse('events:registration-list-create', kwargs={'slug': event.slug})
+
+        self.client.force_authenticate(self.attendee)
+        # As if the other request registered between validate() and create()
+        with mock.patch.object(EventRegistrationSerializer, 'validate', lambda self, attrs: attrs):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, 400)
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 1)
+
+    def test_raising_capacity_promotes_waitlist(self):
+        event = make_event(self.organizer, capacity=1, allow_waitlist=True)
+        EventRegistration.objects.register(event, self.attendee)
+        EventRegistration.objects.register(event, self.other)
+
+        self.client.force_authenticate(self.organizer)
+        response = self.client.patch(
+            reverse('events:event-detail', kwargs={'slug': event.slug}),
+            {'capacity': 5},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(EventRegistration.objects.get(user=self.other).status, 'confirmed')
+        event.refresh_from_db()
+        self.assertEqual(event.current_attendees, 2)
+
+
+class CategoryEventCountQueryTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        cls.categories = [EventCategory.objects.create(name=f'Category {i}') for i in range(10)]
+        for i in range(100):
+            make_event(
+                cls.organizer,
+                title=f'Event {i}',
+                category=cls.categories[i % 10],
+                is_published=i % 4 != 0
+            )
+
+    def test_event_list_queries_are_constant(self):
+        # ETag aggregate, count, events with organizer, categories with annotated counts
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('events:event-list-create'), {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 75)
+        for item in response.data['results']:
+            category = item['category']
+            self.assertEqual(category['event_count'], 10 if int(category['slug'][-1]) % 2 else 5)
+
+    def test_category_list_queries_are_constant(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('categories:category-list'))
+        counts = {item['slug']: item['event_count'] for item in response.data['results']}
+        self.assertEqual(counts['category-0'], 5)
+        self.assertEqual(counts['category-1'], 10)
+
+    def test_category_detail_queries_are_constant(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('categories:category-detail', kwargs={'slug': 'category-1'})
+            )
+        self.assertEqual(response.data['event_count'], 10)
+        self.assertEqual(len(response.data['upcoming_events']), 5)
+
+    def test_admin_changelist_queries_do_not_scale_with_rows(self):
+        self.client.force_login(self.organizer)
+        url = reverse('admin:EventAPI_eventcategory_changelist')
+
+        with CaptureQueriesContext(connection) as full_page:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        EventCategory.objects.filter(pk__in=[c.pk for c in self.categories[1:]]).delete()
+        with CaptureQueriesContext(connection) as single_row:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.assertEqual(len(full_page), len(single_row))
+
+    def test_unannotated_category_still_counts(self):
+        category = EventCategory.objects.get(slug='category-1')
+        self.assertEqual(category.event_count, 10)
+
+
+class CursorPaginationTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345')
+        base = timezone.now() + timedelta(days=1)
+        # Pairs of events share a start time to exercise the id tie-breaker
+        for i in range(25):
+            make_event(cls.organizer, title=f'Event {i}', event_date=base + timedelta(hours=i // 2))
+        cls.expected = list(
+            Event.objects.order_by('-event_date', '-id').values_list('slug', flat=True)
+        )
+
+    def test_walks_forward_and_back_without_gaps(self):
+        url = reverse('events:event-list-create')
+        response = self.client.get(url, {'pagination': 'cursor', 'page_size': 10})
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+
+        seen, pages = [], []
+        while True:
+            pages.append(response.data)
+            seen.extend(item['slug'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, self.expected)
+
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(
+            [item['slug'] for item in response.data['results']],
+            [item['slug'] for item in pages[-2]['results']]
+        )
+
+    def test_skips_count_unless_requested(self):
+        url = reverse('events:event-list-create')
+        # ETag aggregate and events with organizer; no pagination COUNT(*), and
+        # categories are not queried without rows to prefetch
+        with self.assertNumQueries(2):
+            self.client.get(url, {'pagination': 'cursor'})
+        response = self.client.get(url, {'pagination': 'cursor', 'include_count': 'true'})
+        self.assertEqual(response.data['count'], 25)
+
+    def test_refuses_orderings_it_would_discard(self):
+        url = reverse('events:event-list-create')
+        response = self.client.get(url, {'search': 'event', 'pagination': 'cursor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('search_rank', response.data['details']['cursor'])
+        response = self.client.get(url, {'near': '-1.2864,36.8172', 'pagination': 'cursor'})
+        self.assertEqual(response.status_code, 400)
+
+        # Offset pages of a search keep their ranking
+        response = self.client.get(url, {'search': 'event', 'page_size': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 25)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse('events:upcoming-events'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class FullTextSearchTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345')
+        make_event(cls.organizer, title='Django Workshop', description='Build APIs', location='Nairobi')
+        make_event(cls.organizer, title='Garden Day', description='Intro to Django for gardeners', location='Kisumu')
+        make_event(cls.organizer, title='Book Club', description='Monthly reading', location='Mombasa')
+
+    def search(self, term):
+        response = self.client.get(reverse('events:event-list-create'), {'search': term})
+        return [item['title'] for item in response.data['results']]
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.search('django'), ['Django Workshop', 'Garden Day'])
+
+    def test_prefix_and_multi_word_matching(self):
+        self.assertEqual(self.search('djan'), ['Django Workshop', 'Garden Day'])
+        self.assertEqual(self.search('djan kisu'), ['Garden Day'])
+        self.assertEqual(self.search('"*"'), [])
+
+    def test_index_follows_writes(self):
+        event = Event.objects.get(title='Book Club')
+        event.title = 'Poetry Evening'
+        event.save()
+        self.assertEqual(self.search('book'), [])
+        self.assertEqual(self.search('poetry'), ['Poetry Evening'])
+
+        event.delete()
+        self.assertEqual(self.search('poetry'), [])
+
+    def test_results_compose_with_other_querysets(self):
+        queryset = EventSearchFilter().filter_queryset(
+            mock.Mock(query_params={'search': 'django'}), Event.objects.all(), None
+        )
+        self.assertFalse(queryset.query.extra)
+        self.assertEqual(queryset.aggregate(count=models.Count('id'))['count'], 2)
+        self.assertEqual(queryset.filter(location='Kisumu').get().title, 'Garden Day')
+        self.assertEqual(list(queryset.values_list('title', flat=True)), ['Django Workshop', 'Garden Day'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 query plan')
+    def test_search_uses_fts_index(self):
+        plan = EventSearchFilter().filter_sqlite(Event.objects.all(), ['django']).explain()
+        self.assertIn('VIRTUAL TABLE INDEX', plan)
+        self.assertNotIn('SCAN events', plan.replace('SCAN events_fts', ''))
+
+
+class EventFilterTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345')
+        cls.music = EventCategory.objects.create(name='Music')
+        now = timezone.now()
+        make_event(cls.organizer, title='Concert', category=cls.music, event_date=now + timedelta(days=2))
+        make_event(cls.organizer, title='Sold Out Gig', category=cls.music, capacity=5, current_attendees=5,
+                   event_date=now + timedelta(days=20))
+        make_event(cls.organizer, title='Paid Talk', is_free=False, price=100, event_date=now + timedelta(days=40))
+
+    def titles(self, url_name, params):
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['title'] for item in response.data['results'])
+
+    def test_list_applies_event_filter(self):
+        url_name = 'events:event-list-create'
+        self.assertEqual(self.titles(url_name, {'category': 'music'}), ['Concert', 'Sold Out Gig'])
+        self.assertEqual(self.titles(url_name, {'category': self.music.pk, 'has_spots': 'true'}), ['Concert'])
+        self.assertEqual(self.titles(url_name, {'is_free': 'false'}), ['Paid Talk'])
+        date_to = (timezone.now() + timedelta(days=10)).isoformat()
+        self.assertEqual(self.titles(url_name, {'date_to': date_to}), ['Concert'])
+
+    def test_upcoming_applies_event_filter(self):
+        self.assertEqual(
+            self.titles('events:upcoming-events', {'has_spots': 'true', 'organizer': self.organizer.pk}),
+            ['Concert', 'Paid Talk']
+        )
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite query plans')
+class EventFilterIndexTests(TestCase):
+    """Common filter combinations must be answered from an index"""
+
+    FULL_SCAN = re.compile(r'SCAN (events|event_categories)(?! USING)\b')
+
+    def assertIndexed(self, params):
+        queryset = EventFilter(params, queryset=Event.objects.filter(is_published=True)).qs
+        plan = queryset[:10].explain()
+        self.assertIsNone(self.FULL_SCAN.search(plan), f'{params} plan:\n{plan}')
+        return plan
+
+    def test_has_spots_uses_partial_index(self):
+        self.assertIn('events_has_spots_idx', self.assertIndexed({'has_spots': 'true'}))
+
+    def test_category_slug_join_uses_indexes(self):
+        plan = self.assertIndexed({'category': 'music'})
+        self.assertIn('SEARCH event_categories', plan)
+        self.assertIn('SEARCH events USING INDEX', plan)
+
+    def test_common_combinations_use_indexes(self):
+        for params in [
+            {'category': '3'},
+            {'status': 'upcoming'},
+            {'status': 'upcoming', 'is_free': 'true'},
+            {'organizer': '2'},
+            {'date_from': '2025-01-01T00:00:00Z', 'date_to': '2026-01-01T00:00:00Z'},
+        ]:
+            with self.subTest(params=params):
+                self.assertIndexed(params)
+
+
+class NearbyEventsTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345')
+        make_event(cls.organizer, title='CBD', latitude='-1.286389', longitude='36.817223')
+        make_event(cls.organizer, title='Westlands', latitude='-1.267600', longitude='36.811000')
+        make_event(cls.organizer, title='Thika', latitude='-1.033300', longitude='37.069300')
+        make_event(cls.organizer, title='Mombasa', latitude='-4.043500', longitude='39.668200')
+        make_event(cls.organizer, title='Unmapped')
+        make_event(cls.organizer, title='Fiji East', latitude='-17.000000', longitude='179.990000')
+        make_event(cls.organizer, title='Fiji West', latitude='-17.000000', longitude='-179.990000')
+
+    def nearby(self, params, url_name='events:nearby-events'):
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['results']
+
+    def test_returns_events_in_radius_nearest_first(self):
+        results = self.nearby({'near': '-1.2921,36.8219', 'radius_km': 5})
+        self.assertEqual([item['title'] for item in results], ['CBD', 'Westlands'])
+        self.assertLess(results[0]['distance_km'], results[1]['distance_km'])
+        self.assertAlmostEqual(results[0]['distance_km'], 0.83, places=1)
+
+    def test_radius_defaults_and_widens(self):
+        self.assertEqual(len(self.nearby({'near': '-1.2921,36.8219'})), 2)
+        self.assertEqual(len(self.nearby({'near': '-1.2921,36.8219', 'radius_km': 60})), 3)
+        # Zero is a radius, not a missing one
+        self.assertEqual(self.nearby({'near': '-1.2921,36.8219', 'radius_km': 0}), [])
+        results = self.nearby({'near': '-1.286389,36.817223', 'radius_km': 0})
+        self.assertEqual([item['title'] for item in results], ['CBD'])
+
+    def test_radius_crossing_antimeridian(self):
+        results = self.nearby({'near': '-17.0,180.0', 'radius_km': 10})
+        self.assertEqual(sorted(item['title'] for item in results), ['Fiji East', 'Fiji West'])
+
+    def test_near_filter_on_event_list(self):
+        results = self.nearby({'near': '-1.2921,36.8219', 'radius_km': 5}, 'events:event-list-create')
+        self.assertEqual([item['title'] for item in results], ['CBD', 'Westlands'])
+
+    def test_requires_valid_origin(self):
+        url = reverse('events:nearby-events')
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'near': 'nairobi'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'near': '95,10'}).status_code, 400)
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite query plans')
+    def test_prefilter_uses_location_index(self):
+        plan = filter_nearby(Event.objects.all(), -1.2921, 36.8219, 10).explain()
+        self.assertIn('events_latitud', plan)
+        self.assertNotRegex(plan, r'SCAN events(?! USING)')
+
+
+class ResponseCacheTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345', is_staff=True)
+        cls.category = EventCategory.objects.create(name='Music')
+        cls.first = make_event(cls.organizer, title='First', category=cls.category)
+        cls.second = make_event(cls.organizer, title='Second')
+
+    def get(self, url, **params):
+        return self.client.get(url, params)
+
+    def test_repeat_request_is_served_from_cache(self):
+        url = reverse('events:event-list-create')
+        self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(cache.get_stats()['hits'], 1)
+
+    def test_query_params_are_normalized(self):
+        url = reverse('events:event-list-create')
+        self.client.get(f'{url}?page_size=5&is_free=true')
+        self.assertEqual(self.client.get(f'{url}?is_free=true&page_size=5')['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(f'{url}?is_free=false&page_size=5')['X-Cache'], 'MISS')
+
+    def test_auth_state_is_part_of_the_key(self):
+        url = reverse('events:event-detail', kwargs={'slug': self.first.slug})
+        self.get(url)
+        self.client.force_authenticate(self.organizer)
+        self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.get(url)['X-Cache'], 'HIT')
+
+    def test_event_edit_evicts_only_affected_entries(self):
+        first_url = reverse('events:event-detail', kwargs={'slug': self.first.slug})
+        second_url = reverse('events:event-detail', kwargs={'slug': self.second.slug})
+        list_url = reverse('events:event-list-create')
+        category_url = reverse('categories:category-list')
+        for url in (first_url, second_url, list_url, category_url):
+            self.get(url)
+
+        self.second.title = 'Second (updated)'
+        self.second.save()
+
+        self.assertEqual(self.get(first_url)['X-Cache'], 'HIT')
+        self.assertEqual(self.get(category_url)['X-Cache'], 'HIT')
+        response = self.get(second_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['title'], 'Second (updated)')
+        self.assertEqual(self.get(list_url)['X-Cache'], 'MISS')
+
+    def test_publish_toggle_evicts_category_counts(self):
+        url = reverse('categories:category-list')
+        self.assertEqual(self.get(url).json()['results'][0]['event_count'], 1)
+        self.first.is_published = False
+        self.first.save()
+        response = self.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['event_count'], 0)
+
+    def test_writes_and_errors_are_not_cached(self):
+        url = reverse('events:event-detail', kwargs={'slug': 'missing'})
+        self.assertEqual(self.get(url).status_code, 404)
+        self.assertFalse(self.get(url).has_header('X-Cache'))
+
+
+class ConditionalGetTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345')
+        cls.event = make_event(cls.organizer, title='Polling Target')
+        make_event(cls.organizer, title='Another Event')
+
+    def setUp(self):
+        super().setUp()
+        self.detail_url = reverse('events:event-detail', kwargs={'slug': self.event.slug})
+        self.list_url = reverse('events:event-list-create')
+
+    def test_detail_returns_strong_validators(self):
+        response = self.client.get(self.detail_url)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+    def test_detail_not_modified_skips_serialization(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        default_cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_detail_etag_changes_on_reservation(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        Event.objects.reserve_seats(self.event.pk)
+        # Bare reservations do not touch the response cache; only updated_at moves
+        default_cache.clear()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['current_attendees'], 1)
+
+    def test_validators_change_when_the_event_starts(self):
+        Event.objects.filter(pk=self.event.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        detail = self.client.get(self.detail_url)
+        listing = self.client.get(self.list_url)
+        # Time passes: no write touches updated_at
+        Event.objects.filter(pk=self.event.pk).update(event_date=timezone.now() - timedelta(minutes=5))
+        default_cache.clear()
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'ongoing')
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=detail['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=listing['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_validators_follow_the_category(self):
+        music = EventCategory.objects.create(name='Music')
+        Event.objects.filter(pk=self.event.pk).update(category=music)
+        default_cache.clear()
+        detail_etag = self.client.get(self.detail_url)['ETag']
+        list_etag = self.client.get(self.list_url)['ETag']
+
+        music.name = 'Live Music'
+        music.save()
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+        # A new event in the category changes the nested event_count
+        detail_etag = self.client.get(self.detail_url)['ETag']
+        make_event(self.organizer, title='Jazz Night', category=music)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['category']['event_count'], 2)
+
+    def test_list_not_modified_until_rows_change(self):
+        etag = self.client.get(self.list_url)['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            self.client.get(self.list_url, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag).status_code,
+            200
+        )
+
+        make_event(self.organizer, title='Brand New')
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_cached_response_answers_conditional_request(self):
+        etag = self.client.get(self.list_url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url)['Last-Modified']
+        default_cache.clear()
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+
+class FastSerializerParityTests(EventAPITestCase):
+    """The values-based serializers must match the DRF serializers exactly"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', 'org@example.com', 'pass12345')
+        cls.category = EventCategory.objects.create(name='Music', icon='music', description='Live')
+        make_event(cls.organizer, title='Plain')
+        make_event(
+            cls.organizer,
+            title='Paid',
+            category=cls.category,
+            price='1250.5',
+            is_free=False,
+            end_date=timezone.now() + timedelta(days=8),
+            image_url='https://example.com/poster.png',
+            latitude='-1.286389',
+            longitude='36.817223'
+        )
+        make_event(
+            cls.organizer,
+            title='Full',
+            category=cls.category,
+            capacity=2,
+            current_attendees=2,
+            latitude='-1.2676',
+            longitude='36.811'
+        )
+        make_event(cls.organizer, title='Draft', category=cls.category, is_published=False)
+
+    def assertParity(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for old, new in zip(expected, actual):
+            self.assertEqual(list(old), list(new))
+            self.assertEqual(dict(old), new)
+            if old['category'] is not None:
+                self.assertEqual(list(old['category']), list(new['category']))
+
+    def test_event_list_parity(self):
+        queryset = Event.objects.with_related().order_by('id')
+        fast = EventListFastSerializer()
+        self.assertParity(
+            EventListSerializer(queryset, many=True).data,
+            fast.serialize(fast.prepare(queryset))
+        )
+
+    def test_nearby_parity(self):
+        queryset = filter_nearby(Event.objects.with_related(), -1.2921, 36.8219, 10)
+        fast = NearbyEventFastSerializer()
+        self.assertParity(
+            NearbyEventSerializer(queryset, many=True).data,
+            fast.serialize(fast.prepare(queryset))
+        )
+
+    def test_list_endpoint_parity(self):
+        response = self.client.get(reverse('events:event-list-create'))
+        expected = EventListSerializer(
+            Event.objects.filter(is_published=True).with_related().order_by('-event_date'),
+            many=True
+        ).data
+        self.assertParity(expected, response.data['results'])
+        counts = {item['category']['event_count'] for item in response.data['results'] if item['category']}
+        self.assertEqual(counts, {2})
+
+    def test_category_detail_parity(self):
+        response = self.client.get(
+            reverse('categories:category-detail', kwargs={'slug': self.category.slug})
+        )
+        expected = EventListSerializer(
+            Event.objects.filter(category=self.category, is_published=True).with_related(),
+            many=True
+        ).data
+        self.assertParity(expected, response.data['upcoming_events'])
+
+
+class FastJSONRendererTests(EventAPITestCase):
+
+    payload = {
+        'price': decimal.Decimal('1250.50'),
+        'utc': datetime.datetime(2026, 3, 1, 9, 30, 15, 120000, tzinfo=datetime.timezone.utc),
+        'london': datetime.datetime(2026, 1, 5, 18, 0, tzinfo=zoneinfo.ZoneInfo('Europe/London')),
+        'nairobi': datetime.datetime(2026, 1, 5, 18, 0, tzinfo=zoneinfo.ZoneInfo('Africa/Nairobi')),
+        'naive': datetime.datetime(2026, 1, 5, 18, 0),
+        'day': datetime.date(2026, 1, 5),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'lazy': gettext_lazy('Not found.'),
+        'separators': 'line\u2028paragraph\u2029',
+        'text': 'Café ☕',
+        'nested': [{1: 'int key', 'big': 2 ** 40}, None, True, 1.5],
+    }
+
+    def test_matches_stock_renderer(self):
+        for media_type in ['application/json', 'application/json; indent=2', 'application/json; indent=4']:
+            with self.subTest(media_type=media_type):
+                self.assertEqual(
+                    FastJSONRenderer().render(self.payload, media_type),
+                    JSONRenderer().render(self.payload, media_type)
+                )
+
+    def test_falls_back_without_orjson(self):
+        renderer = FastJSONRenderer()
+        renderer.backend = None
+        self.assertEqual(renderer.render(self.payload), JSONRenderer().render(self.payload))
+
+    def test_falls_back_for_unsupported_values(self):
+        data = {'huge': 2 ** 70}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_parser_matches_stock_parser(self):
+        body = JSONRenderer().render(self.payload)
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body))
+        )
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"price": NaN}'))
+
+    def test_api_negotiates_fast_renderer(self):
+        organizer = User.objects.create_user('organizer', password='pass12345')
+        make_event(organizer, title='Rendered')
+        response = self.client.get(reverse('events:event-list-create'), HTTP_ACCEPT='application/json')
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['results'][0]['title'], 'Rendered')
+
+        self.client.force_authenticate(organizer)
+        response = self.client.post(
+            reverse('events:event-list-create'),
+            data=b'{"title": "Parsed", "description": "x", "location": "Nairobi", '
+                 b'"capacity": 5, "event_date": "2099-01-01T10:00:00Z"}',
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertTrue(Event.objects.filter(title='Parsed').exists())
+
+
+class EventBulkTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345', is_staff=True)
+        cls.other = User.objects.create_user('other', password='pass12345', is_staff=True)
+        cls.category = EventCategory.objects.create(name='Sports')
+        cls.url = reverse('events:event-bulk')
+
+    def item(self, title='Weekly Meetup', **kwargs):
+        data = {
+            'title': title,
+            'description': 'Season fixture',
+            'location': 'Nairobi',
+            'capacity': 20,
+            'event_date': (timezone.now() + timedelta(days=10)).isoformat(),
+        }
+        data.update(kwargs)
+        return data
+
+    def test_create_allocates_slugs_and_resolves_categories(self):
+        make_event(self.organizer, title='Weekly Meetup')
+        self.client.force_authenticate(self.organizer)
+        response = self.client.post(self.url, [
+            self.item(category=self.category.pk),
+            self.item(),
+            self.item('Season Opener', category=str(self.category.pk)),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(
+            [item['slug'] for item in response.data['results']],
+            ['weekly-meetup-1', 'weekly-meetup-2', 'season-opener']
+        )
+        created = Event.objects.filter(slug__in=['weekly-meetup-1', 'season-opener'])
+        self.assertEqual({event.category_id for event in created}, {self.category.pk})
+        self.assertEqual({event.status for event in created}, {'upcoming'})
+        self.assertEqual({event.organizer_id for event in created}, {self.organizer.pk})
+
+    def test_create_queries_do_not_scale_with_items(self):
+        self.client.force_authenticate(self.organizer)
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, [self.item(category=self.category.pk)] * 2, format='json')
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(self.url, [self.item(category=self.category.pk)] * 50, format='json')
+        # bulk_create splits INSERTs to fit SQLite's parameter limit; nothing else may grow
+        lookups = [
+            [query['sql'] for query in captured if not query['sql'].startswith('INSERT')]
+            for captured in (small, large)
+        ]
+        self.assertEqual(len(lookups[0]), len(lookups[1]))
+        self.assertEqual(Event.objects.count(), 52)
+
+    def test_invalid_item_rejects_whole_batch(self):
+        self.client.force_authenticate(self.organizer)
+        response = self.client.post(self.url, [
+            self.item(),
+            self.item(capacity=0),
+            self.item(category=9999),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.data['details']
+        self.assertEqual(errors[0], {})
+        self.assertIn('capacity', errors[1])
+        self.assertIn('category', errors[2])
+        self.assertFalse(Event.objects.exists())
+
+    def test_update_checks_ownership_and_promotes_waitlist(self):
+        event = make_event(self.organizer, title='Derby', capacity=1, allow_waitlist=True)
+        theirs = make_event(self.other, title='Theirs')
+        EventRegistration.objects.register(event, self.other)
+        EventRegistration.objects.register(event, User.objects.create_user('fan'))
+
+        self.client.force_authenticate(self.organizer)
+        response = self.client.patch(self.url, [
+            {'slug': event.slug, 'capacity': 5},
+            {'slug': theirs.slug, 'title': 'Mine now'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('slug', response.data['details'][1])
+
+        response = self.client.patch(self.url, [
+            {'slug': event.slug, 'capacity': 5, 'title': 'Grand Derby'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        event.refresh_from_db()
+        self.assertEqual((event.title, event.capacity, event.current_attendees), ('Grand Derby', 5, 2))
+        self.assertFalse(EventRegistration.objects.filter(status='waitlisted').exists())
+
+    def test_delete(self):
+        events = [make_event(self.organizer, title=f'Fixture {i}') for i in range(3)]
+        self.client.force_authenticate(self.organizer)
+
+        response = self.client.delete(self.url, [events[0].slug, 'missing'], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Event.objects.count(), 3)
+
+        response = self.client.delete(self.url, [event.slug for event in events[:2]], format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(Event.objects.values_list('slug', flat=True)), [events[2].slug])
+
+    def test_requires_authentication(self):
+        self.assertIn(self.client.post(self.url, [self.item()], format='json').status_code, (401, 403))
+        self.client.force_authenticate(User.objects.create_user('attendee'))
+        self.assertEqual(self.client.delete(self.url, ['x'], format='json').status_code, 403)
+
+
+class SlugAllocationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345', is_staff=True)
+
+    def test_next_slug_follows_highest_suffix(self):
+        queryset = Event.objects.all()
+        self.assertEqual(next_slug(queryset, 'weekly-meetup'), 'weekly-meetup')
+        for slug in ['weekly-meetup', 'weekly-meetup-9', 'weekly-meetup-10', 'weekly-meetup-nairobi']:
+            make_event(self.organizer, slug=slug)
+        self.assertEqual(next_slug(queryset, 'weekly-meetup'), 'weekly-meetup-11')
+        self.assertEqual(next_slug(queryset, 'weekly'), 'weekly')
+        self.assertEqual(next_slug(queryset, 'weekly-meetup-nairobi'), 'weekly-meetup-nairobi-1')
+
+    def test_repeated_titles_cost_constant_queries(self):
+        for _ in range(20):
+            make_event(self.organizer, title='Weekly Meetup')
+        # slug lookup, savepoint, insert, savepoint release
+        with self.assertNumQueries(4):
+            event = make_event(self.organizer, title='Weekly Meetup')
+        self.assertEqual(event.slug, 'weekly-meetup-20')
+
+    def test_category_slugs_are_unique(self):
+        first = EventCategory.objects.create(name='C++')
+        second = EventCategory.objects.create(name='C')
+        self.assertEqual((first.slug, second.slug), ('c', 'c-1'))
+
+    def test_admin_reallocates_prepopulated_slug(self):
+        make_event(self.organizer, title='Weekly Meetup')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass12345'))
+        event_date = timezone.localtime() + timedelta(days=3)
+        response = self.client.post(reverse('admin:EventAPI_event_add'), {
+            'title': 'Weekly Meetup',
+            'slug': 'weekly-meetup',
+            'description': 'Again',
+            'organizer': self.organizer.pk,
+            'event_date_0': event_date.strftime('%Y-%m-%d'),
+            'event_date_1': event_date.strftime('%H:%M:%S'),
+            'location': 'Nairobi',
+            'capacity': 10,
+            'current_attendees': 0,
+            'price': '0',
+            'is_free': 'on',
+            'status': 'upcoming',
+            'is_published': 'on',
+        })
+        self.assertEqual(response.status_code, 302, getattr(response, 'context', None) and
+                         response.context['adminform'].form.errors)
+        self.assertTrue(Event.objects.filter(slug='weekly-meetup-1').exists())
+
+
+class ConcurrentSlugAllocationTests(TransactionTestCase):
+
+    def test_concurrent_same_title_events_get_unique_slugs(self):
+        organizer = User.objects.create_user('organizer', password='pass12345')
+
+        def create(_):
+            try:
+                while True:
+                    try:
+                        return make_event(organizer, title='Weekly Meetup').slug
+                    except OperationalError as exc:
+                        # The shared in-memory test database fails lock waits
+                        # immediately instead of honouring a busy timeout
+                        if 'locked' not in str(exc):
+                            raise
+                        time.sleep(random.random() / 100)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            slugs = list(pool.map(create, range(1000)))
+
+        self.assertEqual(len(set(slugs)), 1000)
+        self.assertEqual(Event.objects.filter(slug__startswith='weekly-meetup').count(), 1000)
+
+
+class StatusTransitionTests(EventAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.organizer = User.objects.create_user('organizer', password='pass12345')
+        now = timezone.now()
+        self.events = {
+            'started': make_event(self.organizer, title='Started', event_date=now + timedelta(hours=1)),
+            'finished': make_event(
+                self.organizer,
+                title='Finished',
+                event_date=now + timedelta(hours=1),
+                end_date=now + timedelta(hours=2)
+            ),
+            'ended': make_event(
+                self.organizer,
+                title='Ended',
+                event_date=now + timedelta(hours=1),
+                end_date=now + timedelta(hours=2)
+            ),
+            'moved': make_event(self.organizer, title='Moved'),
+            'cancelled': make_event(self.organizer, title='Cancelled', status='cancelled'),
+        }
+        # Time passes without the rows being saved again
+        Event.objects.filter(pk=self.events['started'].pk).update(event_date=now - timedelta(hours=1))
+        Event.objects.filter(pk=self.events['finished'].pk).update(
+            event_date=now - timedelta(hours=3),
+            end_date=now - timedelta(hours=2)
+        )
+        Event.objects.filter(pk=self.events['ended'].pk).update(
+            status='ongoing',
+            event_date=now - timedelta(hours=3),
+            end_date=now - timedelta(hours=2)
+        )
+        Event.objects.filter(pk=self.events['moved'].pk).update(status='completed')
+        Event.objects.filter(pk=self.events['cancelled'].pk).update(event_date=now - timedelta(days=1))
+
+    def statuses(self, field='status'):
+        queryset = Event.objects.with_live_status()
+        return {event.title: getattr(event, field) for event in queryset}
+
+    def test_live_status_is_exact_before_transition(self):
+        expected = {
+            'Started': 'ongoing',
+            'Finished': 'completed',
+            'Ended': 'completed',
+            'Moved': 'upcoming',
+            'Cancelled': 'cancelled',
+        }
+        self.assertEqual(self.statuses('live_status'), expected)
+        self.assertNotEqual(self.statuses(), expected)
+        self.assertEqual({event.title: event.live_status for event in Event.objects.all()}, expected)
+
+        results = self.client.get(reverse('events:event-list-create')).data['results']
+        self.assertEqual({item['title']: item['status'] for item in results}, expected)
+
+    def test_command_transitions_statuses(self):
+        before = dict(Event.objects.values_list('title', 'updated_at'))
+        stdout = io.StringIO()
+        call_command('update_event_statuses', stdout=stdout)
+
+        self.assertIn('started: 2, ended: 1, rescheduled: 1', stdout.getvalue())
+        self.assertEqual(self.statuses(), self.statuses('live_status'))
+        after = dict(Event.objects.values_list('title', 'updated_at'))
+        self.assertEqual(before['Cancelled'], after['Cancelled'])
+        self.assertLess(before['Moved'], after['Moved'])
+
+        call_command('update_event_statuses', stdout=stdout)
+        self.assertIn('started: 0, ended: 0, rescheduled: 0', stdout.getvalue())
+
+    def test_updates_are_batched(self):
+        past = timezone.now() - timedelta(hours=1)
+        for i in range(23):
+            make_event(self.organizer, title=f'Stale {i}')
+        Event.objects.filter(title__startswith='Stale').update(event_date=past)
+
+        with CaptureQueriesContext(connection) as queries:
+            counts = Event.objects.transition_statuses(batch_size=10)
+        updates = [query for query in queries if query['sql'].startswith('UPDATE')]
+        # 25 started rows: 10 + 10 + 5; one short batch each for the others
+        self.assertEqual(len(updates), 5)
+        self.assertEqual(counts, {'started': 25, 'ended': 1, 'rescheduled': 1})
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite query plans')
+    def test_transitions_use_status_index(self):
+        now = timezone.now()
+        for name, condition, _ in Event.objects.status_transitions(now):
+            with self.subTest(transition=name):
+                plan = Event.objects.filter(condition).order_by().values('pk')[:10].explain()
+                self.assertIn('events_status_date_idx', plan)
+
+
+class AsyncReadViewTests(EventAPITestCase):
+    """The async views must answer exactly like the DRF views they mirror"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', 'org@example.com', 'pass12345')
+        cls.category = EventCategory.objects.create(name='Music')
+        cls.event = make_event(cls.organizer, title='Jazz Night', category=cls.category, price='500')
+        make_event(cls.organizer, title='Book Club', is_free=True)
+        make_event(cls.organizer, title='Past Gig', event_date=timezone.now() - timedelta(days=2))
+        cls.draft = make_event(cls.organizer, title='Draft Show', is_published=False)
+
+    def get_sync(self, url, params=None, **extra):
+        default_cache.clear()
+        return self.client.get(url, params, **extra)
+
+    async def get_async(self, url, params=None, **extra):
+        await default_cache.aclear()
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            return await self.async_client.get(url, params, **extra)
+
+    async def test_responses_match_sync_views(self):
+        slug = self.event.slug
+        cases = [
+            ('events:event-list-create', {}, None),
+            ('events:event-list-create', {}, {'page_size': 1, 'page': 2}),
+            ('events:event-list-create', {}, {'is_free': 'true'}),
+            ('events:event-list-create', {}, {'search': 'jazz'}),
+            ('events:event-list-create', {}, {'pagination': 'cursor', 'page_size': 1}),
+            ('events:event-list-create', {}, {'page': 99}),
+            ('events:upcoming-events', {}, None),
+            ('events:event-detail', {'slug': slug}, None),
+            ('events:event-detail', {'slug': 'missing'}, None),
+            ('categories:category-list', {}, None),
+            ('categories:category-detail', {'slug': self.category.slug}, None),
+        ]
+        for name, kwargs, params in cases:
+            with self.subTest(name=name, params=params):
+                url = reverse(name, kwargs=kwargs)
+                expected = await sync_to_async(self.get_sync)(url, params)
+                response = await self.get_async(url, params)
+                self.assertEqual(response.status_code, expected.status_code)
+                data, expected_data = response.json(), expected.json()
+                if response.status_code != 200:
+                    data.pop('timestamp')
+                    expected_data.pop('timestamp')
+                self.assertEqual(data, expected_data)
+                for header in ('Content-Type', 'ETag', 'Vary', 'Allow', 'X-Cache'):
+                    self.assertEqual(response.get(header), expected.get(header))
+
+    async def test_conditional_and_cached_requests(self):
+        url = reverse('events:event-detail', kwargs={'slug': self.event.slug})
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            first = await self.async_client.get(url)
+            self.assertEqual(first['X-Cache'], 'MISS')
+            second = await self.async_client.get(url)
+            self.assertEqual(second['X-Cache'], 'HIT')
+            self.assertEqual(second.content, first.content)
+            not_modified = await self.async_client.get(url, headers={'If-None-Match': first['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_session_user_sees_drafts(self):
+        url = reverse('events:event-detail', kwargs={'slug': self.draft.slug})
+        self.assertEqual((await self.get_async(url)).status_code, 404)
+        await self.async_client.aforce_login(self.organizer)
+        response = await self.get_async(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Draft Show')
+
+    async def test_writes_and_browsable_api_use_sync_view(self):
+        url = reverse('events:event-list-create')
+        await self.async_client.aforce_login(self.organizer)
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            created = await self.async_client.post(url, {
+                'title': 'Async Created',
+                'description': 'Posted through the async route',
+                'event_date': (timezone.now() + timedelta(days=3)).isoformat(),
+                'location': 'Nairobi',
+                'capacity': 5,
+            }, content_type='application/json')
+            html = await self.async_client.get(url, headers={'Accept': 'text/html'})
+        self.assertEqual(created.status_code, 201)
+        self.assertTrue(await Event.objects.filter(title='Async Created').aexists())
+        self.assertEqual(html.status_code, 200)
+        self.assertTrue(html['Content-Type'].startswith('text/html'))
+
+
+@skipUnless(
+    connection.vendor == 'sqlite' and connection.settings_dict['OPTIONS'].get('init_command'),
+    'tuned SQLite profile'
+)
+class SQLiteProfileTests(TestCase):
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied_on_connect(self):
+        options = settings.DATABASES['default']['OPTIONS']
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), options['timeout'] * 1000)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+@override_settings(EVENTAPI_REPLICAS={
+    'ALIASES': ['default'], 'MAX_LAG': 5, 'PIN_SECONDS': 10, 'LAG_CHECK_INTERVAL': 0,
+})
+class ReplicaRoutingTests(EventAPITestCase):
+    """``default`` stands in for the replica; the routing decision is checked"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345', is_staff=True)
+        cls.event = make_event(cls.organizer, title='Replicated')
+
+    def setUp(self):
+        super().setUp()
+        routers.lag_checks.clear()
+        self.list_url = reverse('events:event-list-create')
+
+    def get_routing(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(routers.current_routing.get())
+        return response, response.renderer_context['view'].read_routing
+
+    def test_reads_go_to_replica(self):
+        for url in (
+            self.list_url,
+            reverse('events:upcoming-events'),
+            reverse('events:event-detail', kwargs={'slug': self.event.slug}),
+            reverse('categories:category-list'),
+        ):
+            with self.subTest(url=url):
+                _, routing = self.get_routing(url)
+                self.assertEqual(routing.alias, 'default')
+                self.assertEqual(routing.lag, 0)
+
+    def test_writer_is_pinned_to_primary(self):
+        self.client.force_authenticate(self.organizer)
+        response = self.client.post(self.list_url, {
+            'title': 'Fresh Event',
+            'description': 'Just written',
+            'event_date': (timezone.now() + timedelta(days=2)).isoformat(),
+            'location': 'Nairobi',
+            'capacity': 5,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(routers.is_pinned(self.organizer))
+
+        _, routing = self.get_routing(self.list_url)
+        self.assertIsNone(routing.alias)
+
+        self.client.force_authenticate(None)
+        _, routing = self.get_routing(self.list_url)
+        self.assertEqual(routing.alias, 'default')
+
+    def test_lagging_or_unreachable_replica_falls_back_to_primary(self):
+        with mock.patch.object(routers, 'measure_lag', return_value=30.0):
+            _, routing = self.get_routing(self.list_url)
+        self.assertIsNone(routing.alias)
+
+        default_cache.clear()
+        routers.lag_checks.clear()
+        with mock.patch.object(routers, 'measure_lag', side_effect=DatabaseError):
+            _, routing = self.get_routing(self.list_url)
+        self.assertIsNone(routing.alias)
+
+    def test_responses_from_lagging_replica_are_not_cached(self):
+        with mock.patch.object(routers, 'measure_lag', return_value=1.5):
+            response, routing = self.get_routing(self.list_url)
+            self.assertEqual(routing.alias, 'default')
+            self.assertFalse(response.has_header('X-Cache'))
+            self.assertFalse(self.client.get(self.list_url).has_header('X-Cache'))
+
+    async def test_async_views_choose_the_replica_off_the_event_loop(self):
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            for url, params in (
+                (self.list_url, {'search': 'replicated'}),
+                (reverse('events:upcoming-events'), {'search': 'replicated'}),
+                (reverse('events:event-detail', kwargs={'slug': self.event.slug}), {}),
+            ):
+                with self.subTest(url=url):
+                    await default_cache.aclear()
+                    routers.lag_checks.clear()
+                    response = await self.async_client.get(url, params)
+                    self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Replicated')
+
+    def test_lag_is_measured_from_updated_at(self):
+        self.assertEqual(routers.measure_lag('default'), 0)
+
+    def test_writes_and_migrations_stay_on_primary(self):
+        router = routers.ReplicaRouter()
+        self.assertEqual(router.db_for_write(Event, instance=self.event), 'default')
+        self.assertFalse(router.allow_migrate('default', 'EventAPI'))
+        with override_settings(EVENTAPI_REPLICAS={'ALIASES': []}):
+            self.assertTrue(router.allow_migrate('default', 'EventAPI'))
+
+
+class EventExportTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='pass12345', is_staff=True)
+        cls.category = EventCategory.objects.create(name='Music')
+        for i in range(5):
+            make_event(cls.organizer, title=f'Paid Concert {i}', category=cls.category, price='500', is_free=False)
+        for i in range(3):
+            make_event(cls.organizer, title=f'Free Workshop {i}', is_free=True)
+        make_event(cls.organizer, title='Hidden Draft', is_published=False)
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('events:event-export')
+        self.client.force_authenticate(self.organizer)
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_export(self):
+        response, content = self.export(is_free='false')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('events.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(content.decode('utf-8'))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['price'], '500.00')
+        self.assertEqual(rows[0]['category'], self.category.slug)
+        self.assertEqual(rows[0]['organizer'], 'organizer')
+        self.assertEqual(rows[0]['status'], 'upcoming')
+        self.assertEqual([row['id'] for row in rows], sorted((row['id'] for row in rows), key=int))
+
+    def test_ndjson_export_honours_search(self):
+        response, content = self.export(format='ndjson', search='workshop')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(sorted(row['title'] for row in rows), [f'Free Workshop {i}' for i in range(3)])
+        self.assertIsNone(rows[0]['category'])
+
+    def test_export_streams_in_chunks_with_one_query(self):
+        with mock.patch.object(EventExporter, 'chunk_size', 3):
+            response = self.client.get(self.url)
+            with self.assertNumQueries(1):
+                chunks = list(response.streaming_content)
+        # Header, then 8 rows in chunks of 3
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(b''.join(chunks).count(b'\n'), 9)
+
+    def test_errors_are_json(self):
+        response = self.client.get(self.url, {'format': 'ndjson', 'radius_km': 9999, 'near': '0,0'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.client.force_authenticate(None)
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (401, 403))
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        await self.async_client.aforce_login(self.organizer)
+        response = await self.async_client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.splitlines()), 8)
+
+
+class ImportEventsCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', is_staff=True)
+        cls.other = User.objects.create_user('other', is_staff=True)
+        cls.category = EventCategory.objects.create(name='Music')
+        cls.start = (timezone.now() + timedelta(days=7)).isoformat()
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def write_csv(self, rows):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=['title', 'slug', 'description', 'event_date', 'end_date',
+                                                    'location', 'organizer', 'category', 'capacity', 'price',
+                                                    'is_free'])
+        writer.writeheader()
+        writer.writerows(rows)
+        return self.write('events.csv', buffer.getvalue())
+
+    def row(self, **kwargs):
+        row = {
+            'title': 'Imported Meetup',
+            'description': 'From a file',
+            'event_date': self.start,
+            'location': 'Nairobi',
+            'organizer': 'organizer',
+            'capacity': 20,
+        }
+        row.update(kwargs)
+        return row
+
+    def run_command(self, path, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_events', path, *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv_import_resolves_relations_and_reports_invalid_rows(self):
+        make_event(self.organizer, title='Imported Meetup')
+        past = (timezone.now() - timedelta(days=30)).isoformat()
+        path = self.write_csv([
+            self.row(category='music', price='250.00', is_free='False'),
+            self.row(organizer='other', slug='kept-slug', end_date=''),
+            self.row(title='Past Gala', event_date=past),
+            self.row(organizer='nobody'),
+            self.row(capacity=0),
+        ])
+        stdout, stderr = self.run_command(path)
+
+        self.assertIn('Imported 3 events, 2 invalid rows skipped; 5 rows', stdout)
+        self.assertIn('rows/s', stdout)
+        self.assertIn('row 4: {"organizer"', stderr)
+        self.assertIn('row 5: {"capacity"', stderr)
+        paid = Event.objects.get(slug='imported-meetup-1')
+        self.assertEqual((paid.organizer, paid.category, paid.price), (self.organizer, self.category, decimal.Decimal('250.00')))
+        kept = Event.objects.get(slug='kept-slug')
+        self.assertEqual((kept.organizer, kept.end_date), (self.other, None))
+        self.assertEqual(Event.objects.get(title='Past Gala').status, 'ongoing')
+
+        stdout, _ = self.run_command(path)
+        self.assertIn('already imported', stdout)
+        self.assertEqual(Event.objects.count(), 4)
+
+    def test_organizers_and_categories_are_looked_up_once(self):
+        path = self.write_csv([self.row(category='music', title=f'Event {i}') for i in range(6)])
+        with CaptureQueriesContext(connection) as queries:
+            self.run_command(path, '--chunk-size', '2')
+        lookups = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(sum('"auth_user"' in sql for sql in lookups), 1)
+        self.assertEqual(sum('"event_categories"' in sql for sql in lookups), 1)
+        self.assertEqual(Event.objects.count(), 6)
+
+    def test_dry_run_validates_without_writing(self):
+        path = self.write('events.ndjson', '\n'.join([
+            json.dumps(self.row()),
+            '{not json',
+            '',
+            json.dumps(self.row(price='10.00', is_free=False)),
+        ]))
+        stdout, stderr = self.run_command(path, '--dry-run')
+        self.assertIn('Validated 2 events, 1 invalid rows skipped; 3 rows', stdout)
+        self.assertIn('row 2:', stderr)
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_malformed_dates_are_reported_per_row(self):
+        end = (timezone.now() + timedelta(days=8)).isoformat()
+        path = self.write('events.ndjson', '\n'.join(json.dumps(row) for row in [
+            self.row(title='Valid', end_date=end),
+            self.row(title='Garbage', event_date='garbage', end_date=end),
+            self.row(title='Naive', event_date='2099-01-01 10:00', end_date='2099-01-01 12:00'),
+            self.row(title='Number', event_date=5, end_date=end, registration_deadline=end),
+            self.row(title='Ends First', end_date=self.start.replace(self.start[:4], '2000', 1)),
+        ]))
+        stdout, stderr = self.run_command(path)
+        self.assertIn('Imported 2 events, 3 invalid rows skipped; 5 rows', stdout)
+        self.assertIn('row 2: {"event_date"', stderr)
+        self.assertIn('row 4: {"event_date"', stderr)
+        self.assertIn('row 5: {"end_date"', stderr)
+        self.assertEqual(sorted(Event.objects.values_list('title', flat=True)), ['Naive', 'Valid'])
+
+    def test_resumes_after_the_last_committed_chunk(self):
+        path = self.write_csv([self.row(title=f'Event {i}') for i in range(7)])
+        original = imports.bulk_create_with_slugs
+        calls = []
+
+        def fail_second_chunk(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise OperationalError('disk I/O error')
+            return original(*args, **kwargs)
+
+        with mock.patch.object(imports, 'bulk_create_with_slugs', fail_second_chunk):
+            with self.assertRaises(OperationalError):
+                self.run_command(path, '--chunk-size', '3')
+        self.assertEqual(Event.objects.count(), 3)
+        self.assertEqual(imports.load_checkpoint(f'{path}.checkpoint')['rows'], 3)
+
+        stdout, _ = self.run_command(path, '--chunk-size', '3')
+        self.assertIn('Resuming after row 3', stdout)
+        self.assertIn('Imported 4 events', stdout)
+        self.assertEqual(sorted(Event.objects.values_list('title', flat=True)), [f'Event {i}' for i in range(7)])
+
+        with open(path, 'a') as file:
+            file.write('Late,,x,2030-01-01,,Nairobi,organizer,,5,,\n')
+        with self.assertRaisesMessage(CommandError, '--restart'):
+            self.run_command(path)
+
+    def test_exported_events_import_again(self):
+        originals = [
+            make_event(self.organizer, title=f'Round Trip {i}', category=self.category, price='99.50', is_free=False)
+            for i in range(3)
+        ]
+        self.client.force_login(self.organizer)
+        response = self.client.get(reverse('events:event-export'), {'format': 'ndjson'})
+        path = self.write('export.ndjson', b''.join(response.streaming_content).decode('utf-8'))
+
+        stdout, stderr = self.run_command(path)
+        self.assertEqual(stderr, '')
+        self.assertIn('Imported 3 events', stdout)
+        copies = Event.objects.exclude(pk__in=[event.pk for event in originals]).order_by('title')
+        self.assertEqual([event.title for event in copies], [f'Round Trip {i}' for i in range(3)])
+        self.assertEqual([event.slug for event in copies], [f'{event.slug}-1' for event in originals])
+        self.assertEqual({(event.category, event.price) for event in copies}, {(self.category, decimal.Decimal('99.50'))})
+
+
+class InstrumentationTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', is_staff=True)
+        cls.category = EventCategory.objects.create(name='Music')
+        for i in range(3):
+            make_event(cls.organizer, title=f'Measured {i}', category=cls.category)
+
+    def timings(self, response):
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    def test_server_timing_and_log_line(self):
+        url = reverse('events:event-list-create')
+        with self.assertLogs('EventAPI.performance', 'INFO') as logs:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        timings = self.timings(response)
+        self.assertEqual(list(timings), ['db', 'serialize', 'total'])
+        self.assertEqual(timings['db']['desc'], f'"{len(queries)} queries"')
+        self.assertGreater(float(timings['total']['dur']), float(timings['db']['dur']))
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(logs.records[-1].levelname, 'INFO')
+        self.assertEqual(record['view'], 'events:event-list-create')
+        self.assertEqual(record['queries'], len(queries))
+        self.assertEqual(record['bytes'], len(response.content))
+        self.assertEqual(record['over_budget'], [])
+        self.assertEqual(logs.records[-1].metrics, record)
+
+    def test_requests_over_budget_are_flagged(self):
+        budgets = {'QUERY_BUDGET': 0, 'LATENCY_BUDGET_MS': 0}
+        with override_settings(EVENTAPI_INSTRUMENTATION=budgets):
+            with self.assertLogs('EventAPI.performance', 'WARNING') as logs:
+                self.client.get(reverse('events:event-detail', args=['measured-0']))
+        record = logs.records[-1].metrics
+        self.assertEqual(record['view'], 'events:event-detail')
+        self.assertEqual(record['over_budget'], ['queries', 'latency'])
+
+    def test_disabled(self):
+        with override_settings(EVENTAPI_INSTRUMENTATION={'ENABLED': False}):
+            response = self.client.get(reverse('categories:category-list'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        with override_settings(EVENTAPI_INSTRUMENTATION={'SERVER_TIMING': False}):
+            response = self.client.get(reverse('categories:category-list'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_timer_outside_a_request_is_a_no_op(self):
+        with instrumentation.timer('serialize'):
+            pass
+        self.assertIsNone(instrumentation.current_metrics.get())
+
+    @override_settings(ROOT_URLCONF=AsyncURLConf)
+    async def test_async_views_are_measured(self):
+        response = await self.async_client.get('/api/v1/events/')
+        self.assertEqual(response.status_code, 200)
+        timings = self.timings(response)
+        # Queries run in the request's sync thread are counted too
+        self.assertRegex(timings['db']['desc'], r'^"[1-9]\d* queries"$')
+        self.assertIn('serialize', timings)
+
+
+class SeedEventsCommandTests(TestCase):
+
+    def run_command(self, *args):
+        stdout = io.StringIO()
+        call_command('seed_events', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def schema(self):
+        """The indexes and triggers of the events table, which the load drops and rebuilds"""
+        if connection.vendor != 'sqlite':
+            return set()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT type, name FROM sqlite_master WHERE tbl_name IN ('events', 'events_fts')")
+            return set(cursor.fetchall())
+
+    def test_seeds_consistent_events(self):
+        schema = self.schema()
+        stdout = self.run_command('--events', '500', '--seed', '1', '--batch-size', '200')
+        self.assertIn('Created 500 events', stdout)
+        self.assertEqual(Event.objects.count(), 500)
+        self.assertEqual(User.objects.filter(username__startswith=seeding.ORGANIZER_PREFIX).count(), 10)
+        self.assertEqual(EventCategory.objects.count(), len(seeding.CATEGORIES))
+        self.assertFalse(Event.objects.filter(current_attendees__gt=models.F('capacity')).exists())
+        self.assertFalse(Event.objects.filter(category__isnull=True).exists())
+        for event in Event.objects.exclude(status='cancelled'):
+            self.assertEqual(event.status, event.compute_status(), event.slug)
+        # The most popular category and organizer hold the most events
+        counts = Event.objects.values('category__name').annotate(n=models.Count('id')).order_by('-n')
+        self.assertEqual(counts[0]['category__name'], seeding.CATEGORIES[0][0])
+        counts = Event.objects.values('organizer__username').annotate(n=models.Count('id')).order_by('-n')
+        self.assertEqual(counts[0]['organizer__username'], f'{seeding.ORGANIZER_PREFIX}0')
+
+        self.assertEqual(self.schema(), schema)
+        response = self.client.get(reverse('events:event-list-create'), {'search': 'Nairobi', 'page_size': 100})
+        expected = Event.objects.filter(is_published=True, location__endswith='Nairobi').count()
+        self.assertEqual(response.data['count'], expected)
+
+    def test_same_seed_generates_the_same_events(self):
+        categories = seeding.seed_categories()
+        now = timezone.now()
+
+        def rows(seed):
+            return list(seeding.EventGenerator(seed, [1, 2, 3], categories, now=now).rows(50))
+
+        self.assertEqual(rows(7), rows(7))
+        self.assertNotEqual(rows(7), rows(8))
+
+    def test_seeding_a_seed_again_fails(self):
+        schema = self.schema()
+        self.run_command('--events', '20', '--seed', '3')
+        with self.assertRaisesMessage(CommandError, 'pass another --seed'):
+            self.run_command('--events', '20', '--seed', '3')
+        self.assertEqual(Event.objects.count(), 20)
+        self.assertEqual(self.schema(), schema)
+        self.run_command('--events', '20', '--seed', '4', '--keep-indexes')
+        self.assertEqual(Event.objects.count(), 40)
+
+
+# Logins run the password hasher, over the default latency budget
+@override_settings(EVENTAPI_INSTRUMENTATION={'LATENCY_BUDGET_MS': 60000})
+class BearerTokenTests(EventAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('token-user', password='pass12345')
+
+    def setUp(self):
+        super().setUp()
+        tokens.local_cache.clear()
+
+    def login(self):
+        response = self.client.post(
+            reverse('user-login'), {'username': 'token-user', 'password': 'pass12345'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data['token']
+
+    def profile(self, token):
+        return self.client.get(reverse('user-profile'), HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_login_issues_a_token_checked_without_queries_once_cached(self):
+        token = self.login()
+        # The token lookup, then the profile fields token auth leaves deferred
+        with self.assertNumQueries(2):
+            response = self.profile(token)
+        self.assertEqual(response.data['username'], 'token-user')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.profile(token).status_code, 200)
+        # Another process finds the user in the shared cache
+        tokens.local_cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.profile(token).status_code, 200)
+
+    def test_shared_cache_holds_only_the_fields_auth_needs(self):
+        token = self.login()
+        self.assertEqual(self.profile(token).status_code, 200)
+        cached = default_cache.get(tokens.cache_key(token.split(':')[1]))
+        self.assertEqual(cached, (self.user.pk, False, False, True))
+        self.user.refresh_from_db()
+        self.assertNotIn(self.user.password, repr(cached))
+
+        user = tokens.get_user(*tokens.parse_token(token))
+        self.assertLessEqual({'password', 'username', 'email'}, user.get_deferred_fields())
+        self.assertEqual(user.username, 'token-user')
+
+    def test_clear_expired_tokens(self):
+        live = self.login()
+        with override_settings(EVENTAPI_TOKENS={'TTL': 0}):
+            for _ in range(3):
+                tokens.issue_token(self.user)
+        stdout = io.StringIO()
+        call_command('clear_expired_tokens', '--batch-size', '2', stdout=stdout)
+        self.assertIn('Deleted 3 expired tokens', stdout.getvalue())
+        self.assertEqual(ApiToken.objects.count(), 1)
+        self.assertEqual(self.profile(live).status_code, 200)
+
+    def test_rejects_tampered_and_expired_tokens(self):
+        token = self.login()
+        user_id, key, expires, signature = token.split(':')
+        response = self.profile(f'{user_id}:{key}:{int(expires) + 3600}:{signature}')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+
+        with override_settings(EVENTAPI_TOKENS={'TTL': 0}):
+            token, _ = tokens.issue_token(self.user)
+        self.assertEqual(self.profile(token).status_code, 401)
+        self.assertEqual(self.client.get(reverse('user-profile')).status_code, 401)
+
+    def test_logout_revokes_cached_tokens(self):
+        first, second = self.login(), self.login()
+        self.assertEqual(self.profile(first).status_code, 200)
+        self.assertEqual(self.profile(second).status_code, 200)
+
+        response = self.client.post(reverse('user-logout'), HTTP_AUTHORIZATION=f'Bearer {first}')
+        self.assertEqual(response.data, {'revoked': 1})
+        self.assertEqual(self.profile(first).status_code, 401)
+        self.assertEqual(self.profile(second).status_code, 200)
+
+        self.login()
+        response = self.client.post(
+            reverse('user-logout'), {'all': True}, format='json', HTTP_AUTHORIZATION=f'Bearer {second}'
+        )
+        self.assertEqual(response.data, {'revoked': 2})
+        self.assertEqual(self.profile(second).status_code, 401)
+
+    def test_deactivating_the_user_rejects_its_tokens(self):
+        token = self.login()
+        self.assertEqual(self.profile(token).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.profile(token).status_code, 401)
+
+    def test_saving_other_user_fields_keeps_cached_tokens(self):
+        token = self.login()
+        self.assertEqual(self.profile(token).status_code, 200)
+        # Only the UPDATE; no token lookup
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+        self.assertIsNotNone(default_cache.get(tokens.cache_key(token.split(':')[1])))
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertEqual(self.profile(token).status_code, 401)
+
+
+@override_settings(EVENTAPI_INSTRUMENTATION={'LATENCY_BUDGET_MS': 60000})
+class PasswordHashingTests(EventAPITestCase):
+    """Logins and sign-ups run the hasher on its own bounded executor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('hash-user', password='pass12345')
+        make_event(cls.user, title='Jazz Night')
+
+    def register_payload(self, username):
+        return {
+            'username': username,
+            'email': f'{username}@example.com',
+            'password': 'pass12345',
+            'password_confirm': 'pass12345',
+        }
+
+    def test_executor_rejects_work_beyond_its_queue(self):
+        executor = hashing.HashingExecutor(1, 0, 5)
+        release = threading.Event()
+        running = executor.submit(release.wait)
+        with self.assertRaises(hashing.HashingBusy):
+            executor.submit(list)
+        release.set()
+        running.result()
+        self.assertEqual(executor.submit(list).result(), [])
+
+    def test_executor_drops_work_queued_past_its_timeout(self):
+        executor = hashing.HashingExecutor(1, 5, 0.05)
+        executor.submit(time.sleep, 0.2)
+        with self.assertRaises(hashing.HashingBusy):
+            executor.submit(list).result()
+        self.assertEqual(executor.pending, 0)
+
+    @override_settings(EVENTAPI_HASHING={'MAX_WORKERS': 1, 'MAX_QUEUE': 0, 'QUEUE_TIMEOUT': 2})
+    def test_busy_hasher_answers_503_with_retry_after(self):
+        release = threading.Event()
+        running = hashing.get_executor().submit(release.wait)
+        try:
+            response = self.client.post(
+                reverse('user-login'), {'username': 'hash-user', 'password': 'pass12345'}, format='json'
+            )
+        finally:
+            release.set()
+            running.result()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+
+    @override_settings(EVENTAPI_HASHING={'PBKDF2_ITERATIONS': 1000})
+    def test_login_rehashes_with_the_configured_iterations(self):
+        response = self.client.post(
+            reverse('user-login'), {'username': 'hash-user', 'password': 'pass12345'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(self.user.check_password('pass12345'))
+
+    async def test_async_views_match_sync_views(self):
+        def strip(data):
+            data = dict(data)
+            data.pop('timestamp', None)
+            data.pop('token', None)
+            data.pop('expires_at', None)
+            data.get('user', {}).pop('date_joined', None)
+            data.get('user', {}).pop('id', None)
+            return data
+
+        cases = [
+            ('user-login', {'username': 'hash-user', 'password': 'pass12345'}),
+            ('user-login', {'username': 'hash-user', 'password': 'wrong-password'}),
+            ('user-login', {'username': 'nobody', 'password': 'pass12345'}),
+            ('user-login', {'username': 'hash-user'}),
+            ('user-register', self.register_payload('hash-user')),
+            ('user-register', {**self.register_payload('new-user'), 'password_confirm': 'other12345'}),
+        ]
+        for name, data in cases:
+            with self.subTest(name=name, data=data):
+                expected = await sync_to_async(self.client.post)(reverse(name), data, format='json')
+                with override_settings(ROOT_URLCONF=AsyncURLConf):
+                    response = await self.async_client.post(reverse(name), data, content_type='application/json')
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(strip(response.json()), strip(expected.json()))
+
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            response = await self.async_client.post(
+                reverse('user-register'), self.register_payload('async-user'), content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 201)
+        user = await User.objects.aget(username='async-user')
+        self.assertTrue(await sync_to_async(user.check_password)('pass12345'))
+
+    @override_settings(EVENTAPI_HASHING={'MAX_WORKERS': 1, 'MAX_QUEUE': 0, 'QUEUE_TIMEOUT': 2})
+    def test_basic_authentication_runs_on_the_hasher(self):
+        url = reverse('user-profile')
+        credentials = base64.b64encode(b'hash-user:pass12345').decode()
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'hash-user')
+
+        release = threading.Event()
+        running = hashing.get_executor().submit(release.wait)
+        try:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Basic {credentials}')
+        finally:
+            release.set()
+            running.result()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+
+    @override_settings(
+        ROOT_URLCONF=AsyncURLConf,
+        EVENTAPI_HASHING={'MAX_WORKERS': 1, 'MAX_QUEUE': 2, 'QUEUE_TIMEOUT': 60},
+        EVENTAPI_INSTRUMENTATION={'ENABLED': False}
+    )
+    async def test_reads_are_served_while_sign_ups_queue_for_the_hasher(self):
+        executor = hashing.get_executor()
+        release = threading.Event()
+        running = executor.submit(release.wait)
+
+        def register(n):
+            return self.async_client.post(
+                reverse('user-register'), self.register_payload(f'storm-{n}'), content_type='application/json'
+            )
+
+        try:
+            storm = [asyncio.ensure_future(register(n)) for n in range(2)]
+            async with asyncio.timeout(10):
+                while executor.pending < 3:
+                    await asyncio.sleep(0.01)
+
+            response = await self.async_client.get(reverse('events:event-list-create'))
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any(task.done() for task in storm))
+
+            # The queue is full: one more sign-up is turned away at once
+            response = await register(2)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '60')
+        finally:
+            release.set()
+            await asyncio.wrap_future(running)
+        responses = await asyncio.gather(*storm)
+        self.assertEqual([response.status_code for response in responses], [201, 201])
+
+
+class ThrottlingTests(EventAPITestCase):
+    """Token buckets per client and endpoint group"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('throttle-user', password='pass12345')
+        make_event(cls.user, title='Jazz Night')
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate('10/m', 5), (6, 30))
+        self.assertEqual(throttling.parse_rate('100/5min', 1), (3, 3))
+        self.assertEqual(throttling.parse_rate('2/s', 4), (0.5, 2))
+        for rate in ('10', '0/s', 'ten/s', '10/w'):
+            with self.assertRaises(ValueError):
+                throttling.parse_rate(rate, 1)
+
+    def test_bucket_allows_a_burst_then_refills_at_the_rate(self):
+        tat, allowed = None, 0
+        for _ in range(5):
+            tat, wait = throttling.take(tat, 100, 10, 30)
+            allowed += not wait
+        self.assertEqual(allowed, 3)
+        self.assertEqual(wait, 10)
+        # One token is back 10s later, the whole burst after 30s
+        self.assertEqual(throttling.take(tat, 110, 10, 30)[1], 0)
+        tat, wait = throttling.take(tat, 200, 10, 30)
+        self.assertEqual((tat, wait), (210, 0))
+
+    def test_local_store_takes_tokens_atomically(self):
+        store = throttling.LocalBucketStore('default')
+        now = time.time()
+
+        def take_many(_):
+            return sum(not store.take('throttle-test', now, 60, 60 * 100) for _ in range(50))
+
+        with ThreadPoolExecutor(8) as pool:
+            self.assertEqual(sum(pool.map(take_many, range(8))), 100)
+
+    @override_settings(EVENTAPI_THROTTLING={'RATES': {'read': ('1/m', 2), 'auth': ('1/m', 1)}})
+    def test_throttles_each_client_and_group_with_retry_after(self):
+        url = reverse('events:event-list-create')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertEqual(response.json()['error'], 'throttled')
+
+        # Other clients and other groups have their own buckets
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.2').status_code, 200)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(reverse('user-profile')).status_code, 200)
+        # A group's bucket covers all of its endpoints
+        self.assertEqual(self.client.get(reverse('user-profile')).status_code, 429)
+        # Groups without a rate are not throttled
+        for _ in range(3):
+            self.assertNotEqual(self.client.post(url, {}, format='json').status_code, 429)
+
+        with override_settings(EVENTAPI_THROTTLING={'ENABLED': False}):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(EVENTAPI_THROTTLING={'RATES': {'read': ('1/m', 1)}})
+    async def test_async_views_are_throttled(self):
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            url = reverse('events:event-list-create')
+            self.assertEqual((await self.async_client.get(url)).status_code, 200)
+            response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+
+    @skipUnless(REDIS_CACHE, 'needs a Redis server at REDIS_URL, or fakeredis and lupa')
+    def test_redis_script_takes_tokens_atomically_on_the_server(self):
+        with override_settings(CACHES={**settings.CACHES, 'throttle': REDIS_CACHE}):
+            self.addCleanup(throttling._stores.clear)
+            throttling._stores.clear()
+            cache = caches['throttle']
+            key = f'throttle-test:{uuid.uuid4().hex}'
+            self.addCleanup(cache.delete, key)
+            store = throttling.RedisBucketStore('throttle')
+            client = cache._cache.get_client(write=True)
+            stored_key = cache.make_and_validate_key(key)
+
+            now = time.time()
+            waits = [store.take(key, now, 10, 30) for _ in range(4)]
+            self.assertEqual(waits[:3], [0, 0, 0])
+            self.assertAlmostEqual(waits[3], 10, places=3)
+            # The bucket is full again 30s on, and the key expires then
+            self.assertAlmostEqual(float(client.get(stored_key)), now + 30, places=3)
+            self.assertAlmostEqual(client.pttl(stored_key) / 1000, 30, delta=1)
+            # One token is back after 10s
+            self.assertEqual(store.take(key, now + 10, 10, 30), 0)
+            self.assertAlmostEqual(store.take(key, now + 10, 10, 30), 10, places=3)
+
+            with override_settings(EVENTAPI_THROTTLING={
+                'CACHE_ALIAS': 'throttle',
+                'KEY_PREFIX': key,
+                'RATES': {'read': ('1/m', 1)},
+            }):
+                self.assertIsInstance(throttling.get_store(), throttling.RedisBucketStore)
+                url = reverse('events:event-list-create')
+                self.assertEqual(self.client.get(url).status_code, 200)
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 429)
+                self.assertEqual(response['Retry-After'], '60')
+                # Async views share the bucket, checked off the event loop
+                with override_settings(ROOT_URLCONF=AsyncURLConf):
+                    response = async_to_sync(self.async_client.get)(url)
+                self.assertEqual(response.status_code, 429)
+            for stored in client.scan_iter(f'*{key}*'):
+                client.delete(stored)
+
+    @override_settings(CACHES={
+        **settings.CACHES,
+        'throttle': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/0'},
+    })
+    def test_redis_caches_get_the_server_side_store(self):
+        self.addCleanup(throttling._stores.clear)
+        self.assertIsInstance(throttling.get_store(), throttling.LocalBucketStore)
+        with override_settings(EVENTAPI_THROTTLING={'CACHE_ALIAS': 'throttle'}):
+            self.assertIsInstance(throttling.get_store(), throttling.RedisBucketStore)
+
+    @override_settings(EVENTAPI_THROTTLING={'RATES': {'read': ('1/m', 1)}})
+    async def test_async_views_check_the_store_asynchronously(self):
+        with mock.patch.object(throttling.LocalBucketStore, 'atake', autospec=True, return_value=0) as atake, \
+                mock.patch.object(throttling.LocalBucketStore, 'take', autospec=True) as take:
+            with override_settings(ROOT_URLCONF=AsyncURLConf):
+                response = await self.async_client.get(reverse('events:event-list-create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(atake.await_count, 1)
+        take.assert_not_called()
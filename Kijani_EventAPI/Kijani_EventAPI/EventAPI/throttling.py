@@ -0,0 +1,195 @@
+"""
+Token-bucket throttling per client and endpoint group
+
+Each client (the user when authenticated, the IP address otherwise) has a
+bucket per endpoint group holding up to ``burst`` tokens, refilled at a
+steady rate; a request takes a token or is refused with ``429 Too Many
+Requests`` and a ``Retry-After`` header. A view picks its group with
+``throttle_scope``; other views fall in ``read`` for safe methods and
+``write`` for the rest. Groups without a rate in ``RATES`` are not
+throttled.
+
+A bucket is stored as one number in the shared cache, the time at which
+it will be full again (the "theoretical arrival time" of GCRA, which
+behaves exactly like a token bucket). Taking a token is atomic:
+
+* on Redis (``django.core.cache.backends.redis.RedisCache``) a Lua
+  script reads and updates the bucket on the server, so every process
+  shares it;
+* on other backends, meant for the local-memory cache, the bucket is read
+  and updated under a lock, so it is atomic within a process.
+
+A check costs one cache round trip; see ``benchmarks/throttling.py``.
+Async views call ``aallow_request()``, which makes the Redis round trip
+in a thread instead of blocking the event loop.
+"""
+
+import math
+import re
+import threading
+import time
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework import throttling
+from rest_framework.permissions import SAFE_METHODS
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'eventapi:throttle',
+    'RATES': {},
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_setting(name):
+    return getattr(settings, 'EVENTAPI_THROTTLING', {}).get(name, DEFAULTS[name])
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate, burst):
+    """
+    Return ``(interval, capacity)`` in seconds for a rate like ``'10/m'``.
+
+    ``interval`` is the time to refill one token, ``capacity`` the time to
+    refill ``burst`` tokens.
+    """
+    match = re.fullmatch(r'(\d+)/(\d*)([smhd])\w*', rate)
+    if match is None or not int(match[1]):
+        raise ValueError(f'Invalid throttle rate {rate!r}')
+    count, multiple, period = match.groups()
+    interval = int(multiple or 1) * PERIODS[period] / int(count)
+    return interval, interval * burst
+
+
+def take(tat, now, interval, capacity):
+    """
+    Take a token from the bucket full again at ``tat`` (``None`` if full).
+
+    Return ``(tat, wait)``: the bucket's new ``tat`` and, when it was
+    empty, the seconds until it holds a token again (else 0).
+    """
+    tat = max(tat or now, now) + interval
+    wait = tat - now - capacity
+    if wait > 0:
+        return tat - interval, wait
+    return tat, 0
+
+
+class LocalBucketStore:
+    """Buckets in a cache, updated under a lock of this process"""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.lock = threading.Lock()
+
+    def take(self, key, now, interval, capacity):
+        cache = caches[self.alias]
+        with self.lock:
+            tat, wait = take(cache.get(key), now, interval, capacity)
+            if not wait:
+                cache.set(key, tat, math.ceil(tat - now))
+        return wait
+
+    async def atake(self, key, now, interval, capacity):
+        # Only a lock and an in-memory lookup; cheaper than a thread hop
+        return self.take(key, now, interval, capacity)
+
+
+class RedisBucketStore:
+    """Buckets in Redis, updated by a server-side script"""
+
+    # The same arithmetic as take(); the key expires once the bucket is full.
+    # Numbers are written with %.17g, as tostring() would round the time
+    # to 0.1ms and refuse the last token of a burst.
+    SCRIPT = '''
+        local now = tonumber(ARGV[1])
+        local interval = tonumber(ARGV[2])
+        local capacity = tonumber(ARGV[3])
+        local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now) + interval
+        local wait = tat - now - capacity
+        if wait > 0 then
+            return string.format('%.17g', wait)
+        end
+        redis.call('SET', KEYS[1], string.format('%.17g', tat), 'PX', math.ceil((tat - now) * 1000))
+        return '0'
+    '''
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.script = None
+
+    def take(self, key, now, interval, capacity):
+        cache = caches[self.alias]
+        key = cache.make_and_validate_key(key)
+        client = cache._cache.get_client(key, write=True)
+        if self.script is None:
+            self.script = client.register_script(self.SCRIPT)
+        return float(self.script(keys=[key], args=[now, interval, capacity], client=client))
+
+    async def atake(self, key, now, interval, capacity):
+        return await sync_to_async(self.take, thread_sensitive=False)(key, now, interval, capacity)
+
+
+_stores = {}
+
+
+def get_store():
+    """Return the bucket store for the configured cache"""
+    alias = get_setting('CACHE_ALIAS')
+    store = _stores.get(alias)
+    if store is None:
+        store_class = RedisBucketStore if isinstance(caches[alias], RedisCache) else LocalBucketStore
+        store = _stores.setdefault(alias, store_class(alias))
+    return store
+
+
+class TokenBucketThrottle(throttling.BaseThrottle):
+    """Throttle each client per endpoint group with the rates in ``RATES``"""
+
+    def get_scope(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope:
+            return scope
+        return 'read' if request.method in SAFE_METHODS else 'write'
+
+    def get_client(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def get_bucket(self, request, view):
+        """Return ``(key, interval, capacity)`` of the request's bucket, or None"""
+        self.retry_after = None
+        if not get_setting('ENABLED'):
+            return None
+        scope = self.get_scope(request, view)
+        rate = get_setting('RATES').get(scope)
+        if rate is None:
+            return None
+        key = f"{get_setting('KEY_PREFIX')}:{scope}:{self.get_client(request)}"
+        return key, *parse_rate(*rate)
+
+    def allow_request(self, request, view):
+        bucket = self.get_bucket(request, view)
+        if bucket is None:
+            return True
+        self.retry_after = get_store().take(bucket[0], time.time(), *bucket[1:]) or None
+        return self.retry_after is None
+
+    async def aallow_request(self, request, view):
+        """Async version of ``allow_request()``"""
+        bucket = self.get_bucket(request, view)
+        if bucket is None:
+            return True
+        self.retry_after = await get_store().atake(bucket[0], time.time(), *bucket[1:]) or None
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,175 @@
+"""
+Signed, expiring bearer tokens for API requests
+
+Login issues a token ``user_id:key:expires:signature``, the signature
+being an HMAC of the rest under ``SECRET_KEY`` (Django's ``Signer``).
+Checking a request costs that HMAC and an expiry comparison instead of a
+run of the password hasher. The user is then found by token key in a
+small in-process LRU cache, then in the shared cache, and only then with
+one query, which also proves the token was not revoked. Only the fields
+authentication and permissions need (``USER_FIELDS``) are cached; the
+user's other fields, password hash included, load on first access.
+
+Deleting an ``ApiToken`` row revokes its token and drops its cache
+entries (see ``signals.py``); so does saving its user, unless the save
+is limited to fields outside ``USER_FIELDS``, password and username.
+Other processes may keep accepting a revoked token from their LRU cache
+for up to ``LOCAL_CACHE_TIMEOUT`` seconds.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+
+from .models import ApiToken
+
+
+DEFAULTS = {
+    'TTL': 7 * 24 * 3600,
+    'CACHE_ALIAS': 'default',
+    'CACHE_TIMEOUT': 300,
+    'KEY_PREFIX': 'eventapi:token',
+    'LOCAL_CACHE_SIZE': 4096,
+    'LOCAL_CACHE_TIMEOUT': 5,
+}
+
+SALT = 'EventAPI.tokens'
+
+USER_FIELDS = ('id', 'is_active', 'is_staff', 'is_superuser')
+
+
+def get_setting(name):
+    return getattr(settings, 'EVENTAPI_TOKENS', {}).get(name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[get_setting('CACHE_ALIAS')]
+
+
+def cache_key(key):
+    return f"{get_setting('KEY_PREFIX')}:{key}"
+
+
+class LocalCache:
+    """Thread-safe LRU cache of users by token key, with short-lived entries"""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, timeout):
+        size = get_setting('LOCAL_CACHE_SIZE')
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LocalCache()
+
+
+def issue_token(user):
+    """Create a token for ``user``; return it with its expiry time"""
+    expires_at = timezone.now() + timedelta(seconds=get_setting('TTL'))
+    token = ApiToken.objects.create(key=secrets.token_urlsafe(24), user=user, expires_at=expires_at)
+    value = f'{user.pk}:{token.key}:{int(expires_at.timestamp())}'
+    return signing.Signer(salt=SALT).sign(value), expires_at
+
+
+def parse_token(token):
+    """Check the signature and expiry of ``token``; return ``(user_id, key, expires)``"""
+    try:
+        user_id, key, expires = signing.Signer(salt=SALT).unsign(token).split(':')
+        user_id, expires = int(user_id), int(expires)
+    except (signing.BadSignature, ValueError):
+        raise exceptions.AuthenticationFailed('Invalid token.')
+    if expires <= time.time():
+        raise exceptions.AuthenticationFailed('Token has expired.')
+    return user_id, key, expires
+
+
+def get_user(user_id, key, expires):
+    """Return the user of a valid token, from the caches when possible"""
+    User = get_user_model()
+    # In model field order, as from_db() expects
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in USER_FIELDS]
+    values = local_cache.get(key)
+    if values is None:
+        remaining = expires - time.time()
+        values = get_cache().get(cache_key(key))
+        if values is None:
+            values = ApiToken.objects.filter(key=key, user_id=user_id).values_list(
+                *(f'user__{field}' for field in fields)
+            ).first()
+            if values is None:
+                raise exceptions.AuthenticationFailed('Token has been revoked.')
+            get_cache().set(cache_key(key), values, min(get_setting('CACHE_TIMEOUT'), remaining))
+        local_cache.set(key, values, min(get_setting('LOCAL_CACHE_TIMEOUT'), remaining))
+    # A new instance per request, with the other fields deferred
+    user = User.from_db(DEFAULT_DB_ALIAS, fields, values)
+    if not user.is_active:
+        raise exceptions.AuthenticationFailed('User inactive or deleted.')
+    return user
+
+
+def forget_tokens(keys):
+    """Drop the cached users of the tokens ``keys``"""
+    get_cache().delete_many([cache_key(key) for key in keys])
+    for key in keys:
+        local_cache.delete(key)
+
+
+class BearerTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticate ``Authorization: Bearer <token>`` with tokens from ``issue_token()``.
+
+    ``request.auth`` is the token key.
+    """
+
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            token = header[1].decode('ascii')
+        except UnicodeDecodeError:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        user_id, key, expires = parse_token(token)
+        return get_user(user_id, key, expires), key
+
+    def authenticate_header(self, request):
+        return f'{self.keyword} realm="api"'
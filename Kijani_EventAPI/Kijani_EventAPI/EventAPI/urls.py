@@ -1,17 +1,28 @@
 from django.urls import path
-from . import views
+from . import async_views, views
+from .async_views import select_view
 
 app_name = 'events'
 
 urlpatterns = [
-    path('', views.EventListCreateView.as_view(), name='event-list-create'),
-    path('upcoming/', views.UpcomingEventsView.as_view(), name='upcoming-events'),
-    path('<slug:slug>/', views.EventDetailView.as_view(), name='event-detail'),
+    path('', select_view('event-list-create', views.EventListCreateView, async_views.AsyncEventListView),
+         name='event-list-create'),
+    path('upcoming/', select_view('upcoming-events', views.UpcomingEventsView, async_views.AsyncUpcomingEventsView),
+         name='upcoming-events'),
+    path('bulk/', views.EventBulkView.as_view(), name='event-bulk'),
+    path('export/', views.EventExportView.as_view(), name='event-export'),
+    path('nearby/', views.NearbyEventsView.as_view(), name='nearby-events'),
+    path('<slug:slug>/', select_view('event-detail', views.EventDetailView, async_views.AsyncEventDetailView),
+         name='event-detail'),
+    path('<slug:slug>/registrations/', views.EventRegistrationListCreateView.as_view(), name='registration-list-create'),
+    path('<slug:slug>/registrations/<int:pk>/', views.EventRegistrationDetailView.as_view(), name='registration-detail'),
 ]
 
 category_urlpatterns = [
-    path('', views.CategoryListView.as_view(), name='category-list'),
-    path('<slug:slug>/', views.CategoryDetailView.as_view(), name='category-detail'),
+    path('', select_view('category-list', views.CategoryListView, async_views.AsyncCategoryListView),
+         name='category-list'),
+    path('<slug:slug>/', select_view('category-detail', views.CategoryDetailView, async_views.AsyncCategoryDetailView),
+         name='category-detail'),
 ]
 
 
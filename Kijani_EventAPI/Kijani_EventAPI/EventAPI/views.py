@@ -1,24 +1,42 @@
 from django.utils import timezone
 from django.shortcuts import render
-from rest_framework import generics, status, filters
+from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils.text import slugify
+from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Event, EventCategory
+from .models import ApiToken, Event, EventCategory, EventRegistration
 from .serializers import (
     EventListSerializer,
     EventDetailSerializer,
     EventCreateUpdateSerializer,
     EventCategorySerializer,
+    EventBulkItemSerializer,
+    EventRegistrationSerializer,
+    NearbyEventSerializer,
     UserRegistrationSerializer,
     UserLoginSerializer,
     UserSerializer,
 )
+from . import cache
+from .cache import CachedResponseMixin
+from .conditional import DetailConditionalGetMixin, ListConditionalGetMixin
+from .exports import CSVExportRenderer, EventExporter, NDJSONExportRenderer
+from .fast_serializers import EventListFastSerializer, FastListMixin, NearbyEventFastSerializer
 from .filters import EventFilter
-from .permissions import IsOrganizerOrReadOnly
+from .pagination import CustomPagination, EventListPagination
+from .renderers import FastJSONRenderer
+from .routers import ReplicaReadMixin
+from .search import EventSearchFilter
+from .slugs import bulk_create_with_slugs
+from .tokens import BearerTokenAuthentication, issue_token
+from .permissions import IsOrganizerOrReadOnly, IsRegistrantOrOrganizer
 
 
 def home(request):
@@ -31,12 +49,15 @@ def documentation(request):
     return render(request, 'documentation.html')
 
 
-class EventListCreateView(generics.ListCreateAPIView):
-    queryset = Event.objects.filter(is_published=True).select_related('organizer', 'category')
+class EventListCreateView(ReplicaReadMixin, CachedResponseMixin, ListConditionalGetMixin, FastListMixin,
+                          generics.ListCreateAPIView):
+    queryset = Event.objects.filter(is_published=True).with_related()
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, EventSearchFilter]
+    filterset_class = EventFilter
     search_fields = ['title', 'description', 'location']
     ordering = ['-event_date']
+    pagination_class = EventListPagination
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -47,19 +68,77 @@ class EventListCreateView(generics.ListCreateAPIView):
         serializer.save(organizer=self.request.user)
 
 
-class UpcomingEventsView(generics.ListAPIView):
+class UpcomingEventsView(ReplicaReadMixin, CachedResponseMixin, ListConditionalGetMixin, FastListMixin,
+                         generics.ListAPIView):
     serializer_class = EventListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = EventListPagination
+    filter_backends = [DjangoFilterBackend, EventSearchFilter]
+    filterset_class = EventFilter
+    search_fields = ['title', 'description', 'location']
 
     def get_queryset(self):
         return Event.objects.filter(
             is_published=True,
             event_date__gt=timezone.now(),
             status='upcoming'
-        ).select_related('organizer', 'category')
+        ).with_related()
+
 
+class NearbyEventsView(CachedResponseMixin, ListConditionalGetMixin, FastListMixin, generics.ListAPIView):
+    """Upcoming events within ``radius_km`` of ``near``, nearest first"""
+    serializer_class = NearbyEventSerializer
+    fast_serializer_class = NearbyEventFastSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = CustomPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EventFilter
 
-class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
+    def get_queryset(self):
+        return Event.objects.filter(
+            is_published=True,
+            event_date__gt=timezone.now()
+        ).with_related()
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('near'):
+            raise ValidationError({'near': 'This parameter is required, e.g. near=-1.2864,36.8172.'})
+        return super().list(request, *args, **kwargs)
+
+
+class EventExportView(generics.GenericAPIView):
+    """
+    Stream every published event matching the list filters.
+
+    CSV by default; ``?format=ndjson`` (or ``Accept: application/x-ndjson``)
+    selects newline-delimited JSON. Takes the same filter and ``search``
+    parameters as the event list, without pagination.
+    """
+    queryset = Event.objects.filter(is_published=True)
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CSVExportRenderer, NDJSONExportRenderer]
+    filter_backends = [DjangoFilterBackend, EventSearchFilter]
+    filterset_class = EventFilter
+    search_fields = ['title', 'description', 'location']
+    pagination_class = None
+    exporter_class = EventExporter
+    throttle_scope = 'export'
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        exporter = self.exporter_class(request.accepted_renderer)
+        return exporter.get_response(request._request, queryset)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if isinstance(response, Response):
+            # Errors are reported as JSON whatever the export format
+            request.accepted_renderer = FastJSONRenderer()
+            request.accepted_media_type = FastJSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class EventDetailView(ReplicaReadMixin, CachedResponseMixin, DetailConditionalGetMixin,
+                      generics.RetrieveUpdateDestroyAPIView):
     queryset = Event.objects.all()
     permission_classes = [IsOrganizerOrReadOnly]
     lookup_field = 'slug'
@@ -69,41 +148,246 @@ class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
             return EventCreateUpdateSerializer
         return EventDetailSerializer
 
+    def get_cache_groups(self):
+        return [cache.event_group(self.kwargs['slug']), cache.CATEGORIES_GROUP]
+
     def get_queryset(self):
-        queryset = super().get_queryset().select_related('organizer', 'category')
+        queryset = super().get_queryset().with_related().with_live_status()
         if self.request.user.is_authenticated:
             return queryset
         return queryset.filter(is_published=True)
 
 
-class CategoryListView(generics.ListAPIView):
-    queryset = EventCategory.objects.filter(is_active=True)
+class EventBulkView(generics.GenericAPIView):
+    """
+    Create (POST), update (PATCH) or delete (DELETE) many events at once.
+
+    Every item is validated before anything is written. If any item is
+    invalid, nothing is saved and the error list mirrors the request, with
+    ``{}`` for the valid items. Writes run in a single transaction.
+    """
+    serializer_class = EventBulkItemSerializer
+    max_items = 10000
+    batch_size = 500
+
+    def get_permissions(self):
+        if self.request.method == 'POST':
+            return [IsAuthenticated()]
+        return [IsOrganizerOrReadOnly()]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['categories'] = getattr(self, 'categories', None)
+        return context
+
+    def get_items(self):
+        items = self.request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of items.']})
+        if len(items) > self.max_items:
+            raise ValidationError({'non_field_errors': [f'At most {self.max_items} items per request.']})
+        return items
+
+    def load_categories(self, items):
+        """Fetch every category referenced by ``items`` in one query"""
+        ids = set()
+        for item in items:
+            value = item.get('category') if isinstance(item, dict) else None
+            if isinstance(value, str) and value.isdigit():
+                value = int(value)
+            if isinstance(value, int) and not isinstance(value, bool):
+                ids.add(value)
+        return EventCategory.objects.filter(is_active=True, pk__in=ids).in_bulk()
+
+    def get_instances(self, slugs):
+        """Fetch the events named by ``slugs`` and check the user may modify them"""
+        found = Event.objects.filter(
+            slug__in={slug for slug in slugs if isinstance(slug, str)}
+        ).in_bulk(field_name='slug')
+        instances, errors, seen = [], [], set()
+        for slug in slugs:
+            event = found.get(slug) if isinstance(slug, str) else None
+            error = {}
+            if event is None:
+                error = {'slug': ['Event not found.']}
+            elif slug in seen:
+                error = {'slug': ['Event listed more than once.']}
+            elif not all(
+                permission.has_object_permission(self.request, self, event)
+                for permission in self.get_permissions()
+            ):
+                error = {'slug': ['You do not have permission to modify this event.']}
+            if isinstance(slug, str):
+                seen.add(slug)
+            instances.append(None if error else event)
+            errors.append(error)
+        return instances, errors
+
+    def validate_items(self, items, instances, errors, partial=False):
+        """Validate each item, raising with per-item errors if any failed"""
+        # One serializer for every item, as ListSerializer does, so its
+        # fields are only built once per request
+        serializer = self.get_serializer(partial=partial)
+        validated = []
+        for index, item in enumerate(items):
+            if errors[index]:
+                validated.append(None)
+                continue
+            serializer.instance = instances[index]
+            serializer.initial_data = item
+            try:
+                validated.append(serializer.run_validation(item))
+            except ValidationError as exc:
+                errors[index] = exc.detail
+                validated.append(None)
+        if any(errors):
+            raise ValidationError(errors)
+        return validated
+
+    def get_summary(self, events):
+        return {
+            'count': len(events),
+            'results': [{'id': event.pk, 'slug': event.slug} for event in events],
+        }
+
+    def post(self, request, *args, **kwargs):
+        items = self.get_items()
+        self.categories = self.load_categories(items)
+        validated = self.validate_items(items, [None] * len(items), [{} for _ in items])
+
+        now = timezone.now()
+        events = []
+        for data in validated:
+            event = Event(organizer=request.user, **data)
+            event.update_status(now)
+            events.append(event)
+        bulk_create_with_slugs(
+            Event.objects.all(),
+            events,
+            [slugify(event.title) for event in events],
+            batch_size=self.batch_size
+        )
+        EventCategory.objects.touch()
+        cache.bump(cache.EVENTS_GROUP, cache.CATEGORIES_GROUP)
+        return Response(self.get_summary(events), status=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        items = self.get_items()
+        instances, errors = self.get_instances([
+            item.get('slug') if isinstance(item, dict) else None for item in items
+        ])
+        self.categories = self.load_categories(items)
+        validated = self.validate_items(items, instances, errors, partial=True)
+
+        now = timezone.now()
+        fields = {'status', 'updated_at'}
+        grown = []
+        for event, data in zip(instances, validated):
+            if data.get('capacity', event.capacity) > event.capacity:
+                grown.append(event.pk)
+            for attr, value in data.items():
+                setattr(event, attr, value)
+            fields.update(data)
+            event.update_status(now)
+            event.updated_at = now
+
+        with transaction.atomic():
+            Event.objects.bulk_update(instances, sorted(fields), batch_size=self.batch_size)
+            available = Event.objects.filter(pk__in=grown).values_list(
+                'pk', F('capacity') - F('current_attendees')
+            )
+            for event_id, spots in available:
+                EventRegistration.objects.promote_waitlist(event_id, spots)
+        EventCategory.objects.touch()
+        cache.bump(cache.EVENTS_GROUP, cache.CATEGORIES_GROUP)
+        return Response(self.get_summary(instances))
+
+    def delete(self, request, *args, **kwargs):
+        instances, errors = self.get_instances(self.get_items())
+        if any(errors):
+            raise ValidationError(errors)
+        with transaction.atomic():
+            Event.objects.filter(pk__in=[event.pk for event in instances]).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class EventRegistrationListCreateView(generics.ListCreateAPIView):
+    """Register for an event or list its registrations and waitlist"""
+    serializer_class = EventRegistrationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_event(self):
+        if not hasattr(self, '_event'):
+            self._event = get_object_or_404(Event, slug=self.kwargs['slug'], is_published=True)
+        return self._event
+
+    def get_queryset(self):
+        event = self.get_event()
+        queryset = EventRegistration.objects.filter(event=event).select_related('user', 'event')
+        if event.organizer_id != self.request.user.pk:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset.order_by('status', 'waitlist_position', 'created_at')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['event'] = self.get_event()
+        return context
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        cache.invalidate_event(self.get_event().slug)
+
+
+class EventRegistrationDetailView(generics.RetrieveDestroyAPIView):
+    """View or cancel a single registration"""
+    serializer_class = EventRegistrationSerializer
+    permission_classes = [IsAuthenticated, IsRegistrantOrOrganizer]
+
+    def get_queryset(self):
+        return EventRegistration.objects.filter(
+            event__slug=self.kwargs['slug']
+        ).select_related('user', 'event__organizer')
+
+    def perform_destroy(self, instance):
+        EventRegistration.objects.cancel(instance)
+        cache.invalidate_event(self.kwargs['slug'])
+
+
+class CategoryListView(ReplicaReadMixin, CachedResponseMixin, generics.ListAPIView):
+    queryset = EventCategory.objects.filter(is_active=True).with_event_count().order_by('name')
     serializer_class = EventCategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cache_groups = (cache.CATEGORIES_GROUP,)
 
 
-class CategoryDetailView(generics.RetrieveAPIView):
-    queryset = EventCategory.objects.filter(is_active=True)
+class CategoryDetailView(ReplicaReadMixin, CachedResponseMixin, generics.RetrieveAPIView):
+    queryset = EventCategory.objects.filter(is_active=True).with_event_count().order_by('name')
     serializer_class = EventCategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
+    cache_groups = (cache.CATEGORIES_GROUP, cache.EVENTS_GROUP)
 
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        serializer = self.get_serializer(instance)
+    def get_fast_serializer(self):
+        return EventListFastSerializer(context=self.get_serializer_context())
 
+    def get_upcoming_events(self, instance):
+        """Rows for the next five published events in ``instance``"""
         upcoming_events = Event.objects.filter(
             category=instance,
             is_published=True,
             event_date__gt=timezone.now()
-        ).select_related('organizer')[:5]
+        )
+        return self.get_fast_serializer().prepare(upcoming_events)[:5]
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
 
         data = serializer.data
-        data['upcoming_events'] = EventListSerializer(
-            upcoming_events,
-            many=True,
-            context={'request': request}
-        ).data
+        data['upcoming_events'] = self.get_fast_serializer().serialize(
+            self.get_upcoming_events(instance),
+            category_counts={instance.pk: instance.event_count}
+        )
 
         return Response(data)
 
@@ -112,12 +396,14 @@ class UserRegistrationView(generics.CreateAPIView):
     """API endpoint for user registration"""
     serializer_class = UserRegistrationSerializer
     permission_classes = []  # Allow anyone to register
+    throttle_scope = 'auth'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
+        return self.registered_response(serializer.save())
 
+    def registered_response(self, user):
         return Response({
             'user': UserSerializer(user).data,
             'message': 'User registered successfully. You can now login.'
@@ -128,23 +414,48 @@ class UserLoginView(generics.GenericAPIView):
     """API endpoint for user login"""
     serializer_class = UserLoginSerializer
     permission_classes = []  # Allow anyone to attempt login
+    throttle_scope = 'auth'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.validated_data['user']
+        return self.login_response(serializer.validated_data['user'])
+
+    def login_response(self, user):
+        token, expires_at = issue_token(user)
 
         return Response({
             'user': UserSerializer(user).data,
-            'message': 'Login successful. Use Basic Authentication with your credentials for API requests.'
+            'token': token,
+            'expires_at': expires_at,
+            'message': 'Login successful. Send "Authorization: Bearer <token>" with API requests.'
         }, status=status.HTTP_200_OK)
 
 
+class UserLogoutView(generics.GenericAPIView):
+    """API endpoint revoking the request's token, or every token of the user with ``all``"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        tokens = ApiToken.objects.filter(user=request.user)
+        if not request.data.get('all'):
+            if not isinstance(request.successful_authenticator, BearerTokenAuthentication):
+                raise ValidationError({'detail': 'Authenticate with the token to revoke, or pass "all".'})
+            tokens = tokens.filter(key=request.auth)
+        revoked, _ = tokens.delete()
+        return Response({'revoked': revoked}, status=status.HTTP_200_OK)
+
+
 class UserProfileView(generics.RetrieveUpdateAPIView):
     """API endpoint for viewing and updating user profile"""
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        user = self.request.user
+        deferred = user.get_deferred_fields()
+        if deferred:
+            # Token authentication only loads a few fields (see tokens.py)
+            user.refresh_from_db(fields=deferred)
+        return user
 
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,11 +44,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'EventAPI.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'EventAPI.routers.PrimaryPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -74,14 +77,218 @@ WSGI_APPLICATION = 'Kijani_EventAPI.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# DB_PROFILE selects sqlite-wal (default), sqlite (no tuning) or postgres
+
+DB_PROFILE = os.environ.get('DB_PROFILE', 'sqlite-wal')
+
+if DB_PROFILE == 'postgres':
+    # Requires psycopg 3 (pip install "psycopg[binary,pool]")
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'kijani_events'),
+            'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', '127.0.0.1'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Check persistent connections before reusing them for a request
+            'CONN_HEALTH_CHECKS': True,
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DB_POOL', '0') == '1':
+        # A process-wide pool replaces persistent connections (Django 5.1+)
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+elif DB_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'OPTIONS': {
+                # Readers no longer block the writer and commits skip most fsyncs
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))};"
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+                # Wait for the write lock (seconds) instead of failing at once
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+                # Take the write lock at BEGIN so a read-then-write transaction
+                # cannot fail to upgrade its lock with "database is locked"
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
+# Read replicas for the public read endpoints (see EventAPI/routers.py).
+# DB_REPLICAS lists SQLite files, or PostgreSQL hosts (host[:port]) with
+# the postgres profile, e.g. DB_REPLICAS=/var/lib/kijani/replica.sqlite3
+
+DB_REPLICAS = [location.strip() for location in os.environ.get('DB_REPLICAS', '').split(',') if location.strip()]
+
+for index, location in enumerate(DB_REPLICAS, start=1):
+    replica = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if DB_PROFILE == 'postgres':
+        host, _, port = location.partition(':')
+        replica.update(HOST=host, PORT=port or replica['PORT'])
+    else:
+        replica['NAME'] = location
+    DATABASES[f'replica{index}'] = replica
+
+DATABASE_ROUTERS = ['EventAPI.routers.ReplicaRouter']
+
+EVENTAPI_REPLICAS = {
+    'ALIASES': [f'replica{index}' for index in range(1, len(DB_REPLICAS) + 1)],
+    # Skip replicas further behind the primary than this (seconds)
+    'MAX_LAG': float(os.environ.get('REPLICA_MAX_LAG', 5)),
+    # Read from the primary for this long after a user writes (seconds)
+    'PIN_SECONDS': int(os.environ.get('REPLICA_PIN_SECONDS', 10)),
+    'LAG_CHECK_INTERVAL': float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 2)),
+}
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND selects locmem (default), file or redis (any Redis-protocol server,
+# through the redis client package listed in requirements.txt)
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/0'),
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'kijani-eventapi',
+        }
     }
+
+# Response cache for public read endpoints (see EventAPI/cache.py)
+EVENTAPI_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 60)),
+    'ENABLED': os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1',
+}
+
+# Bearer tokens issued at login (see EventAPI/tokens.py). Revoked tokens
+# may be accepted by other processes for up to TOKEN_LOCAL_CACHE_TIMEOUT
+# seconds; users are cached in the shared cache for TOKEN_CACHE_TIMEOUT.
+EVENTAPI_TOKENS = {
+    'TTL': int(os.environ.get('TOKEN_TTL', 7 * 24 * 3600)),
+    'CACHE_ALIAS': 'default',
+    'CACHE_TIMEOUT': int(os.environ.get('TOKEN_CACHE_TIMEOUT', 300)),
+    'LOCAL_CACHE_TIMEOUT': float(os.environ.get('TOKEN_LOCAL_CACHE_TIMEOUT', 5)),
 }
 
+# Token-bucket throttling per user (or IP address) and endpoint group (see
+# EventAPI/throttling.py): each group has a rate and a burst of requests
+# allowed at once. Buckets live in the cache: with CACHE_BACKEND=redis they
+# are shared by every process, with locmem each process keeps its own.
+EVENTAPI_THROTTLING = {
+    'ENABLED': os.environ.get('THROTTLE_ENABLED', '1') == '1',
+    'CACHE_ALIAS': 'default',
+    'RATES': {
+        'read': (os.environ.get('THROTTLE_READ_RATE', '20/s'), 100),
+        'write': (os.environ.get('THROTTLE_WRITE_RATE', '2/s'), 20),
+        'export': (os.environ.get('THROTTLE_EXPORT_RATE', '6/m'), 3),
+        'auth': (os.environ.get('THROTTLE_AUTH_RATE', '10/m'), 20),
+    },
+}
+
+# Routes served by the async views in EventAPI/async_views.py when running
+# under ASGI, e.g. ASYNC_VIEWS=event-list-create,event-detail,user-login or
+# ASYNC_VIEWS=all. Other routes keep the sync DRF views.
+EVENTAPI_ASYNC_VIEWS = [
+    name.strip() for name in os.environ.get('ASYNC_VIEWS', '').split(',') if name.strip()
+]
+
+# Per-request timing, query counts and budgets (see EventAPI/instrumentation.py).
+# Every request is logged at INFO on the EventAPI.performance logger and
+# requests over a budget at WARNING; PERFORMANCE_LOG_LEVEL picks which are shown.
+EVENTAPI_INSTRUMENTATION = {
+    'ENABLED': os.environ.get('INSTRUMENTATION_ENABLED', '1') == '1',
+    'SERVER_TIMING': os.environ.get('SERVER_TIMING', '1') == '1',
+    'QUERY_BUDGET': int(os.environ.get('QUERY_BUDGET', 20)),
+    'LATENCY_BUDGET_MS': float(os.environ.get('LATENCY_BUDGET_MS', 500)),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'EventAPI.performance': {
+            'handlers': ['console'],
+            'level': os.environ.get('PERFORMANCE_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# PASSWORD_HASHER selects the hasher for new passwords: pbkdf2 (default),
+# scrypt, argon2 (needs argon2-cffi) or bcrypt (needs bcrypt). Passwords
+# hashed by the others still verify and are rehashed at the next login, as
+# are pbkdf2 hashes when PASSWORD_HASH_ITERATIONS changes.
+
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'EventAPI.hashing.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_PROFILES[PASSWORD_HASHER],
+    *(hasher for name, hasher in PASSWORD_HASHER_PROFILES.items() if name != PASSWORD_HASHER),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+# Hashing runs on HASHING_WORKERS threads (see EventAPI/hashing.py), leaving
+# the other cores to request workers. Requests wait at most
+# HASHING_QUEUE_TIMEOUT seconds behind at most HASHING_MAX_QUEUE others,
+# then get a 503 with Retry-After.
+EVENTAPI_HASHING = {
+    'MAX_WORKERS': int(os.environ.get('HASHING_WORKERS', max(1, (os.cpu_count() or 2) // 2))),
+    'MAX_QUEUE': int(os.environ.get('HASHING_MAX_QUEUE', 100)),
+    'QUEUE_TIMEOUT': float(os.environ.get('HASHING_QUEUE_TIMEOUT', 5)),
+    'PBKDF2_ITERATIONS': int(os.environ.get('PASSWORD_HASH_ITERATIONS', 0)) or None,
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -128,10 +335,27 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'EventAPI.pagination.CustomPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'EventAPI.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'EventAPI.tokens.BearerTokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'EventAPI.hashing.BasicAuthentication',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'EventAPI.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'EventAPI.throttling.TokenBucketThrottle',
+    ],
     'EXCEPTION_HANDLER': 'EventAPI.exceptions.custom_exception_handler',
 }
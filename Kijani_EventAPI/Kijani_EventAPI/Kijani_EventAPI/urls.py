@@ -16,7 +16,9 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from EventAPI import views
+from EventAPI import async_views, views
+from EventAPI.async_views import select_view
+from EventAPI.urls import category_urlpatterns
 
 urlpatterns = [
     path('', views.home, name='home'),
@@ -24,10 +26,14 @@ urlpatterns = [
     path('admin/', admin.site.urls),
 
     # Authentication endpoints
-    path('api/v1/auth/register/', views.UserRegistrationView.as_view(), name='user-register'),
-    path('api/v1/auth/login/', views.UserLoginView.as_view(), name='user-login'),
+    path('api/v1/auth/register/', select_view('user-register', views.UserRegistrationView, async_views.AsyncUserRegistrationView),
+         name='user-register'),
+    path('api/v1/auth/login/', select_view('user-login', views.UserLoginView, async_views.AsyncUserLoginView),
+         name='user-login'),
+    path('api/v1/auth/logout/', views.UserLogoutView.as_view(), name='user-logout'),
     path('api/v1/auth/profile/', views.UserProfileView.as_view(), name='user-profile'),
 
     # Event endpoints
     path('api/v1/events/', include('EventAPI.urls', namespace='events')),
+    path('api/v1/categories/', include((category_urlpatterns, 'categories'))),
 ]
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the Kijani Event API
+
+Run from the project directory, e.g. ``python -m benchmarks.nearby``.
+"""
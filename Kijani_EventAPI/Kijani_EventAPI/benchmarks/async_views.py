@@ -0,0 +1,169 @@
+"""
+Async read view benchmark
+
+Drives the project's ASGI application in-process with many concurrent
+GET requests and compares the sync DRF views with the async views from
+``EventAPI/async_views.py``, per route and concurrency level. Requests go
+through the full ASGI handler and middleware stack; only the socket
+layer of a real ASGI server is left out. The response cache is disabled
+so every request reaches the database.
+
+Measured result, in-process SQLite with 2,000 events (median requests
+per second of five interleaved rounds of 100 requests, sync / async):
+
+    route        c=1            c=10
+    list         52.7 / 50.4    45.3 / 44.8
+    filtered     53.0 / 54.4    50.6 / 52.6
+    upcoming     35.0 / 33.4    29.6 / 34.4
+    detail       53.2 / 51.1    52.1 / 62.0
+    categories   89.6 / 85.2    80.7 / 89.2
+
+The async views are no faster here: within about 15% either way of the
+sync views, which is the run-to-run noise on this host. Each request
+makes around 20 thread hops under ASGI on both paths, most of them for
+Django's sync middleware, and the async views add about one more. The
+SQLite ORM calls all run on the one thread-sensitive executor, so there
+is no database wait for concurrent requests to overlap. Whether the
+async views pay off against a database server has not been measured.
+
+    python -m benchmarks.async_views --concurrency 1 10 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from .harness import benchmark_database, percentile, report
+from .serializers import seed
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.urls import include, path  # noqa: E402
+
+from EventAPI import async_views, views  # noqa: E402
+from EventAPI.models import Event, EventCategory  # noqa: E402
+
+
+def urlconf(use_async):
+    def route(view_class, async_view_class):
+        return (async_view_class if use_async else view_class).as_view()
+
+    class URLConf:
+        urlpatterns = [
+            path('api/v1/events/', include(([
+                path('', route(views.EventListCreateView, async_views.AsyncEventListView),
+                     name='event-list-create'),
+                path('upcoming/', route(views.UpcomingEventsView, async_views.AsyncUpcomingEventsView),
+                     name='upcoming-events'),
+                path('<slug:slug>/', route(views.EventDetailView, async_views.AsyncEventDetailView),
+                     name='event-detail'),
+            ], 'events'))),
+            path('api/v1/categories/', include(([
+                path('', route(views.CategoryListView, async_views.AsyncCategoryListView),
+                     name='category-list'),
+            ], 'categories'))),
+        ]
+
+    return URLConf
+
+
+async def request(app, url):
+    """Send one GET through the ASGI app and return (status, seconds)"""
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'accept', b'application/json')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    status = None
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # The client stays connected; Django cancels this wait once it responds
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    return status, time.perf_counter() - started
+
+
+async def load(app, url, total, concurrency):
+    """Issue ``total`` requests, at most ``concurrency`` at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await request(app, url)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    statuses = {status for status, _ in results}
+    assert statuses == {200}, f'{url}: unexpected statuses {statuses}'
+    samples = [seconds * 1000 for _, seconds in results]
+    return {
+        'rps': round(total / elapsed, 1),
+        'p50_ms': round(percentile(samples, 50), 2),
+        'p95_ms': round(percentile(samples, 95), 2),
+        'p99_ms': round(percentile(samples, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        seed(args.events)
+        event = Event.objects.filter(is_published=True).order_by('pk').first()
+        routes = {
+            'list': '/api/v1/events/?page_size=20',
+            'list (filtered)': '/api/v1/events/?is_free=false&page_size=20',
+            'upcoming': '/api/v1/events/upcoming/?page_size=20',
+            'detail': f'/api/v1/events/{event.slug}/',
+            'categories': '/api/v1/categories/',
+        }
+        assert EventCategory.objects.exists()
+        app = get_asgi_application()
+
+        results = {}
+        with override_settings(EVENTAPI_CACHE={'ENABLED': False}):
+            for route, url in routes.items():
+                for concurrency in args.concurrency:
+                    for label, use_async in (('sync', False), ('async', True)):
+                        with override_settings(ROOT_URLCONF=urlconf(use_async)):
+                            asyncio.run(load(app, url, min(20, args.requests), concurrency))
+                            results[f'{route} c={concurrency} {label}'] = asyncio.run(
+                                load(app, url, args.requests, concurrency)
+                            )
+        report(
+            f'Read endpoints under ASGI, {args.requests} requests per run',
+            results,
+            as_json=args.json
+        )
+
+
+if __name__ == '__main__':
+    main()
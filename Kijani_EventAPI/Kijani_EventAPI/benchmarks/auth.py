@@ -0,0 +1,75 @@
+"""
+Authenticated request benchmark
+
+Sends the same authenticated requests (the profile endpoint and a page of
+events) through the full middleware stack with each way of
+authenticating: HTTP Basic, which runs the password hasher on every
+request, a bearer token found in the in-process cache, a bearer token
+found in the shared cache only (as in a process that has not seen it
+yet) and a session cookie. The response cache is disabled so every
+request authenticates, and so are the over-budget log lines.
+
+    python -m benchmarks.auth --repeat 200
+"""
+
+import argparse
+import base64
+
+from .harness import benchmark_database, measure, report, summarize
+from .serializers import seed
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+
+from EventAPI import tokens  # noqa: E402
+
+USERNAME = 'bench-auth'
+PASSWORD = 'bench-password'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    routes = {
+        'profile': '/api/v1/auth/profile/',
+        'list': '/api/v1/events/?page_size=20',
+    }
+    results = {}
+    disabled = override_settings(EVENTAPI_CACHE={'ENABLED': False}, EVENTAPI_INSTRUMENTATION={'ENABLED': False})
+    with benchmark_database(), disabled:
+        seed(args.events)
+        user = get_user_model().objects.create_user(USERNAME, password=PASSWORD)
+        token, _ = tokens.issue_token(user)
+        basic = base64.b64encode(f'{USERNAME}:{PASSWORD}'.encode()).decode()
+        session = Client()
+        session.force_login(user)
+
+        bearer = Client()
+
+        def bearer_shared_cache(url, **headers):
+            tokens.local_cache.clear()
+            return bearer.get(url, **headers)
+
+        setups = {
+            'basic': (Client().get, {'HTTP_AUTHORIZATION': f'Basic {basic}'}),
+            'bearer': (bearer.get, {'HTTP_AUTHORIZATION': f'Bearer {token}'}),
+            'bearer, shared cache': (bearer_shared_cache, {'HTTP_AUTHORIZATION': f'Bearer {token}'}),
+            'session': (session.get, {}),
+        }
+        for route, url in routes.items():
+            for label, (get, headers) in setups.items():
+                response = get(url, **headers)
+                assert response.status_code == 200, (label, response.status_code)
+                summary = summarize(measure(lambda: get(url, **headers), args.repeat))
+                summary['rps'] = round(1000 / summary['mean_ms'], 1)
+                results[f'{route} {label}'] = summary
+
+    report(f'Authenticated requests ({args.repeat} per setup)', results, as_json=args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Bulk import benchmark
+
+Imports a season schedule through ``/api/v1/events/bulk/`` and compares it
+with one ``POST /api/v1/events/`` per event (measured on a sample and
+extrapolated).
+
+    python -m benchmarks.bulk --events 10000
+"""
+
+import argparse
+import time
+from datetime import timedelta
+
+from .harness import benchmark_database, report
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from EventAPI.models import Event, EventCategory  # noqa: E402
+
+
+def schedule(count, categories):
+    start = timezone.now() + timedelta(days=7)
+    return [
+        {
+            'title': f'Weekly Meetup {i % 50}',
+            'description': 'Season fixture',
+            'location': 'Nairobi',
+            'capacity': 100,
+            'category': categories[i % len(categories)],
+            'event_date': (start + timedelta(hours=i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--sample', type=int, default=200)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        organizer = get_user_model().objects.create_user('bench-organizer', is_staff=True)
+        categories = [EventCategory.objects.create(name=f'Category {i}').pk for i in range(10)]
+        client = APIClient()
+        client.force_authenticate(organizer)
+
+        started = time.perf_counter()
+        response = client.post(reverse('events:event-bulk'), schedule(args.events, categories), format='json')
+        bulk_s = time.perf_counter() - started
+        assert response.status_code == 201, response.data
+
+        started = time.perf_counter()
+        for item in schedule(args.sample, categories):
+            assert client.post(reverse('events:event-list-create'), item, format='json').status_code == 201
+        single_s = (time.perf_counter() - started) / args.sample * args.events
+        assert Event.objects.count() == args.events + args.sample
+
+    report(f'Importing {args.events} events', {
+        'bulk endpoint': {
+            'seconds': round(bulk_s, 2),
+            'events_per_s': round(args.events / bulk_s),
+        },
+        f'single POSTs (from {args.sample})': {
+            'seconds': round(single_s, 2),
+            'events_per_s': round(args.events / single_s),
+        },
+    }, as_json=args.json)
+
+
+if __name__ == '__main__':
+    main()
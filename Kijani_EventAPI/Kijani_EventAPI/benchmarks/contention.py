@@ -0,0 +1,141 @@
+"""
+Write contention benchmark
+
+Runs concurrent event creation and seat reservation from several threads
+against each database profile (``DB_PROFILE``, see settings.py) and
+reports throughput, latency and failed writes per operation. Every
+profile runs in its own process so its settings apply from startup;
+SQLite profiles use a temporary database file, since WAL does not apply
+to in-memory databases. Each operation ends like a request does, with
+``close_old_connections()``, so ``CONN_MAX_AGE`` takes effect.
+
+    python -m benchmarks.contention --profiles sqlite sqlite-wal
+    DB_POOL=1 python -m benchmarks.contention --profiles postgres
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from .harness import benchmark_database, percentile, report
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import DatabaseError, close_old_connections, connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from EventAPI.models import Event  # noqa: E402
+
+
+def summarize_operation(samples, errors, elapsed):
+    return {
+        'ops_per_s': round(len(samples) / elapsed, 1),
+        'p50_ms': round(percentile(samples, 50), 2) if samples else None,
+        'p95_ms': round(percentile(samples, 95), 2) if samples else None,
+        'p99_ms': round(percentile(samples, 99), 2) if samples else None,
+        'errors': errors,
+    }
+
+
+def run_workload(threads, operations, hot_events):
+    """Run the workload in this process and return per-operation summaries"""
+    organizer = get_user_model().objects.create_user('bench-organizer', is_staff=True)
+    start = timezone.now() + timedelta(days=30)
+    hot = [
+        Event.objects.create(
+            title=f'Hot Event {i}', description='Contended', location='Nairobi',
+            event_date=start, organizer=organizer, capacity=threads * operations,
+        ).pk
+        for i in range(hot_events)
+    ]
+    samples = {'create': [], 'reserve': []}
+    errors = {'create': 0, 'reserve': 0}
+    lock = threading.Lock()
+
+    def create(rng, i):
+        # Shared titles make writers race for the same slugs
+        Event.objects.create(
+            title=f'Concurrent Meetup {i % 10}', description='Benchmark', location='Nairobi',
+            event_date=start + timedelta(minutes=rng.randint(0, 10000)),
+            organizer=organizer, capacity=50,
+        )
+
+    def reserve(rng, i):
+        Event.objects.reserve_seats(rng.choice(hot))
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        try:
+            for i in range(operations):
+                name, operation = ('create', create) if i % 2 else ('reserve', reserve)
+                started = time.perf_counter()
+                try:
+                    operation(rng, i)
+                except DatabaseError:
+                    with lock:
+                        errors[name] += 1
+                else:
+                    with lock:
+                        samples[name].append((time.perf_counter() - started) * 1000)
+                close_old_connections()
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started
+    return {name: summarize_operation(samples[name], errors[name], elapsed) for name in samples}
+
+
+def run_profile(profile, args):
+    """Run the workload for ``profile`` in a child process"""
+    env = {**os.environ, 'DB_PROFILE': profile}
+    command = [
+        sys.executable, '-m', 'benchmarks.contention', '--worker',
+        '--threads', str(args.threads),
+        '--operations', str(args.operations),
+        '--hot-events', str(args.hot_events),
+    ]
+    result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--profiles', nargs='+', default=['sqlite', 'sqlite-wal'])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--operations', type=int, default=200, help='operations per thread')
+    parser.add_argument('--hot-events', type=int, default=3)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    if args.worker:
+        test_name = None
+        if connection.vendor == 'sqlite':
+            test_name = os.path.join(tempfile.mkdtemp(), 'contention.sqlite3')
+        with benchmark_database(test_name=test_name):
+            print(json.dumps(run_workload(args.threads, args.operations, args.hot_events)))
+        return
+
+    results = {}
+    for profile in args.profiles:
+        for name, summary in run_profile(profile, args).items():
+            results[f'{profile} {name}'] = summary
+    report(
+        f'Concurrent writes, {args.threads} threads x {args.operations} operations',
+        results,
+        as_json=args.json
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Streaming export benchmark
+
+Seeds a file-backed database, streams ``/api/v1/events/export/`` and
+samples the process's anonymous resident memory (``RssAnon``, i.e.
+excluding SQLite's memory-mapped file pages) as the chunks are
+consumed. Memory should stay flat however many rows are exported.
+
+    python -m benchmarks.export --events 1000000 --format csv
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+from .harness import benchmark_database, report
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from EventAPI.models import Event, EventCategory  # noqa: E402
+
+
+def rss_anon_mb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def seed(count, batch_size=10000, seed_value=42):
+    rng = random.Random(seed_value)
+    organizers = [
+        get_user_model().objects.create_user(f'bench-organizer-{i}', f'org{i}@example.com', is_staff=True)
+        for i in range(20)
+    ]
+    categories = [EventCategory.objects.create(name=f'Category {i}') for i in range(10)]
+    now = timezone.now()
+    for start in range(0, count, batch_size):
+        Event.objects.bulk_create([
+            Event(
+                title=f'Event {i}',
+                slug=f'event-{i}',
+                description='Benchmark event ' * 10,
+                event_date=now + timedelta(days=rng.randint(1, 365), minutes=i),
+                location='Nairobi',
+                organizer=rng.choice(organizers),
+                category=rng.choice(categories + [None]),
+                capacity=100,
+                current_attendees=rng.randint(0, 100),
+                price=rng.choice(['0.00', '500.00', '1250.50']),
+            )
+            for i in range(start, min(start + batch_size, count))
+        ])
+    return organizers[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--samples', type=int, default=10, help='memory samples to report')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    test_name = os.path.join(tempfile.mkdtemp(), 'export.sqlite3')
+    with benchmark_database(test_name=test_name):
+        started = time.perf_counter()
+        user = seed(args.events)
+        seed_s = time.perf_counter() - started
+
+        client = APIClient()
+        client.force_authenticate(user)
+        baseline = rss_anon_mb()
+        started = time.perf_counter()
+        response = client.get(reverse('events:event-export'), {'format': args.format})
+        assert response.status_code == 200, response.status_code
+
+        every = max(1, args.events // args.samples)
+        rows = size = 0
+        next_sample = every
+        results = {}
+        peak = baseline
+        for chunk in response.streaming_content:
+            rows += chunk.count(b'\n')
+            size += len(chunk)
+            peak = max(peak, rss_anon_mb())
+            if rows >= next_sample:
+                results[f'after {rows} lines'] = {
+                    'rss_anon_mb': round(rss_anon_mb(), 1),
+                    'delta_mb': round(rss_anon_mb() - baseline, 1),
+                }
+                next_sample += every
+        elapsed = time.perf_counter() - started
+
+        results['total'] = {
+            'lines': rows,
+            'mb_sent': round(size / 2 ** 20, 1),
+            'seconds': round(elapsed, 2),
+            'rows_per_s': round(args.events / elapsed),
+            'baseline_mb': round(baseline, 1),
+            'peak_delta_mb': round(peak - baseline, 1),
+            'seed_s': round(seed_s, 1),
+        }
+        report(f'Export of {args.events} events as {args.format}', results, as_json=args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Shared setup for the benchmark scripts
+
+Importing this module configures Django. ``benchmark_database()`` creates a
+throwaway test database so benchmarks never touch ``db.sqlite3``, and sets
+up the test environment so the Django/DRF test clients can be used.
+"""
+
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Kijani_EventAPI.settings')
+# Benchmarks send far more requests than any client is allowed
+os.environ.setdefault('THROTTLE_ENABLED', '0')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+
+
+@contextlib.contextmanager
+def benchmark_database(keepdb=False, test_name=None):
+    """
+    Create (and afterwards destroy) a migrated test database.
+
+    ``test_name`` overrides the test database name, e.g. to benchmark
+    SQLite on a file instead of in memory.
+    """
+    old_name = connection.settings_dict['NAME']
+    if test_name is not None:
+        connection.settings_dict['TEST']['NAME'] = test_name
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def measure(func, repeat=20, warmup=2):
+    """Call ``func`` repeatedly and return the wall time of each call in ms"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Summary statistics (in ms) for a list of samples"""
+    return {
+        'n': len(samples),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+    }
+
+
+def report(title, results, as_json=False):
+    """Print ``results`` (name -> summary dict) as a table or JSON"""
+    if as_json:
+        print(json.dumps({'benchmark': title, 'results': results}, indent=2, default=str))
+        return
+    print(f'\n{title}')
+    print('-' * len(title))
+    for name, summary in results.items():
+        fields = '  '.join(f'{key}={value}' for key, value in summary.items())
+        print(f'{name:<32} {fields}')
@@ -0,0 +1,106 @@
+"""
+Sign-up storm benchmark
+
+Measures the latency of event list reads under ASGI while a storm of
+concurrent sign-ups waits for the password hasher, with the sync and with
+the async registration view. The sync view blocks the thread it runs on
+until its hash is done, so reads queue behind it; the async view awaits
+the hashing executor and leaves the event loop free. Reads go through the
+async list view and skip the response cache.
+
+On a development machine with the default 8 sign-ups and in-process
+SQLite, reads took 12 ms at the median when idle. Behind sync sign-ups
+the median held but the first read stalled for 3.3 s. Next to async
+sign-ups every read took 25-50 ms, the hasher competing for the CPU.
+
+    python -m benchmarks.hashing --sign-ups 8 --reads 20
+"""
+
+import argparse
+import asyncio
+import time
+
+from .async_views import urlconf
+from .harness import benchmark_database, report, summarize
+from .serializers import seed
+
+from django.test import AsyncClient, override_settings  # noqa: E402
+from django.urls import path  # noqa: E402
+
+from EventAPI import async_views, views  # noqa: E402
+
+URL = '/api/v1/events/?page_size=20'
+
+
+def storm_urlconf(use_async):
+    view_class = async_views.AsyncUserRegistrationView if use_async else views.UserRegistrationView
+
+    class URLConf:
+        urlpatterns = urlconf(True).urlpatterns + [
+            path('api/v1/auth/register/', view_class.as_view(), name='user-register'),
+        ]
+
+    return URLConf
+
+
+async def read_latencies(client, reads):
+    samples = []
+    for _ in range(reads):
+        started = time.perf_counter()
+        response = await client.get(URL)
+        assert response.status_code == 200, response.status_code
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def storm(client, prefix, sign_ups, reads):
+    """Read ``reads`` times while ``sign_ups`` registrations are in flight"""
+    tasks = [
+        asyncio.ensure_future(client.post('/api/v1/auth/register/', {
+            'username': f'{prefix}-{n}',
+            'email': f'{prefix}-{n}@example.com',
+            'password': 'bench-password',
+            'password_confirm': 'bench-password',
+        }, content_type='application/json'))
+        for n in range(sign_ups)
+    ]
+    await asyncio.sleep(0.05)
+    samples = await read_latencies(client, reads)
+    responses = await asyncio.gather(*tasks)
+    assert {response.status_code for response in responses} == {201}
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--sign-ups', type=int, default=8)
+    parser.add_argument('--reads', type=int, default=20)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    results = {}
+    settings = override_settings(
+        EVENTAPI_CACHE={'ENABLED': False},
+        EVENTAPI_INSTRUMENTATION={'ENABLED': False},
+        EVENTAPI_HASHING={'MAX_WORKERS': 1, 'QUEUE_TIMEOUT': 60},
+    )
+    with benchmark_database(), settings:
+        seed(args.events)
+        client = AsyncClient()
+        with override_settings(ROOT_URLCONF=storm_urlconf(True)):
+            results['idle'] = summarize(asyncio.run(read_latencies(client, args.reads)))
+        for label, use_async in (('sync', False), ('async', True)):
+            with override_settings(ROOT_URLCONF=storm_urlconf(use_async)):
+                results[f'storm, {label} sign-ups'] = summarize(
+                    asyncio.run(storm(client, label, args.sign_ups, args.reads))
+                )
+    report(
+        f'Event list read latency, {args.sign_ups} concurrent sign-ups, one hashing thread',
+        results,
+        as_json=args.json
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Instrumentation overhead benchmark
+
+Serves read endpoints through the full middleware stack with the test
+clients, without ``InstrumentationMiddleware``, with it (INFO lines
+filtered out, the default) and with every request logged. Requests to
+the three setups are interleaved so drift affects them alike, and the
+overhead is reported on the median latency. The middleware's own cost is
+also timed around a stub view, which is less noisy than the difference
+between two full requests. The response cache is disabled so every
+request runs its queries. ``--asgi`` drives the ASGI handler, where
+installing the query wrappers costs a thread hop per request.
+
+    python -m benchmarks.instrumentation --repeat 1000 --asgi
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import time
+
+from .harness import benchmark_database, measure, report, summarize
+from .serializers import seed
+
+from django.conf import settings  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import AsyncClient, Client, RequestFactory, override_settings  # noqa: E402
+
+from EventAPI.instrumentation import InstrumentationMiddleware, logger  # noqa: E402
+from EventAPI.models import Event  # noqa: E402
+
+MIDDLEWARE = 'EventAPI.instrumentation.InstrumentationMiddleware'
+
+
+class Logged:
+    """Build every request's log line, handing it to a NullHandler, while active"""
+
+    handlers = [logging.NullHandler()]
+
+    def __enter__(self):
+        self.saved = logger.handlers, logger.level
+        logger.handlers, logger.level = self.handlers, logging.INFO
+        logger.manager._clear_cache()
+
+    def __exit__(self, *exc_info):
+        logger.handlers, logger.level = self.saved
+        logger.manager._clear_cache()
+
+
+def timed(send, url, samples, context):
+    with context:
+        started = time.perf_counter()
+        response = send(url)
+        elapsed = (time.perf_counter() - started) * 1000
+    assert response.status_code == 200, response.status_code
+    samples.append(elapsed)
+
+
+def interleave(clients, url, repeat, warmup=20):
+    """Time ``repeat`` requests per client, one client after the other"""
+    samples = {label: [] for label in clients}
+    for i in range(warmup + repeat):
+        for label, (send, context) in clients.items():
+            timed(send, url, samples[label] if i >= warmup else [], context)
+    return samples
+
+
+def interleave_asgi(clients, url, repeat, warmup=20):
+    async def run():
+        samples = {label: [] for label in clients}
+        for i in range(warmup + repeat):
+            for label, (client, context) in clients.items():
+                with context:
+                    started = time.perf_counter()
+                    response = await client.get(url)
+                    elapsed = (time.perf_counter() - started) * 1000
+                assert response.status_code == 200, response.status_code
+                if i >= warmup:
+                    samples[label].append(elapsed)
+        return samples
+
+    return asyncio.run(run())
+
+
+def middleware_cost(repeat):
+    """Time the middleware around a stub view that answers immediately"""
+    request = RequestFactory().get('/api/v1/events/')
+    body = b'x' * 4096
+    bare = InstrumentationMiddleware(lambda request: HttpResponse(body))
+    results = {'middleware alone': summarize(measure(lambda: bare(request), repeat * 10))}
+    with Logged():
+        results['middleware alone, logged'] = summarize(measure(lambda: bare(request), repeat * 10))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--asgi', action='store_true', help='use the ASGI handler')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    without = [name for name in settings.MIDDLEWARE if name != MIDDLEWARE]
+    client_class = AsyncClient if args.asgi else Client
+    clients = {}
+    for label, middleware, context in (
+        ('off', without, contextlib.nullcontext()),
+        ('on', settings.MIDDLEWARE, contextlib.nullcontext()),
+        ('on, logged', settings.MIDDLEWARE, Logged()),
+    ):
+        client = client_class()
+        # Load the middleware now; the handler keeps it for every request
+        with override_settings(MIDDLEWARE=middleware):
+            client.handler.load_middleware(is_async=args.asgi)
+        clients[label] = (client if args.asgi else client.get, context)
+
+    with benchmark_database():
+        seed(args.events)
+        event = Event.objects.filter(is_published=True).order_by('pk').first()
+        routes = {
+            'list': '/api/v1/events/?page_size=20',
+            'detail': f'/api/v1/events/{event.slug}/',
+            'categories': '/api/v1/categories/',
+        }
+        results = {}
+        with override_settings(EVENTAPI_CACHE={'ENABLED': False}):
+            for route, url in routes.items():
+                if args.asgi:
+                    samples = interleave_asgi(clients, url, args.repeat)
+                else:
+                    samples = interleave(clients, url, args.repeat)
+                baseline = summarize(samples['off'])['p50_ms']
+                for label, route_samples in samples.items():
+                    summary = summarize(route_samples)
+                    summary['overhead_pct'] = round((summary['p50_ms'] / baseline - 1) * 100, 1)
+                    results[f'{route} {label}'] = summary
+        results.update(middleware_cost(args.repeat))
+
+    handler_name = 'ASGI' if args.asgi else 'WSGI'
+    report(f'Instrumentation overhead ({handler_name}, {args.repeat} requests)', results, as_json=args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+"""
+End-to-end load benchmark
+
+Drives a weighted mix of API traffic (list, search, upcoming, detail,
+category, create and registration requests) from a fixed number of
+concurrent clients and reports, per endpoint, requests per second,
+p50/p95/p99 latency, errors and queries per request. Query counts come
+from the ``Server-Timing`` header of ``InstrumentationMiddleware``.
+
+By default the requests go in-process through Django's test client to a
+seeded throwaway database (a temporary file on SQLite, so the client
+threads share it). With ``--url`` they go over HTTP to a running server
+of this project; ``--seed-data`` first seeds the database that server
+uses. Over HTTP, each client user logs in once and writes send its
+bearer token; start the server with ``THROTTLE_ENABLED=0`` or most
+requests are throttled.
+
+The traffic is drawn from ``--random-seed``, so runs are repeatable, and
+``--json`` output can be saved and diffed between commits:
+
+    python -m benchmarks.load --events 20000 --concurrency 8 --json > before.json
+    python -m benchmarks.load --mix list=50,detail=50 --no-cache
+    THROTTLE_ENABLED=0 python manage.py runserver --noreload
+    python -m benchmarks.load --url http://127.0.0.1:8000 --seed-data
+"""
+
+import argparse
+import contextlib
+import http.client
+import itertools
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlencode, urlsplit
+
+from .harness import benchmark_database, percentile, report
+from .serializers import seed
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from EventAPI.models import Event, EventCategory  # noqa: E402
+
+
+MIX = {
+    'list': 30,
+    'search': 10,
+    'upcoming': 15,
+    'detail': 20,
+    'category': 10,
+    'create': 5,
+    'register': 10,
+}
+
+SEARCH_TERMS = ['benchmark', 'event', 'nairobi', 'event 42', 'no such thing']
+USER_PREFIX = 'load-user-'
+PASSWORD = 'load-password'
+OPEN_EVENT_PREFIX = 'load-open-'
+QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in MIX:
+            raise argparse.ArgumentTypeError(f'unknown endpoint {name!r}; choose from {", ".join(MIX)}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def seed_data(events, users, open_events=20):
+    """Seed events, categories, organizers, attendees and events open for registration"""
+    User = get_user_model()
+    if User.objects.filter(username=f'{USER_PREFIX}0').exists():
+        return
+    seed(events)
+    password = make_password(PASSWORD)
+    User.objects.bulk_create([
+        User(username=f'{USER_PREFIX}{i}', email=f'load{i}@example.com', password=password)
+        for i in range(users)
+    ])
+    organizer = User.objects.get(username=f'{USER_PREFIX}0')
+    for i in range(open_events):
+        Event.objects.create(
+            title=f'Open Event {i}', slug=f'{OPEN_EVENT_PREFIX}{i}', description='Open for registration',
+            event_date=timezone.now() + timedelta(days=60), location='Nairobi', organizer=organizer,
+            capacity=10 ** 6, allow_waitlist=True,
+        )
+
+
+class Traffic:
+    """Builds the requests of the mix from the seeded data"""
+
+    def __init__(self, mix):
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.slugs = list(
+            Event.objects.filter(is_published=True).exclude(slug__startswith=OPEN_EVENT_PREFIX)
+            .order_by('pk').values_list('slug', flat=True)
+        )
+        self.category_slugs = list(EventCategory.objects.order_by('pk').values_list('slug', flat=True))
+        self.users = list(
+            get_user_model().objects.filter(username__startswith=USER_PREFIX)
+            .order_by('pk').values_list('username', flat=True)
+        )
+        self.open_events = list(
+            Event.objects.filter(slug__startswith=OPEN_EVENT_PREFIX).order_by('pk').values_list('slug', flat=True)
+        )
+        # Each registration takes the next (user, event) pair, so none is a duplicate
+        self.pairs = itertools.product(self.open_events, self.users)
+        self.pairs_lock = threading.Lock()
+        assert self.slugs and self.users and self.open_events, 'seed the database first (--seed-data)'
+
+    def next_request(self, rng):
+        """Return ``(endpoint, method, path, body, username)``"""
+        name = rng.choices(self.names, self.weights)[0]
+        return (name, *getattr(self, f'build_{name}')(rng))
+
+    def build_list(self, rng):
+        params = {'page_size': 20}
+        if rng.random() < 0.3:
+            params['is_free'] = rng.choice(['true', 'false'])
+        if rng.random() < 0.3:
+            params['category'] = rng.choice(self.category_slugs)
+        if len(params) == 1:
+            # Filtered results may have a single page
+            params['page'] = rng.randint(1, 5)
+        return 'GET', f'/api/v1/events/?{urlencode(params)}', None, None
+
+    def build_search(self, rng):
+        params = {'search': rng.choice(SEARCH_TERMS), 'page_size': 20}
+        return 'GET', f'/api/v1/events/?{urlencode(params)}', None, None
+
+    def build_upcoming(self, rng):
+        return 'GET', f'/api/v1/events/upcoming/?page={rng.randint(1, 3)}&page_size=20', None, None
+
+    def build_detail(self, rng):
+        return 'GET', f'/api/v1/events/{rng.choice(self.slugs)}/', None, None
+
+    def build_category(self, rng):
+        if rng.random() < 0.3:
+            return 'GET', '/api/v1/categories/', None, None
+        return 'GET', f'/api/v1/categories/{rng.choice(self.category_slugs)}/', None, None
+
+    def build_create(self, rng):
+        body = {
+            'title': f'Load Test Event {rng.randint(0, 10 ** 6)}',
+            'description': 'Created by the load benchmark',
+            'event_date': (timezone.now() + timedelta(days=rng.randint(1, 365))).isoformat(),
+            'location': 'Nairobi',
+            'capacity': rng.randint(10, 500),
+            'category': None,
+        }
+        return 'POST', '/api/v1/events/', body, rng.choice(self.users)
+
+    def build_register(self, rng):
+        with self.pairs_lock:
+            event, username = next(self.pairs)
+        return 'POST', f'/api/v1/events/{event}/registrations/', {}, username
+
+
+class ClientTransport:
+    """In-process requests through Django's test client, one logged-in client per thread and user"""
+
+    def __init__(self):
+        self.local = threading.local()
+        self.users = {user.username: user for user in get_user_model().objects.filter(
+            username__startswith=USER_PREFIX
+        )}
+
+    def client(self, username):
+        clients = self.local.__dict__.setdefault('clients', {})
+        if username not in clients:
+            client = Client()
+            if username:
+                client.force_login(self.users[username])
+            clients[username] = client
+        return clients[username]
+
+    def prepare(self, username):
+        self.client(username)
+
+    def send(self, method, path, body, username):
+        client = self.client(username)
+        if method == 'GET':
+            response = client.get(path)
+        else:
+            response = client.post(path, json.dumps(body), content_type='application/json')
+        return response.status_code, response.get('Server-Timing', '')
+
+    def close(self):
+        connection.close()
+
+
+class HTTPTransport:
+    """Requests over HTTP keep-alive connections, one per thread, with a token per user"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.local = threading.local()
+        self.tokens = {}
+
+    def prepare(self, username):
+        """Log ``username`` in on first use; a race only costs an extra login"""
+        if username and username not in self.tokens:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            body = json.dumps({'username': username, 'password': PASSWORD})
+            conn.request('POST', '/api/v1/auth/login/', body, {'Content-Type': 'application/json'})
+            self.tokens[username] = json.loads(conn.getresponse().read())['token']
+            conn.close()
+
+    def connection(self):
+        if getattr(self.local, 'connection', None) is None:
+            self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        return self.local.connection
+
+    def send(self, method, path, body, username):
+        headers = {'Accept': 'application/json'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if username:
+            headers['Authorization'] = f'Bearer {self.tokens[username]}'
+        conn = self.connection()
+        try:
+            conn.request(method, path, payload, headers)
+            response = conn.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self.local.connection = None
+            return None, ''
+        return response.status, response.getheader('Server-Timing') or ''
+
+    def close(self):
+        if getattr(self.local, 'connection', None) is not None:
+            self.local.connection.close()
+
+
+def run_load(traffic, transport, total, concurrency, random_seed):
+    """Send ``total`` requests from ``concurrency`` threads; return samples per endpoint"""
+    samples = {name: {'ms': [], 'queries': [], 'errors': 0} for name in traffic.names}
+    lock = threading.Lock()
+    issued = itertools.count()
+
+    def worker(index):
+        rng = random.Random(random_seed * 1000 + index)
+        try:
+            while next(issued) < total:
+                name, method, path, body, username = traffic.next_request(rng)
+                # Logging in is not part of the request
+                transport.prepare(username)
+                started = time.perf_counter()
+                status, timing = transport.send(method, path, body, username)
+                elapsed = (time.perf_counter() - started) * 1000
+                queries = QUERIES.search(timing)
+                with lock:
+                    endpoint = samples[name]
+                    endpoint['ms'].append(elapsed)
+                    if status is None or status >= 400:
+                        endpoint['errors'] += 1
+                    if queries:
+                        endpoint['queries'].append(int(queries.group(1)))
+        finally:
+            transport.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def summarize_endpoint(ms, queries, errors, elapsed):
+    return {
+        'requests': len(ms),
+        'rps': round(len(ms) / elapsed, 1),
+        'p50_ms': round(percentile(ms, 50), 2) if ms else None,
+        'p95_ms': round(percentile(ms, 95), 2) if ms else None,
+        'p99_ms': round(percentile(ms, 99), 2) if ms else None,
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        'errors': errors,
+    }
+
+
+def summarize_load(samples, elapsed):
+    results = {
+        name: summarize_endpoint(endpoint['ms'], endpoint['queries'], endpoint['errors'], elapsed)
+        for name, endpoint in samples.items()
+    }
+    results['all'] = summarize_endpoint(
+        [ms for endpoint in samples.values() for ms in endpoint['ms']],
+        [count for endpoint in samples.values() for count in endpoint['queries']],
+        sum(endpoint['errors'] for endpoint in samples.values()),
+        elapsed
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', help='base URL of a running server (default: in-process test client)')
+    parser.add_argument('--seed-data', action='store_true', help='with --url, seed the server database first')
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--mix', type=parse_mix, default=MIX, help='e.g. list=30,detail=20,create=5')
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache (in-process only)')
+    parser.add_argument('--random-seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    title = (
+        f'Load mix, {args.requests} requests at concurrency {args.concurrency} '
+        f'({args.url or "test client"}, {args.events} events)'
+    )
+
+    def run(transport):
+        traffic = Traffic(args.mix)
+        run_load(traffic, transport, args.warmup, args.concurrency, args.random_seed + 1)
+        samples, elapsed = run_load(traffic, transport, args.requests, args.concurrency, args.random_seed)
+        report(title, summarize_load(samples, elapsed), as_json=args.json)
+
+    if args.url:
+        if args.seed_data:
+            seed_data(args.events, args.users)
+        run(HTTPTransport(args.url))
+        return
+
+    test_name = None
+    if connection.vendor == 'sqlite':
+        test_name = os.path.join(tempfile.mkdtemp(), 'load.sqlite3')
+    no_cache = override_settings(EVENTAPI_CACHE={'ENABLED': False}) if args.no_cache else contextlib.nullcontext()
+    with benchmark_database(test_name=test_name), no_cache:
+        seed_data(args.events, args.users)
+        run(ClientTransport())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Radius query benchmark
+
+Seeds events clustered around a handful of cities and compares the
+bounding-box + haversine plan used by ``/api/v1/events/nearby/`` with a
+haversine-only full scan.
+
+    python -m benchmarks.nearby --events 1000000
+"""
+
+import argparse
+import random
+from datetime import timedelta
+
+from .harness import benchmark_database, measure, report, summarize
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from EventAPI.geo import filter_nearby, haversine_distance  # noqa: E402
+from EventAPI.models import Event  # noqa: E402
+
+
+CITIES = [
+    (-1.2864, 36.8172),   # Nairobi
+    (-4.0435, 39.6682),   # Mombasa
+    (-0.0917, 34.7680),   # Kisumu
+    (0.5143, 35.2698),    # Eldoret
+    (-0.3031, 36.0800),   # Nakuru
+    (-6.7924, 39.2083),   # Dar es Salaam
+    (0.3476, 32.5825),    # Kampala
+    (-1.9441, 30.0619),   # Kigali
+]
+
+
+def seed(count, batch_size=10000, seed_value=42):
+    rng = random.Random(seed_value)
+    organizer = get_user_model().objects.create_user('bench-organizer')
+    event_date = timezone.now() + timedelta(days=30)
+    batch = []
+    for i in range(count):
+        lat, lng = rng.choice(CITIES)
+        batch.append(Event(
+            title=f'Event {i}',
+            slug=f'event-{i}',
+            description='Benchmark event',
+            event_date=event_date,
+            location='Somewhere',
+            latitude=round(lat + rng.gauss(0, 0.15), 6),
+            longitude=round(lng + rng.gauss(0, 0.15), 6),
+            organizer=organizer,
+            capacity=100,
+        ))
+        if len(batch) == batch_size:
+            Event.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Event.objects.bulk_create(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--radius-km', type=float, default=5)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        seed(args.events)
+        origin = CITIES[0]
+
+        def indexed():
+            return list(filter_nearby(Event.objects.all(), *origin, args.radius_km)[:50])
+
+        def full_scan():
+            return list(
+                Event.objects.annotate(distance_km=haversine_distance(*origin))
+                .filter(distance_km__lte=args.radius_km)
+                .order_by('distance_km')[:50]
+            )
+
+        matches = filter_nearby(Event.objects.all(), *origin, args.radius_km).count()
+        results = {
+            'bounding box + haversine': summarize(measure(indexed, args.repeat)),
+            'haversine full scan': summarize(measure(full_scan, max(3, args.repeat // 5))),
+        }
+        if not args.json:
+            print(f'{args.events} events, {matches} within {args.radius_km} km of Nairobi')
+            print(filter_nearby(Event.objects.all(), *origin, args.radius_km).explain())
+        report('Nearby events', results, as_json=args.json)
+
+
+if __name__ == '__main__':
+    main()
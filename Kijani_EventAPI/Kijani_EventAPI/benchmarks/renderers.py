@@ -0,0 +1,81 @@
+"""
+JSON renderer benchmark
+
+Renders 100-event pages of ``EventListSerializer`` output with DRF's
+``JSONRenderer`` and with ``FastJSONRenderer`` (orjson, then the stdlib
+fallback) and reports pages and events per second.
+
+    python -m benchmarks.renderers --page-size 100
+"""
+
+import argparse
+import io
+
+from .harness import benchmark_database, measure, report, summarize
+from .serializers import seed
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from EventAPI.models import Event  # noqa: E402
+from EventAPI.renderers import FastJSONParser, FastJSONRenderer  # noqa: E402
+from EventAPI.serializers import EventListSerializer  # noqa: E402
+
+
+def throughput(summary, rows):
+    return {
+        **summary,
+        'pages_per_s': round(1000 / summary['mean_ms'], 1),
+        'events_per_s': round(rows * 1000 / summary['mean_ms']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        seed(args.events)
+        queryset = Event.objects.with_related().order_by('-event_date')[:args.page_size]
+        data = {
+            'count': args.events,
+            'next': None,
+            'previous': None,
+            'results': EventListSerializer(queryset, many=True).data,
+        }
+
+    stock = JSONRenderer()
+    fast = FastJSONRenderer()
+    fallback = FastJSONRenderer()
+    fallback.backend = None
+    assert fast.render(data) == stock.render(data)
+
+    body = stock.render(data)
+    stdlib_parser = FastJSONParser()
+    stdlib_parser.backend = None
+
+    def parse_with(parser):
+        return lambda: parser.parse(io.BytesIO(body))
+
+    rows = args.page_size
+    results = {
+        'JSONRenderer': throughput(summarize(measure(lambda: stock.render(data), args.repeat)), rows),
+        'FastJSONRenderer (orjson)': throughput(
+            summarize(measure(lambda: fast.render(data), args.repeat)), rows
+        ),
+        'FastJSONRenderer (fallback)': throughput(
+            summarize(measure(lambda: fallback.render(data), args.repeat)), rows
+        ),
+        'JSONParser': throughput(summarize(measure(parse_with(stdlib_parser), args.repeat)), rows),
+        'FastJSONParser (orjson)': throughput(
+            summarize(measure(parse_with(FastJSONParser()), args.repeat)), rows
+        ),
+    }
+    report(f'JSON rendering, {rows} events per page ({len(body)} bytes)', results, as_json=args.json)
+
+
+if __name__ == '__main__':
+    main()
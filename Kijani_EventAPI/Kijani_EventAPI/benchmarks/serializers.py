@@ -0,0 +1,92 @@
+"""
+List serialization benchmark
+
+Compares ``EventListSerializer`` with the values-based
+``EventListFastSerializer`` on full list pages, both with the queries
+included and for the serialization step alone, and reports per-row cost.
+
+    python -m benchmarks.serializers --page-size 100
+"""
+
+import argparse
+import random
+from datetime import timedelta
+
+from .harness import benchmark_database, measure, report, summarize
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from EventAPI.fast_serializers import EventListFastSerializer  # noqa: E402
+from EventAPI.models import Event, EventCategory  # noqa: E402
+from EventAPI.serializers import EventListSerializer  # noqa: E402
+
+
+def seed(count, seed_value=42):
+    rng = random.Random(seed_value)
+    organizers = [
+        get_user_model().objects.create_user(f'bench-organizer-{i}', f'org{i}@example.com')
+        for i in range(20)
+    ]
+    categories = [EventCategory.objects.create(name=f'Category {i}') for i in range(10)]
+    now = timezone.now()
+    Event.objects.bulk_create([
+        Event(
+            title=f'Event {i}',
+            slug=f'event-{i}',
+            description='Benchmark event ' * 10,
+            event_date=now + timedelta(days=rng.randint(1, 365), minutes=i),
+            location='Nairobi',
+            organizer=rng.choice(organizers),
+            category=rng.choice(categories + [None]),
+            capacity=100,
+            current_attendees=rng.randint(0, 100),
+            price=rng.choice(['0.00', '500.00', '1250.50']),
+        )
+        for i in range(count)
+    ])
+
+
+def per_row(summary, rows):
+    return {**summary, 'us_per_row': round(summary['mean_ms'] * 1000 / rows, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        seed(args.events)
+        queryset = Event.objects.with_related().order_by('-event_date')
+        fast = EventListFastSerializer()
+        page = args.page_size
+
+        def drf_page():
+            return EventListSerializer(queryset[:page], many=True).data
+
+        def fast_page():
+            return fast.serialize(fast.prepare(queryset)[:page])
+
+        instances = list(queryset[:page])
+        rows = list(fast.prepare(queryset)[:page])
+        counts = fast.get_category_counts(rows)
+
+        results = {
+            'DRF serializer (with queries)': per_row(summarize(measure(drf_page, args.repeat)), page),
+            'fast path (with queries)': per_row(summarize(measure(fast_page, args.repeat)), page),
+            'DRF serializer (serialize only)': per_row(summarize(measure(
+                lambda: EventListSerializer(instances, many=True).data, args.repeat
+            )), page),
+            'fast path (serialize only)': per_row(summarize(measure(
+                lambda: fast.serialize(rows, category_counts=counts), args.repeat
+            )), page),
+        }
+        report(f'Event list serialization, {page} rows per page', results, as_json=args.json)
+
+
+if __name__ == '__main__':
+    main()
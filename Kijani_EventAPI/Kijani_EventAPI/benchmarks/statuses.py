@@ -0,0 +1,79 @@
+"""
+Status transition benchmark
+
+Seeds events whose ``status`` went stale (past events still marked
+upcoming, as if never re-saved) and times ``transition_statuses()``,
+counting the UPDATE statements it issues.
+
+    python -m benchmarks.statuses --events 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from .harness import benchmark_database, report
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from EventAPI.models import Event, EventQuerySet  # noqa: E402
+
+
+def seed(count, stale_ratio, batch_size=10000, seed_value=42):
+    rng = random.Random(seed_value)
+    organizer = get_user_model().objects.create_user('bench-organizer')
+    now = timezone.now()
+    batch = []
+    for i in range(count):
+        stale = rng.random() < stale_ratio
+        event_date = now + timedelta(hours=rng.randint(1, 24 * 365) * (-1 if stale else 1))
+        batch.append(Event(
+            title=f'Event {i}',
+            slug=f'event-{i}',
+            description='Benchmark event',
+            event_date=event_date,
+            end_date=event_date + timedelta(hours=rng.choice([2, 24 * 30])),
+            location='Nairobi',
+            organizer=organizer,
+            capacity=100,
+            status='upcoming',
+        ))
+        if len(batch) == batch_size:
+            Event.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Event.objects.bulk_create(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--stale-ratio', type=float, default=0.3)
+    parser.add_argument('--batch-size', type=int, default=EventQuerySet.STATUS_BATCH_SIZE)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        seed(args.events, args.stale_ratio)
+        results = {}
+        for run in ('first run', 'second run'):
+            # The query log is a bounded deque that seeding has filled up
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                counts = Event.objects.transition_statuses(batch_size=args.batch_size)
+                elapsed = time.perf_counter() - started
+            results[run] = {
+                'seconds': round(elapsed, 3),
+                'statements': sum(query['sql'].startswith('UPDATE') for query in queries),
+                **counts,
+            }
+        report(f'Status transitions over {args.events} events', results, as_json=args.json)
+
+
+if __name__ == '__main__':
+    main()
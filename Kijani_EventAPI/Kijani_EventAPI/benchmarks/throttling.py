@@ -0,0 +1,92 @@
+"""
+Throttle check benchmark
+
+Times ``TokenBucketThrottle.allow_request()`` on its own: one client
+taking tokens from a bucket that never runs out, one client refused by an
+empty bucket, and clients spread over ``--clients`` buckets. The checks
+use the local-memory cache, and also Redis with ``--redis-url`` (needs
+the ``redis`` package and a server). Each check should stay well under a
+millisecond.
+
+    python -m benchmarks.throttling --repeat 20000 --redis-url redis://127.0.0.1:6379/15
+"""
+
+import argparse
+import itertools
+
+from .harness import measure, report, summarize
+
+from django.test import override_settings  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from EventAPI import throttling  # noqa: E402
+
+RATES = {
+    'unlimited': ('1000000/s', 1000000),
+    'exhausted': ('1/d', 1),
+}
+
+
+class View:
+    throttle_scope = None
+
+
+def checks(repeat, clients):
+    """Time each setup against the configured cache"""
+    factory = APIRequestFactory()
+    throttle = throttling.TokenBucketThrottle()
+    view = View()
+
+    def check(scope, requests):
+        view.throttle_scope = scope
+        return lambda: throttle.allow_request(next(requests), view)
+
+    one = itertools.repeat(Request(factory.get('/api/v1/events/')))
+    many = itertools.cycle([
+        Request(factory.get('/api/v1/events/', REMOTE_ADDR=f'10.0.{n // 250}.{n % 250}'))
+        for n in range(clients)
+    ])
+    throttling.get_store().take('benchmark', 0, 1, 1)  # connect
+    setups = {
+        'allowed': check('unlimited', one),
+        'refused': check('exhausted', one),
+        f'{clients} clients': check('unlimited', many),
+    }
+    results = {}
+    for label, func in setups.items():
+        summary = summarize(measure(func, repeat, warmup=100))
+        summary['checks_per_s'] = round(1000 / summary['mean_ms'])
+        results[label] = summary
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10000)
+    parser.add_argument('--clients', type=int, default=10000)
+    parser.add_argument('--redis-url', help='Also time a Redis cache at this URL')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    backends = {'locmem': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttling'}}
+    if args.redis_url:
+        backends['redis'] = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': args.redis_url}
+
+    results = {}
+    for name, backend in backends.items():
+        configured = override_settings(
+            CACHES={'default': backend},
+            EVENTAPI_THROTTLING={'ENABLED': True, 'CACHE_ALIAS': 'default', 'RATES': RATES},
+        )
+        with configured:
+            throttling._stores.clear()
+            for label, summary in checks(args.repeat, args.clients).items():
+                results[f'{name} {label}'] = summary
+            throttling._stores.clear()
+
+    report(f'Throttle checks ({args.repeat} per setup)', results, as_json=args.json)
+
+
+if __name__ == '__main__':
+    main()